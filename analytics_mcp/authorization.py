@@ -115,8 +115,14 @@ def requires_approval(tool_name: str) -> bool:
     # Tools that access sensitive data or account information
     sensitive_tools = {
         "run_report",
+        "batch_run_reports",
+        "get_report_page",
+        "run_pivot_report",
+        "batch_run_pivot_reports",
+        "aggregate_report",
         "run_realtime_report",
         "get_account_summaries",
+        "search_properties",
         "get_property_details",
         "list_google_ads_links",
         "get_custom_dimensions_and_metrics",
@@ -137,6 +143,7 @@ def get_approval_prompt_for_tool(tool_name: str) -> str:
     # Tools that primarily access account information
     account_tools = {
         "get_account_summaries",
+        "search_properties",
         "get_property_details",
         "list_google_ads_links",
     }
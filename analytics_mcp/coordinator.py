@@ -19,14 +19,104 @@ server using `@mcp.tool` annotations, thereby 'coordinating' the bootstrapping
 of the server.
 """
 
+import time
+from typing import Any, AsyncContextManager, Dict
+
 from mcp.server.fastmcp import FastMCP
 from analytics_mcp.authorization import (
     create_approval_prompts,
     format_approval_message,
 )
+from analytics_mcp.tools import metrics, retries
+from analytics_mcp.tools.utils import user_context
+
+
+class _AnalyticsMCP(FastMCP):
+    """FastMCP server that bounds the API calls of each request.
+
+    Over HTTP, requests with an `Authorization: Bearer` header carrying a
+    Google OAuth access token make their API calls with the credentials of
+    that user instead of the server's own. Requests without one are
+    rejected if `require_access_token` is set.
+
+    The latency, outcome and response size of tool calls are recorded in
+    `analytics_mcp.tools.metrics`, by tool name. Calls to unknown tools are
+    recorded together.
+    """
+
+    # Whether HTTP requests must carry an access token.
+    require_access_token = False
+
+    # Metrics label of calls to tools that aren't registered, so that
+    # clients can't add a label per made-up tool name.
+    _UNKNOWN_TOOL = "unknown"
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Calls a tool with a deadline for the API calls it makes."""
+        start = time.monotonic()
+        label = name
+        if self._tool_manager.get_tool(name) is None:
+            label = self._UNKNOWN_TOOL
+        try:
+            async with self._user_context():
+                with retries.deadline():
+                    result = await super().call_tool(name, arguments)
+        except Exception as e:
+            # FastMCP wraps the errors of tools in a ToolError.
+            metrics.record_tool_call(
+                label, time.monotonic() - start, type(e.__cause__ or e).__name__
+            )
+            raise
+        metrics.record_tool_call(
+            label, time.monotonic() - start, "ok", _text_bytes(result)
+        )
+        return result
+
+    async def read_resource(self, uri: Any) -> Any:
+        """Reads a resource with a deadline for the API calls it makes."""
+        async with self._user_context():
+            with retries.deadline():
+                return await super().read_resource(uri)
+
+    def _user_context(self) -> AsyncContextManager[None]:
+        """Returns the context that makes API calls as the caller.
+
+        Raises:
+            ValueError: If the HTTP request has no access token, and one is
+              required.
+        """
+        try:
+            request = self._mcp_server.request_context.request
+        except LookupError:
+            request = None
+        if request is None:
+            return user_context(None)
+        scheme, _, token = request.headers.get("authorization", "").partition(
+            " "
+        )
+        token = token.strip() if scheme.lower() == "bearer" else ""
+        if not token and self.require_access_token:
+            raise ValueError(
+                "Requests must have an 'Authorization: Bearer' header with a"
+                " Google OAuth access token."
+            )
+        return user_context(token)
+
+
+def _text_bytes(result: Any) -> int:
+    """Returns the size of the text content of the result of a tool call."""
+    # Tools with an output schema return their content and structured
+    # output as a tuple.
+    content = result[0] if isinstance(result, tuple) else result
+    return sum(
+        len(block.text.encode())
+        for block in content
+        if isinstance(getattr(block, "text", None), str)
+    )
+
 
 # Creates the singleton.
-mcp = FastMCP("Google Analytics Server")
+mcp = _AnalyticsMCP("Google Analytics Server")
 
 
 # Register authorization prompts for sensitive operations
@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deferred imports of the Google client libraries.
+
+Importing the Admin API and Data API client libraries, along with gRPC and
+the HTTP transport of google-auth, takes longer than starting the MCP server
+itself. Modules import them with `lazy_import` so that the server can answer
+the MCP handshake and list its tools before they're loaded.
+"""
+
+import importlib
+import logging
+import types
+from typing import Any, List, Optional
+
+
+class LazyModule:
+    """Proxy for a module that's imported when an attribute is first used."""
+
+    def __init__(self, name: str):
+        """Initializes the proxy without importing the module.
+
+        Args:
+            name: The absolute name of the module.
+        """
+        self._name = name
+        self._module: Optional[types.ModuleType] = None
+
+    def load(self) -> types.ModuleType:
+        """Imports the module if needed and returns it.
+
+        Safe to call from any thread since the import system serializes
+        imports of the same module.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for attributes that aren't set on the proxy itself.
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+# All modules imported with `lazy_import`, in the order they were declared.
+_lazy_modules: List[LazyModule] = []
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Returns a proxy that imports the named module on first use.
+
+    Attributes of the module must not be used at import time, including in
+    annotations that aren't quoted, or the module is imported right away.
+    """
+    module = LazyModule(name)
+    _lazy_modules.append(module)
+    return module
+
+
+def preload() -> None:
+    """Imports all lazily imported modules.
+
+    Meant to be run in a background thread once the server has started, so
+    that the first tool call doesn't have to wait for the imports. Failures
+    are logged and otherwise ignored since the import is retried, and the
+    error raised, when the module is used.
+    """
+    for module in list(_lazy_modules):
+        try:
+            module.load()
+        except Exception:
+            logging.getLogger(__name__).exception(
+                "Failed to preload %s", module._name
+            )
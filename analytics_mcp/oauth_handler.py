@@ -62,11 +62,18 @@ class OAuthHandler:
                 "environment variable"
             )
 
-    def get_credentials(self) -> Credentials:
+    def get_credentials(self, refresh: bool = True) -> Credentials:
         """Gets valid OAuth credentials, refreshing or prompting for auth if needed.
 
+        Args:
+            refresh: Whether to refresh an expired stored token before
+                returning. If False, stored credentials with a refresh token
+                are returned as is, leaving the (blocking) refresh to the
+                caller.
+
         Returns:
-            Valid OAuth 2.0 credentials for Google Analytics API.
+            Valid OAuth 2.0 credentials for Google Analytics API, or
+            refreshable credentials if `refresh` is False.
 
         Raises:
             Exception: If authentication fails.
@@ -83,6 +90,9 @@ class OAuthHandler:
                 print(f"Warning: Could not load token file: {e}")
                 creds = None
 
+        if not refresh and creds and creds.refresh_token:
+            return creds
+
         # Refresh or obtain new credentials
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
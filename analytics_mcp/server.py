@@ -16,7 +16,23 @@
 
 """Entry point for the Google Analytics MCP server."""
 
+import argparse
+import asyncio
+import contextlib
+import os
+import re
+import subprocess
+import sys
+import threading
+from typing import AsyncIterator, List, NamedTuple, Optional, Sequence
+
+from starlette.applications import Starlette
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.middleware.gzip import GZipMiddleware
+
+from analytics_mcp import lazy_imports
 from analytics_mcp.coordinator import mcp
+from analytics_mcp.tools.utils import close_api_clients
 
 # The following imports are necessary to register the tools with the `mcp`
 # object, even though they are not directly used in this file.
@@ -25,14 +41,335 @@ from analytics_mcp.coordinator import mcp
 from analytics_mcp.tools.admin import info  # noqa: F401
 from analytics_mcp.tools.reporting import realtime  # noqa: F401
 from analytics_mcp.tools.reporting import core  # noqa: F401
+from analytics_mcp.tools.reporting import pivot  # noqa: F401
+from analytics_mcp.tools import server_stats  # noqa: F401
+
+# Matches a line of `python -X importtime` output.
+_IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$"
+)
+
+# Written to stderr between the two phases profiled by `--profile-startup`.
+_PRELOAD_MARKER = "analytics-mcp: preload"
+
+# Imports the server, then the client libraries that it imports lazily.
+_PROFILE_STARTUP_CODE = f"""
+import sys
+import analytics_mcp.server
+sys.stderr.write({_PRELOAD_MARKER!r} + "\\n")
+from analytics_mcp import lazy_imports
+lazy_imports.preload()
+"""
+
+# Number of modules listed by `--profile-startup`.
+_PROFILE_STARTUP_MODULES = 25
+
+# Import string of the ASGI app factory that each HTTP worker calls.
+_HTTP_APP_FACTORY = "analytics_mcp.server:create_http_app"
+
+# Pass the HTTP options to worker processes, which import this module anew.
+_HTTP_HOST_ENV = "ANALYTICS_MCP_HTTP_HOST"
+_HTTP_STATELESS_ENV = "ANALYTICS_MCP_HTTP_STATELESS"
+_HTTP_ALLOW_SERVER_CREDENTIALS_ENV = (
+    "ANALYTICS_MCP_HTTP_ALLOW_SERVER_CREDENTIALS"
+)
+_HTTP_ALLOWED_HOSTS_ENV = "ANALYTICS_MCP_HTTP_ALLOWED_HOSTS"
+
+# Host names that requests may always be addressed to.
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+# Addresses that make the server listen on every interface, which therefore
+# aren't host names that requests are addressed to.
+_WILDCARD_HOSTS = ("0.0.0.0", "::", "")
+
+# Responses smaller than this aren't compressed.
+_GZIP_MINIMUM_BYTES = 1024
+
+# How long idle HTTP connections are kept open. Longer than the idle timeout
+# of most load balancers and HTTP clients, so that they close them first.
+_KEEP_ALIVE_SECONDS = 75
+
+
+class _ImportTime(NamedTuple):
+    """The time it took to import a module, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _parse_import_times(output: str) -> List[List[_ImportTime]]:
+    """Parses `python -X importtime` output into the imports of each phase.
+
+    Phases are separated by `_PRELOAD_MARKER` lines. Other lines are ignored.
+    """
+    phases: List[List[_ImportTime]] = [[]]
+    for line in output.splitlines():
+        if line == _PRELOAD_MARKER:
+            phases.append([])
+            continue
+        match = _IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            phases[-1].append(
+                _ImportTime(
+                    module, int(self_us), int(cumulative_us), len(indent) // 2
+                )
+            )
+    return phases
+
+
+def _format_import_profile(
+    phases: Sequence[List[_ImportTime]], limit: int
+) -> str:
+    """Returns a report of the slowest imports of each startup phase."""
+    titles = (
+        "Imports before the server can answer the MCP handshake",
+        "Client libraries loaded in the background after startup",
+    )
+    sections = []
+    for title, imports in zip(titles, phases):
+        # Only top-level imports count towards the total since the cumulative
+        # time of a module includes the modules it imports.
+        total_us = sum(i.cumulative_us for i in imports if i.depth == 0)
+        lines = [
+            f"{title}: {total_us / 1000:.1f} ms",
+            f"{'self (ms)':>10} {'cumulative (ms)':>16}  module",
+        ]
+        slowest = sorted(imports, key=lambda i: i.self_us, reverse=True)
+        for i in slowest[:limit]:
+            lines.append(
+                f"{i.self_us / 1000:>10.1f} {i.cumulative_us / 1000:>16.1f}"
+                f"  {i.module}"
+            )
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def _profile_startup() -> None:
+    """Prints how long it takes to import each module during startup.
+
+    Imports run in a fresh interpreter with `-X importtime` so that modules
+    that are already imported by this process are measured too.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE_STARTUP_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    print(
+        _format_import_profile(
+            _parse_import_times(result.stderr), _PROFILE_STARTUP_MODULES
+        )
+    )
 
 
-def run_server() -> None:
+def _start_preload() -> None:
+    """Loads the client libraries in the background.
+
+    Runs while the client initializes the session, so that the first tool
+    call doesn't have to wait for them.
+    """
+    threading.Thread(
+        target=lazy_imports.preload, name="analytics-mcp-preload", daemon=True
+    ).start()
+
+
+async def _serve() -> None:
+    """Serves MCP requests over stdio until the client disconnects."""
+    _start_preload()
+    try:
+        await mcp.run_stdio_async()
+    finally:
+        # Closes pooled API clients on the loop that owns their channels.
+        await close_api_clients()
+
+
+def _transport_security(
+    host: str, allowed_hosts: Sequence[str]
+) -> TransportSecuritySettings:
+    """Returns the DNS rebinding protection of a server.
+
+    Requests must be addressed to a loopback address, the address that the
+    server listens on, or one of `allowed_hosts`, on any port. Requests from
+    browsers must also come from pages of those hosts.
+
+    Args:
+        host: The address that the server listens on.
+        allowed_hosts: Other host names that clients reach the server by.
+    """
+    names = list(_LOOPBACK_HOSTS)
+    if host not in _WILDCARD_HOSTS:
+        names.append(f"[{host}]" if ":" in host else host)
+    names.extend(allowed_hosts)
+    hosts = [pattern for name in names for pattern in (name, f"{name}:*")]
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=hosts,
+        allowed_origins=[
+            f"{scheme}://{pattern}"
+            for scheme in ("http", "https")
+            for pattern in hosts
+        ],
+    )
+
+
+def create_http_app() -> Starlette:
+    """Returns the ASGI app that serves MCP requests over streamable HTTP.
+
+    Each worker process calls this once. The app answers with JSON instead of
+    event streams so that responses can be compressed, and its API clients
+    and caches are shared by all the sessions of the process. Requests must
+    carry the access token of a user unless the server's own credentials
+    are explicitly allowed.
+    """
+    host = os.environ.get(_HTTP_HOST_ENV, mcp.settings.host)
+    mcp.settings.host = host
+    mcp.settings.json_response = True
+    mcp.settings.stateless_http = os.environ.get(
+        _HTTP_STATELESS_ENV, ""
+    ).lower() in ("1", "true")
+    mcp.require_access_token = os.environ.get(
+        _HTTP_ALLOW_SERVER_CREDENTIALS_ENV, ""
+    ).lower() not in ("1", "true")
+    allowed_hosts = os.environ.get(_HTTP_ALLOWED_HOSTS_ENV, "")
+    mcp.settings.transport_security = _transport_security(
+        host, [name for name in allowed_hosts.split(",") if name]
+    )
+    app = mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        _start_preload()
+        async with session_lifespan(app):
+            try:
+                yield
+            finally:
+                await close_api_clients()
+
+    app.router.lifespan_context = lifespan
+    app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MINIMUM_BYTES)
+    return app
+
+
+def _serve_http(
+    host: str,
+    port: int,
+    workers: int,
+    allow_server_credentials: bool = False,
+    allowed_hosts: Sequence[str] = (),
+) -> None:
+    """Serves MCP requests over streamable HTTP until interrupted.
+
+    A single worker keeps MCP sessions in memory. Sessions can't span
+    processes, so several workers serve stateless requests instead. They
+    share warm reports and metadata, and the requests behind the report
+    and result IDs that tools return, through the disk cache.
+
+    Args:
+        host: The address to listen on.
+        port: The port to listen on.
+        workers: The number of worker processes.
+        allow_server_credentials: Whether requests without an access token
+          make API calls with the server's own credentials, instead of
+          being rejected.
+        allowed_hosts: Host names, other than the address the server
+          listens on, that clients reach the server by.
+    """
+    import uvicorn
+
+    os.environ[_HTTP_HOST_ENV] = host
+    os.environ[_HTTP_ALLOWED_HOSTS_ENV] = ",".join(allowed_hosts)
+    if allow_server_credentials:
+        os.environ[_HTTP_ALLOW_SERVER_CREDENTIALS_ENV] = "true"
+    if workers > 1:
+        os.environ[_HTTP_STATELESS_ENV] = "true"
+        os.environ.setdefault("ANALYTICS_MCP_DISK_CACHE", "true")
+    uvicorn.run(
+        _HTTP_APP_FACTORY,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_keep_alive=_KEEP_ALIVE_SECONDS,
+    )
+
+
+def run_server(argv: Optional[Sequence[str]] = None) -> None:
     """Runs the server.
 
     Serves as the entrypoint for the 'runmcp' command.
+
+    Args:
+        argv: Command line arguments. Defaults to `sys.argv[1:]`.
     """
-    mcp.run()
+    parser = argparse.ArgumentParser(
+        prog="analytics-mcp", description="MCP server for Google Analytics."
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the time it takes to import each module, then exit",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "http"),
+        default="stdio",
+        help="serve a single client over stdio (default), or many clients"
+        " over streamable HTTP",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address that the HTTP server listens on (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="port that the HTTP server listens on (default: 8000)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of HTTP worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--allow-server-credentials",
+        action="store_true",
+        help="let HTTP requests without an access token use the server's"
+        " own credentials, so that anyone who can reach the server can read"
+        " its Google Analytics data",
+    )
+    parser.add_argument(
+        "--allowed-host",
+        action="append",
+        default=[],
+        dest="allowed_hosts",
+        help="host name that clients reach the HTTP server by, such as"
+        " analytics-mcp.example.com, if it isn't the --host address; may be"
+        " repeated",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.profile_startup:
+        _profile_startup()
+        return
+    if args.transport == "http":
+        _serve_http(
+            args.host,
+            args.port,
+            args.workers,
+            args.allow_server_credentials,
+            args.allowed_hosts,
+        )
+        return
+    asyncio.run(_serve())
 
 
 if __name__ == "__main__":
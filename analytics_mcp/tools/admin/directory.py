@@ -0,0 +1,351 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Searchable directory of the accounts and properties of a user."""
+
+import asyncio
+import bisect
+import collections
+import difflib
+import logging
+import re
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from analytics_mcp.tools.utils import current_user
+
+# Splits display names and queries into lowercase words.
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Matches the ID of an account or property, with or without the prefix of
+# its resource name.
+_ID_PATTERN = re.compile(r"^(?:(accounts|properties)/)?(\d+)$")
+
+# Words of a query that don't prefix any word of a display name are matched
+# to the words that are at least this similar.
+_FUZZY_CUTOFF = 0.8
+
+# Maximum number of similar words a query word is matched to.
+_MAX_FUZZY_MATCHES = 5
+
+# Scores of a query word that matches a word of a display name exactly, as a
+# prefix, or only approximately.
+_EXACT_SCORE = 3.0
+_PREFIX_SCORE = 2.0
+_FUZZY_SCORE = 1.0
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+
+class _Property(NamedTuple):
+    """A property and the account it belongs to."""
+
+    property: str
+    display_name: str
+    property_type: str
+    account: str
+    account_display_name: str
+
+    def words(self) -> Set[str]:
+        """Returns the words of the property and account display names."""
+        return set(_words(self.display_name)) | set(
+            _words(self.account_display_name)
+        )
+
+
+class Directory:
+    """Index of account summaries by ID and by the words of display names.
+
+    Properties are found by ID, by the prefixes of the words of their own or
+    their account's display name, or by words similar to those. Updating the
+    directory with new summaries only reindexes the accounts that changed.
+    """
+
+    def __init__(self):
+        # Account summaries as returned by the Admin API, by account.
+        self._accounts: Dict[str, Dict[str, Any]] = {}
+        self._properties: Dict[str, _Property] = {}
+        # Properties by word, and the sorted words for prefix searches.
+        self._index: Dict[str, Set[str]] = collections.defaultdict(set)
+        self._vocabulary: List[str] = []
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Returns the account summaries."""
+        return list(self._accounts.values())
+
+    def update(self, summaries: Iterable[Dict[str, Any]]) -> int:
+        """Replaces the account summaries, reindexing those that changed.
+
+        Args:
+            summaries: Account summaries, as returned by
+              `list_account_summaries` and converted with `proto_to_dict`.
+
+        Returns:
+            The number of accounts that were added, changed or removed.
+        """
+        accounts = {summary["account"]: summary for summary in summaries}
+        changed = 0
+        for account in list(self._accounts):
+            if accounts.get(account) != self._accounts[account]:
+                self._remove_account(account)
+                # Changed accounts are counted when they're added back.
+                if account not in accounts:
+                    changed += 1
+        for account, summary in accounts.items():
+            if account not in self._accounts:
+                self._add_account(summary)
+                changed += 1
+        # Keeps the order of the latest listing.
+        self._accounts = {
+            account: self._accounts[account] for account in accounts
+        }
+        return changed
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Returns the properties that best match the query.
+
+        Args:
+            query: An account or property ID or resource name, or words of
+              the display names of the property or its account. Each word
+              must match. Properties whose names match a number, such as a
+              year, are returned after those with that ID.
+            limit: The maximum number of properties to return.
+        """
+        matches: List[str] = []
+        id_match = _ID_PATTERN.match(query.strip())
+        if id_match:
+            kind, number = id_match.groups()
+            if kind != "accounts":
+                if f"properties/{number}" in self._properties:
+                    matches.append(f"properties/{number}")
+            if kind != "properties":
+                account = self._accounts.get(f"accounts/{number}", {})
+                matches.extend(
+                    property_summary["property"]
+                    for property_summary in account.get(
+                        "property_summaries", []
+                    )
+                )
+            if kind is not None:
+                return [self._properties[p]._asdict() for p in matches[:limit]]
+        matches.extend(p for p in self._search_words(query) if p not in matches)
+        return [self._properties[p]._asdict() for p in matches[:limit]]
+
+    def _search_words(self, query: str) -> List[str]:
+        """Returns the properties whose names match every word, best first."""
+        scores: Optional[Dict[str, float]] = None
+        for word in set(_words(query)):
+            word_scores = self._match(word)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {
+                    p: score + word_scores[p]
+                    for p, score in scores.items()
+                    if p in word_scores
+                }
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(
+            scores,
+            key=lambda p: (-scores[p], self._properties[p].display_name),
+        )
+
+    def _match(self, word: str) -> Dict[str, float]:
+        """Returns the properties whose display names match a query word."""
+        scores: Dict[str, float] = {}
+        position = bisect.bisect_left(self._vocabulary, word)
+        while position < len(self._vocabulary):
+            indexed = self._vocabulary[position]
+            if not indexed.startswith(word):
+                break
+            position += 1
+            score = _EXACT_SCORE if indexed == word else _PREFIX_SCORE
+            for p in self._index[indexed]:
+                scores[p] = max(scores.get(p, 0.0), score)
+        if scores:
+            return scores
+        for indexed in difflib.get_close_matches(
+            word, self._vocabulary, _MAX_FUZZY_MATCHES, _FUZZY_CUTOFF
+        ):
+            for p in self._index[indexed]:
+                scores[p] = _FUZZY_SCORE
+        return scores
+
+    def _add_account(self, summary: Dict[str, Any]) -> None:
+        self._accounts[summary["account"]] = summary
+        for property_summary in summary.get("property_summaries", []):
+            prop = _Property(
+                property=property_summary["property"],
+                display_name=property_summary.get("display_name", ""),
+                property_type=property_summary.get("property_type", ""),
+                account=summary["account"],
+                account_display_name=summary.get("display_name", ""),
+            )
+            self._properties[prop.property] = prop
+            for word in prop.words():
+                if word not in self._index:
+                    bisect.insort(self._vocabulary, word)
+                self._index[word].add(prop.property)
+
+    def _remove_account(self, account: str) -> None:
+        summary = self._accounts.pop(account)
+        for property_summary in summary.get("property_summaries", []):
+            prop = self._properties.pop(property_summary["property"], None)
+            if prop is None:
+                continue
+            for word in prop.words():
+                properties = self._index[word]
+                properties.discard(prop.property)
+                if not properties:
+                    del self._index[word]
+                    del self._vocabulary[
+                        bisect.bisect_left(self._vocabulary, word)
+                    ]
+
+
+class _Entry(NamedTuple):
+    """A directory and when it was last refreshed, in monotonic seconds."""
+
+    directory: Directory
+    refreshed_at: float
+
+
+class DirectoryCache:
+    """Caches the directory of each user of the server.
+
+    Directories younger than the TTL are served from the cache. Older ones
+    are still served, but refreshed in the background, and the refresh only
+    reindexes the accounts that changed.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl_seconds: float,
+        max_users: int,
+    ):
+        """Initializes the cache.
+
+        Args:
+            fetch: Returns all the account summaries of the current user.
+            ttl_seconds: How long a directory is considered fresh.
+            max_users: Least recently used directories are evicted once more
+              than this many are cached.
+        """
+        self._fetch = fetch
+        self._ttl_seconds = ttl_seconds
+        self._max_users = max_users
+        # Least recently used first.
+        self._entries: "collections.OrderedDict[Optional[str], _Entry]" = (
+            collections.OrderedDict()
+        )
+        # Fetches in flight, by user.
+        self._fetches: Dict[Optional[str], "asyncio.Task[Directory]"] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.changed_accounts = 0
+
+    async def get(self) -> Directory:
+        """Returns the directory of the current user.
+
+        Raises:
+            Any error raised by `fetch` if the directory had to be fetched.
+        """
+        user = current_user()
+        entry = self._entries.get(user)
+        if entry is not None:
+            self._entries.move_to_end(user)
+            if time.monotonic() - entry.refreshed_at < self._ttl_seconds:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if user not in self._fetches:
+                    self._start_refresh(
+                        user, entry.directory
+                    ).add_done_callback(_log_refresh_error)
+            return entry.directory
+        self.misses += 1
+        task = self._fetches.get(user) or self._start_refresh(user, Directory())
+        # Shielded so that a cancelled caller doesn't cancel the fetch for
+        # other callers waiting on it.
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Removes all cached directories."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and number of cached directories."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "changed_accounts": self.changed_accounts,
+            "users": len(self._entries),
+        }
+
+    def _start_refresh(
+        self, user: Optional[str], directory: Directory
+    ) -> "asyncio.Task[Directory]":
+        """Starts updating the directory of the user with a new listing.
+
+        The fetch runs with the credentials of the caller, which are those
+        of the user.
+        """
+        task = asyncio.ensure_future(self._refresh(user, directory))
+        self._fetches[user] = task
+        task.add_done_callback(lambda _: self._fetches.pop(user, None))
+        return task
+
+    async def _refresh(
+        self, user: Optional[str], directory: Directory
+    ) -> Directory:
+        self.refreshes += 1
+        self.changed_accounts += directory.update(await self._fetch())
+        self._entries[user] = _Entry(directory, time.monotonic())
+        self._entries.move_to_end(user)
+        while len(self._entries) > self._max_users:
+            self._entries.popitem(last=False)
+        return directory
+
+
+def _log_refresh_error(task: "asyncio.Task[Directory]") -> None:
+    """Logs the error of a failed background refresh.
+
+    The stale directory stays cached, so the refresh is retried the next
+    time it's used.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        logging.getLogger(__name__).warning(
+            "Failed to refresh the account directory",
+            exc_info=task.exception(),
+        )
@@ -14,50 +14,152 @@
 
 """Tools for gathering Google Analytics account and property information."""
 
-from typing import Any, Dict, List
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
 
 from analytics_mcp.coordinator import mcp
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.admin.directory import DirectoryCache
+from analytics_mcp.tools.coalescing import coalescer
 from analytics_mcp.tools.utils import (
     construct_property_rn,
     create_admin_api_client,
     create_admin_alpha_api_client,
     proto_to_dict,
 )
-from google.analytics import admin_v1beta, admin_v1alpha
+
+admin_v1alpha = lazy_import("google.analytics.admin_v1alpha")
+admin_v1beta = lazy_import("google.analytics.admin_v1beta")
+
+
+# Seconds that a listing of account summaries is considered fresh. Older
+# listings are still used while they're refreshed in the background.
+_DIRECTORY_TTL_SECONDS = float(
+    os.environ.get("ANALYTICS_MCP_DIRECTORY_TTL_SECONDS", "300")
+)
+
+# Maximum number of users whose directories are cached.
+_MAX_DIRECTORY_USERS = 32
+
+# Largest page size accepted by the Admin API list methods used here.
+_MAX_PAGE_SIZE = 200
+
+
+async def _collect_items(
+    pager: Any, field: str, max_items: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Returns the items of all the pages of a pager as dictionaries.
+
+    The next page is requested before the items of the current page are
+    converted, so that the conversion overlaps with the round trip.
+
+    Args:
+        pager: The async pager returned by an Admin API list method.
+        field: The field of the list response that holds the items.
+        max_items: The maximum number of items to return. Pages past this
+          number of items aren't requested.
+    """
+    items: List[Dict[str, Any]] = []
+    pages = pager.pages
+    next_page: Optional[asyncio.Future] = asyncio.ensure_future(
+        pages.__anext__()
+    )
+    try:
+        while next_page is not None:
+            page = await next_page
+            page_items = getattr(page, field)
+            next_page = None
+            if page.next_page_token and (
+                max_items is None or len(items) + len(page_items) < max_items
+            ):
+                next_page = asyncio.ensure_future(pages.__anext__())
+                # Lets the request for the next page go out before the
+                # conversion, which doesn't yield to the event loop.
+                await asyncio.sleep(0)
+            items.extend(proto_to_dict(item) for item in page_items)
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+    return items if max_items is None else items[:max_items]
 
 
 @mcp.tool()
-async def get_account_summaries() -> List[Dict[str, Any]]:
-    """Retrieves information about the user's Google Analytics accounts and properties."""
+async def get_account_summaries(limit: int = None) -> List[Dict[str, Any]]:
+    """Retrieves information about the user's Google Analytics accounts and properties.
 
-    # Uses an async list comprehension so the pager returned by
-    # list_account_summaries retrieves all pages.
-    summary_pager = await create_admin_api_client().list_account_summaries()
-    all_pages = [
-        proto_to_dict(summary_page) async for summary_page in summary_pager
-    ]
-    return all_pages
+    Args:
+        limit: The maximum number of accounts to return. Defaults to all of
+          them.
+    """
+    return (await account_directory.get()).summaries()[:limit]
+
+
+@mcp.tool(title="Search properties by name or ID")
+async def search_properties(
+    query: str, limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Searches the user's Google Analytics properties by name or ID.
+
+    Prefer this over `get_account_summaries` to find a property, since it
+    returns only the matching properties.
+
+    Args:
+        query: Words of the display name of the property or its account,
+          such as "acme web". Words match by prefix, and misspelled words
+          match similar words. Can also be a property or account ID, or a
+          resource name such as 'properties/123' or 'accounts/456', in which
+          case the property, or the account's properties, are returned. A
+          bare number also matches names, such as "2024", after the IDs.
+        limit: The maximum number of properties to return.
+
+    Returns:
+        The matching properties, best matches first. Each has the resource
+        name, display name and type of the property, and the resource name
+        and display name of its account.
+    """
+    return (await account_directory.get()).search(query, limit)
+
+
+async def _list_account_summaries() -> List[Dict[str, Any]]:
+    """Returns the account summaries of the user."""
+    summary_pager = await create_admin_api_client().list_account_summaries(
+        request=admin_v1beta.ListAccountSummariesRequest(
+            page_size=_MAX_PAGE_SIZE
+        )
+    )
+    return await _collect_items(summary_pager, "account_summaries")
+
+
+# Accounts and properties of recently active users, shared by the tools that
+# need them.
+account_directory = DirectoryCache(
+    _list_account_summaries,
+    ttl_seconds=_DIRECTORY_TTL_SECONDS,
+    max_users=_MAX_DIRECTORY_USERS,
+)
 
 
 @mcp.tool(title="List links to Google Ads accounts")
-async def list_google_ads_links(property_id: int | str) -> List[Dict[str, Any]]:
+async def list_google_ads_links(
+    property_id: int | str, limit: int = None
+) -> List[Dict[str, Any]]:
     """Returns a list of links to Google Ads accounts for a property.
 
     Args:
         property_id: The Google Analytics property ID. Accepted formats are:
           - A number
           - A string consisting of 'properties/' followed by a number
+        limit: The maximum number of links to return. Defaults to all of
+          them.
     """
     request = admin_v1beta.ListGoogleAdsLinksRequest(
-        parent=construct_property_rn(property_id)
+        parent=construct_property_rn(property_id), page_size=_MAX_PAGE_SIZE
     )
-    # Uses an async list comprehension so the pager returned by
-    # list_google_ads_links retrieves all pages.
     links_pager = await create_admin_api_client().list_google_ads_links(
         request=request
     )
-    all_pages = [proto_to_dict(link_page) async for link_page in links_pager]
-    return all_pages
+    return await _collect_items(links_pager, "google_ads_links", limit)
 
 
 @mcp.tool(title="Gets details about a property")
@@ -68,17 +170,24 @@ async def get_property_details(property_id: int | str) -> Dict[str, Any]:
           - A number
           - A string consisting of 'properties/' followed by a number
     """
-    client = create_admin_api_client()
-    request = admin_v1beta.GetPropertyRequest(
-        name=construct_property_rn(property_id)
+    property_rn = construct_property_rn(property_id)
+    return await coalescer.run(
+        ("get_property_details", property_rn),
+        lambda: _get_property(property_rn),
     )
+
+
+async def _get_property(property_rn: str) -> Dict[str, Any]:
+    """Returns the details of the property with the given resource name."""
+    client = create_admin_api_client()
+    request = admin_v1beta.GetPropertyRequest(name=property_rn)
     response = await client.get_property(request=request)
     return proto_to_dict(response)
 
 
 @mcp.tool(title="Gets property annotations for a property")
 async def list_property_annotations(
-    property_id: int | str,
+    property_id: int | str, limit: int = None
 ) -> List[Dict[str, Any]]:
     """Returns annotations for a property.
 
@@ -90,17 +199,17 @@ async def list_property_annotations(
         property_id: The Google Analytics property ID. Accepted formats are:
           - A number
           - A string consisting of 'properties/' followed by a number
+        limit: The maximum number of annotations to return. Defaults to all
+          of them.
     """
     request = admin_v1alpha.ListReportingDataAnnotationsRequest(
-        parent=construct_property_rn(property_id)
+        parent=construct_property_rn(property_id), page_size=_MAX_PAGE_SIZE
     )
     annotations_pager = (
         await create_admin_alpha_api_client().list_reporting_data_annotations(
             request=request
         )
     )
-    all_pages = [
-        proto_to_dict(annotation_page)
-        async for annotation_page in annotations_pager
-    ]
-    return all_pages
+    return await _collect_items(
+        annotations_pager, "reporting_data_annotations", limit
+    )
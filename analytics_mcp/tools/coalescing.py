@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coalescing of identical concurrent requests.
+
+Agents often call the same tool with the same arguments several times in
+parallel. Identical calls that overlap share a single upstream request, and
+all of them get its result. Calls are only shared by callers that use the
+same credentials.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from analytics_mcp.tools.utils import current_user
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """Runs at most one call per key at a time, sharing its result."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of `call`, or of the call in flight for the key.
+
+        The result, or error, of a call is shared by reference with every
+        caller that joined it, so callers must not modify it.
+
+        Args:
+            key: Identifies calls that return the same result.
+            call: Starts the call if none is in flight for the key.
+        """
+        # The call runs with the credentials of the caller that starts it.
+        key = (current_user(), key)
+        future = self._in_flight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shielded so that a cancelled caller doesn't cancel the call for the
+        # other callers.
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of calls made and of calls that were joined."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Coalesces the API calls of all tools.
+coalescer = RequestCoalescer()
@@ -0,0 +1,332 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Metrics of the tool calls of the server and the API calls they make.
+
+Latencies, response sizes and row counts are recorded in histograms with
+fixed buckets, and outcomes in counters. `render` writes them, and the
+counters of the server's caches and schedulers, in the Prometheus text
+format.
+"""
+
+import bisect
+import collections
+import math
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds of the buckets of latencies, in seconds.
+_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+# Upper bounds of the buckets of response sizes: powers of 4 from 256 bytes
+# to 64 MiB.
+_BYTES_BUCKETS = tuple(float(4**i) for i in range(4, 14))
+
+# Upper bounds of the buckets of report row counts.
+_ROWS_BUCKETS = (0.0, 1.0, 10.0, 100.0, 1000.0, 10000.0, 100000.0, 250000.0)
+
+# Prefix of the names of all metrics.
+_PREFIX = "analytics_mcp"
+
+_Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Returns the label set of a sample, such as '{tool="run_report"}'."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """A count of events, by label values."""
+
+    def __init__(self, name: str, description: str, label_names: _Labels):
+        self.name = f"{_PREFIX}_{name}"
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[_Labels, float] = collections.defaultdict(float)
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] += amount
+
+    def values(self) -> Dict[_Labels, float]:
+        """Returns the count of each combination of label values."""
+        return dict(self._values)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)}"
+                f" {_format_value(value)}"
+            )
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class _Distribution:
+    """The bucket counts, sum and count of the observations of a histogram."""
+
+    def __init__(self, bucket_count: int):
+        # The last bucket holds the observations above all bounds.
+        self.buckets = [0] * (bucket_count + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """The distribution of observed values, by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: _Labels,
+        buckets: Sequence[float],
+    ):
+        self.name = f"{_PREFIX}_{name}"
+        self.description = description
+        self.label_names = label_names
+        self._bounds = tuple(buckets)
+        self._distributions: Dict[_Labels, _Distribution] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        distribution = self._distributions.get(label_values)
+        if distribution is None:
+            distribution = self._distributions[label_values] = _Distribution(
+                len(self._bounds)
+            )
+        distribution.buckets[bisect.bisect_left(self._bounds, value)] += 1
+        distribution.total += value
+        distribution.count += 1
+
+    def summary(self, *label_values: str) -> Optional[Dict[str, float]]:
+        """Returns the count, mean and estimated quantiles of the values.
+
+        Quantiles are the upper bounds of the buckets that contain them, so
+        they overestimate the actual values by at most one bucket.
+        """
+        distribution = self._distributions.get(label_values)
+        if distribution is None:
+            return None
+        return {
+            "count": distribution.count,
+            "mean": distribution.total / distribution.count,
+            "p50": self._quantile(distribution, 0.5),
+            "p95": self._quantile(distribution, 0.95),
+            "p99": self._quantile(distribution, 0.99),
+        }
+
+    def label_values(self) -> List[_Labels]:
+        """Returns the combinations of label values with observations."""
+        return sorted(self._distributions)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.label_names + ("le",)
+        for labels, distribution in sorted(self._distributions.items()):
+            cumulative = 0
+            for bound, count in zip(
+                self._bounds + (math.inf,), distribution.buckets
+            ):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    names, labels + (_format_value(bound),)
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_set = _format_labels(self.label_names, labels)
+            yield (
+                f"{self.name}_sum{label_set}"
+                f" {_format_value(distribution.total)}"
+            )
+            yield f"{self.name}_count{label_set} {distribution.count}"
+
+    def clear(self) -> None:
+        self._distributions.clear()
+
+    def _quantile(self, distribution: _Distribution, q: float) -> float:
+        rank = q * distribution.count
+        cumulative = 0
+        for bound, count in zip(
+            self._bounds + (math.inf,), distribution.buckets
+        ):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+
+tool_calls = Counter(
+    "tool_calls_total", "Tool calls by tool and outcome.", ("tool", "status")
+)
+tool_duration = Histogram(
+    "tool_duration_seconds",
+    "Duration of tool calls.",
+    ("tool",),
+    _LATENCY_BUCKETS,
+)
+tool_response_bytes = Histogram(
+    "tool_response_bytes",
+    "Size of the text returned by tool calls.",
+    ("tool",),
+    _BYTES_BUCKETS,
+)
+api_calls = Counter(
+    "api_calls_total",
+    "Google Analytics API calls by method and status code.",
+    ("method", "code"),
+)
+api_duration = Histogram(
+    "api_duration_seconds",
+    "Duration of Google Analytics API calls, including retries.",
+    ("method",),
+    _LATENCY_BUCKETS,
+)
+api_response_bytes = Histogram(
+    "api_response_bytes",
+    "Serialized size of Google Analytics API responses.",
+    ("method",),
+    _BYTES_BUCKETS,
+)
+report_rows = Histogram(
+    "report_rows",
+    "Rows returned by the reports of Data API calls.",
+    ("method",),
+    _ROWS_BUCKETS,
+)
+
+_METRICS = (
+    tool_calls,
+    tool_duration,
+    tool_response_bytes,
+    api_calls,
+    api_duration,
+    api_response_bytes,
+    report_rows,
+)
+
+
+def error_code(error: BaseException) -> str:
+    """Returns the gRPC status code of an API error, or the error's type."""
+    code = getattr(error, "grpc_status_code", None)
+    if code is not None:
+        return code.name
+    return type(error).__name__
+
+
+def record_tool_call(
+    tool: str,
+    seconds: float,
+    status: str,
+    response_bytes: Optional[int] = None,
+) -> None:
+    """Records a tool call.
+
+    Args:
+        tool: The name of the tool.
+        seconds: How long the call took.
+        status: "ok", or the type of the error that the call raised.
+        response_bytes: The size of the text returned by the call, if any.
+    """
+    tool_calls.inc(tool, status)
+    tool_duration.observe(seconds, tool)
+    if response_bytes is not None:
+        tool_response_bytes.observe(response_bytes, tool)
+
+
+def record_api_call(
+    method: str, seconds: float, code: str, response: Any = None
+) -> None:
+    """Records an API call, and the size and rows of its response.
+
+    Args:
+        method: The name of the client method, such as 'run_report'.
+        seconds: How long the call took, including retries.
+        code: "OK", or the status code of the error of the call.
+        response: The response of the call. Only the sizes of protocol
+          buffer messages are recorded, not those of pagers.
+    """
+    api_calls.inc(method, code)
+    api_duration.observe(seconds, method)
+    if response is None or not hasattr(type(response), "pb"):
+        return
+    api_response_bytes.observe(type(response).pb(response).ByteSize(), method)
+    reports = getattr(response, "reports", None) or getattr(
+        response, "pivot_reports", None
+    )
+    row_counts = [
+        getattr(report, "row_count", None)
+        for report in (reports if reports is not None else [response])
+    ]
+    for row_count in row_counts:
+        if isinstance(row_count, int):
+            report_rows.observe(row_count, method)
+
+
+def render(components: Dict[str, Dict[str, float]]) -> str:
+    """Returns all metrics in the Prometheus text format.
+
+    Args:
+        components: The counters of the server's components, such as
+          `{"report_cache": {"hits": 3}}`, rendered as gauges named after
+          the component and counter.
+    """
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for component, values in components.items():
+        for key, value in values.items():
+            name = f"{_PREFIX}_{component}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def clear() -> None:
+    """Resets all metrics."""
+    for metric in _METRICS:
+        metric.clear()
@@ -0,0 +1,486 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local aggregation of the rows of fetched reports.
+
+`run_report` keeps its most recent responses in memory under a `result_id`.
+The `aggregate_report` tool groups, totals, ranks and derives metrics from
+those rows without another API call. Reports that are no longer kept, or
+that another worker process ran, are loaded again through the report cache.
+Metric values are stored in `array.array` columns and processed column by
+column.
+"""
+
+import array
+import ast
+import collections
+import hashlib
+import heapq
+import itertools
+import math
+import operator
+import os
+import re
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from analytics_mcp.coordinator import mcp
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.utils import current_user
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+
+# Maximum total size of the reports kept for aggregation, in bytes. Least
+# recently used reports are dropped first, and loaded again through the
+# report cache if they're aggregated later.
+_MAX_RESULT_BYTES = int(
+    os.environ.get("ANALYTICS_MCP_AGGREGATION_BYTES", str(128 * 1024 * 1024))
+)
+
+# Matches the dimension and metric names in derived metric expressions,
+# including names with a colon such as 'customEvent:plan'. Names can't follow
+# a digit or dot, so that the exponent of a number such as '1e5' isn't
+# mistaken for a name.
+_NAME_PATTERN = re.compile(r"(?<![\w.])[A-Za-z_]\w*(?::\w+)?")
+
+# A column of metric values, or a constant in a derived metric expression.
+_Values = Union[array.array, float]
+
+
+class _Table(NamedTuple):
+    """The rows of a report, one column per dimension and metric."""
+
+    dimension_names: List[str]
+    dimensions: List[List[str]]
+    metric_names: List[str]
+    integer_metrics: frozenset
+    metrics: List[array.array]
+    row_count: int
+
+
+# Key of a kept report: the user, if any, and the result ID.
+_Key = Tuple[Optional[str], str]
+
+
+class _Results:
+    """Reports kept for aggregation, bounded by their total size.
+
+    Reports are kept by user and result ID, so that users of a shared server
+    only aggregate their own reports. Responses are converted to tables when
+    they're first aggregated.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initializes the store.
+
+        Args:
+            max_bytes: Least recently used reports are dropped once their
+              total size exceeds this many bytes.
+        """
+        self._max_bytes = max_bytes
+        # Maps keys to (report, size), least recently used first.
+        self._entries: "collections.OrderedDict[_Key, Tuple[Any, int]]" = (
+            collections.OrderedDict()
+        )
+        self._size = 0
+
+    def get(self, key: _Key) -> Any:
+        """Returns the kept response or table, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: _Key, value: Any, size: int) -> None:
+        """Keeps a response or table, replacing any kept under the key.
+
+        Reports larger than the store itself aren't kept.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+        if size > self._max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._size += size
+        while self._size > self._max_bytes:
+            self._size -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        """Drops all kept reports."""
+        self._entries.clear()
+        self._size = 0
+
+
+_results = _Results(_MAX_RESULT_BYTES)
+
+
+def result_id(request: "data_v1beta.RunReportRequest", *variant: Any) -> str:
+    """Returns the ID of the result of a report request.
+
+    Identical requests get the same ID so that repeated reports don't take
+    up more room.
+
+    Args:
+        request: The report request.
+        *variant: Other arguments that change the rows of the result, such
+          as `max_rows`.
+    """
+    digest = hashlib.sha256(
+        type(request).serialize(request) + repr(variant).encode()
+    )
+    return digest.hexdigest()[:16]
+
+
+def register(report_id: str, response: "data_v1beta.RunReportResponse"):
+    """Keeps a report response for aggregation under the given ID."""
+    _results.put(
+        (current_user(), report_id),
+        response,
+        type(response).pb(response).ByteSize(),
+    )
+
+
+def clear() -> None:
+    """Drops all kept reports."""
+    _results.clear()
+
+
+def _parse_metric(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def _table_size(table: _Table) -> int:
+    """Returns the approximate size of a table in memory, in bytes."""
+    # Each dimension value is a string plus a pointer to it in its list.
+    size = sum(
+        sys.getsizeof(value) + 8
+        for column in table.dimensions
+        for value in column
+    )
+    return size + sum(column.itemsize * len(column) for column in table.metrics)
+
+
+def _to_table(response: "data_v1beta.RunReportResponse") -> _Table:
+    """Converts the rows of a report response to columns."""
+    pb = type(response).pb(response)
+    dimension_names = [header.name for header in pb.dimension_headers]
+    metric_names = [header.name for header in pb.metric_headers]
+    dimensions: List[List[str]] = [[] for _ in dimension_names]
+    metric_values: List[List[float]] = [[] for _ in metric_names]
+    for row in pb.rows:
+        for column, value in zip(dimensions, row.dimension_values):
+            column.append(value.value)
+        for column, value in zip(metric_values, row.metric_values):
+            column.append(_parse_metric(value.value))
+    return _Table(
+        dimension_names=dimension_names,
+        dimensions=dimensions,
+        metric_names=metric_names,
+        integer_metrics=frozenset(
+            header.name
+            for header in pb.metric_headers
+            if header.type_ == data_v1beta.MetricType.TYPE_INTEGER
+        ),
+        metrics=[array.array("d", column) for column in metric_values],
+        row_count=len(pb.rows),
+    )
+
+
+async def _get_table(report_id: str) -> _Table:
+    """Returns the table of a report, converting it on first use.
+
+    Reports that aren't kept in this process are loaded again by their
+    cached request.
+    """
+    key = (current_user(), report_id)
+    result = _results.get(key)
+    if result is None:
+        # Imported here since the core module imports this one.
+        from analytics_mcp.tools.reporting import core
+
+        result = await core.load_result(report_id)
+        if result is None:
+            raise ValueError(
+                f"Unknown result ID: {report_id}. Run the report again to"
+                " get a new result ID."
+            )
+    if not isinstance(result, _Table):
+        result = _to_table(result)
+        _results.put(key, result, _table_size(result))
+    return result
+
+
+def _group(
+    table: _Table, group_by: Sequence[str]
+) -> Tuple[List[Tuple[str, ...]], List[int]]:
+    """Returns the distinct values of the dimensions, and each row's group."""
+    columns = []
+    for name in group_by:
+        if name not in table.dimension_names:
+            raise ValueError(
+                f"Unknown dimension '{name}'. The report's dimensions are:"
+                f" {', '.join(table.dimension_names)}."
+            )
+        columns.append(table.dimensions[table.dimension_names.index(name)])
+    if not columns:
+        # A single group of all rows, even if there are none.
+        return [()], [0] * table.row_count
+    groups: Dict[Tuple[str, ...], int] = {}
+    row_groups = [groups.setdefault(key, len(groups)) for key in zip(*columns)]
+    return list(groups), row_groups
+
+
+def _aggregate(
+    values: array.array, row_groups: List[int], group_count: int, how: str
+) -> array.array:
+    """Aggregates the values of a metric column by group."""
+    if how in ("sum", "mean"):
+        totals = array.array("d", bytes(8 * group_count))
+        for group, value in zip(row_groups, values):
+            totals[group] += value
+        if how == "sum":
+            return totals
+        counts = collections.Counter(row_groups)
+        return array.array(
+            "d", (totals[group] / counts[group] for group in range(group_count))
+        )
+    pick = min if how == "min" else max
+    result = array.array("d", [math.nan] * group_count)
+    for group, value in zip(row_groups, values):
+        current = result[group]
+        result[group] = value if math.isnan(current) else pick(current, value)
+    return result
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else math.nan
+
+
+_OPERATORS: Dict[type, Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide,
+}
+
+
+def _apply(
+    function: Callable[[float, float], float],
+    left: _Values,
+    right: _Values,
+    length: int,
+) -> _Values:
+    """Applies a binary operator to columns or constants, element-wise."""
+    if isinstance(left, float) and isinstance(right, float):
+        return function(left, right)
+    if isinstance(left, float):
+        left = itertools.repeat(left, length)
+    if isinstance(right, float):
+        right = itertools.repeat(right, length)
+    return array.array("d", map(function, left, right))
+
+
+def _evaluate(
+    expression: str, columns: Dict[str, array.array], length: int
+) -> array.array:
+    """Evaluates a derived metric expression over metric columns.
+
+    Expressions combine metric names and numbers with +, -, * and /.
+    Division by zero gives NaN.
+    """
+    placeholders: Dict[str, str] = {}
+
+    def replace(match: re.Match) -> str:
+        name = match.group(0)
+        if name not in columns:
+            raise ValueError(
+                f"Unknown metric '{name}' in derived metric '{expression}'."
+            )
+        return placeholders.setdefault(name, f"_m{len(placeholders)}")
+
+    try:
+        tree = ast.parse(_NAME_PATTERN.sub(replace, expression), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid derived metric '{expression}'.") from e
+    values = {
+        placeholder: columns[name] for name, placeholder in placeholders.items()
+    }
+
+    def visit(node: ast.AST) -> _Values:
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _apply(
+                _OPERATORS[type(node.op)],
+                visit(node.left),
+                visit(node.right),
+                length,
+            )
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return _apply(operator.mul, -1.0, visit(node.operand), length)
+        if isinstance(node, ast.Name) and node.id in values:
+            return values[node.id]
+        if isinstance(node, ast.Constant) and isinstance(
+            node.value, (int, float)
+        ):
+            return float(node.value)
+        raise ValueError(
+            f"Invalid derived metric '{expression}'. Use metric names, numbers"
+            " and the operators +, -, * and /."
+        )
+
+    result = visit(tree.body)
+    if isinstance(result, float):
+        return array.array("d", [result] * length)
+    return result
+
+
+def _json_number(value: float, integer: bool) -> float | int | None:
+    """Returns a metric value as a JSON-compatible number."""
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return int(value) if integer else value
+
+
+@mcp.tool(title="Aggregates the rows of a report returned by run_report")
+async def aggregate_report(
+    result_id: str,
+    group_by: List[str] = None,
+    metrics: List[str] = None,
+    aggregation: Literal["sum", "mean", "min", "max"] = "sum",
+    derived_metrics: Dict[str, str] = None,
+    order_by: str = None,
+    desc: bool = True,
+    limit: int = None,
+) -> Dict[str, Any]:
+    """Groups, totals and ranks the rows of a report without rerunning it.
+
+    Use this for totals, breakdowns by a subset of the report's dimensions,
+    top-N lists and ratios of a report already returned by `run_report`,
+    instead of computing them yourself.
+
+    Note that summing metrics that aren't additive, such as `activeUsers`
+    across days or rates such as `bounceRate`, doesn't give the same result
+    as a report with fewer dimensions.
+
+    Args:
+        result_id: The `result_id` returned by `run_report`.
+        group_by: The dimensions of the report to group rows by. If empty,
+          all rows are aggregated into one.
+        metrics: The metrics of the report to aggregate. Defaults to all of
+          them.
+        aggregation: How the values of each metric are combined within a
+          group: "sum", "mean", "min" or "max".
+        derived_metrics: Metrics to compute from the aggregated metrics, by
+          name. Each value is an expression of metric names, numbers and the
+          operators +, -, * and /, such as
+          `{"eventsPerSession": "eventCount / sessions"}`.
+        order_by: The name of a dimension of `group_by`, a metric or a derived
+          metric to sort the groups by.
+        desc: Whether to sort in descending order.
+        limit: The maximum number of groups to return, such as 10 for a top
+          10 when combined with `order_by`.
+
+    Returns:
+        A dictionary with a `headers` list of the group_by dimensions,
+        metrics and derived metrics, a `columns` list with one list of values
+        per header, and the total number of groups in `row_count`.
+    """
+    table = await _get_table(result_id)
+    group_by = group_by or []
+    metrics = table.metric_names if metrics is None else metrics
+    derived_metrics = derived_metrics or {}
+    for name in metrics:
+        if name not in table.metric_names:
+            raise ValueError(
+                f"Unknown metric '{name}'. The report's metrics are:"
+                f" {', '.join(table.metric_names)}."
+            )
+
+    keys, row_groups = _group(table, group_by)
+    group_count = len(keys)
+    aggregated: Dict[str, array.array] = {
+        name: _aggregate(
+            table.metrics[table.metric_names.index(name)],
+            row_groups,
+            group_count,
+            aggregation,
+        )
+        for name in metrics
+    }
+    for name, expression in derived_metrics.items():
+        aggregated[name] = _evaluate(expression, aggregated, group_count)
+
+    headers = group_by + list(aggregated)
+    columns: List[Sequence] = [
+        [key[index] for key in keys] for index in range(len(group_by))
+    ] + list(aggregated.values())
+
+    order = range(group_count)
+    if order_by is not None:
+        if order_by not in headers:
+            raise ValueError(
+                f"Invalid order_by '{order_by}'. It must be one of:"
+                f" {', '.join(headers)}."
+            )
+        column = columns[headers.index(order_by)]
+        if order_by in aggregated:
+            # Sorts NaN values last regardless of the direction.
+            missing = -math.inf if desc else math.inf
+
+            def sort_key(i: int) -> float:
+                return missing if math.isnan(column[i]) else column[i]
+
+        else:
+            sort_key = column.__getitem__
+        if limit is not None:
+            pick = heapq.nlargest if desc else heapq.nsmallest
+            order = pick(limit, order, key=sort_key)
+        else:
+            order = sorted(order, key=sort_key, reverse=desc)
+    elif limit is not None:
+        order = order[:limit]
+
+    integer_metrics = (
+        table.integer_metrics if aggregation != "mean" else frozenset()
+    )
+    return {
+        "headers": headers,
+        "columns": [
+            (
+                [
+                    _json_number(column[i], name in integer_metrics)
+                    for i in order
+                ]
+                if name in aggregated
+                else [column[i] for i in order]
+            )
+            for name, column in zip(headers, columns)
+        ],
+        "row_count": group_count,
+    }
@@ -0,0 +1,495 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Caches for Data API report responses.
+
+Responses are cached in process, and optionally in a SQLite database on disk
+that's shared by all server processes of the user.
+"""
+
+import asyncio
+import collections
+import contextlib
+import datetime
+import hashlib
+import os
+import pathlib
+import re
+import sqlite3
+import time
+import zlib
+import zoneinfo
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.utils import credentials_fingerprint, current_user
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+proto = lazy_import("proto")
+
+
+# Maximum total size of cached responses, in bytes.
+_MAX_CACHE_BYTES = int(
+    os.environ.get("ANALYTICS_MCP_REPORT_CACHE_BYTES", str(64 * 1024 * 1024))
+)
+
+# Whether to also cache responses on disk, and where.
+_DISK_CACHE_ENABLED = os.environ.get(
+    "ANALYTICS_MCP_DISK_CACHE", ""
+).lower() in ("1", "true")
+_DISK_CACHE_DIR = os.environ.get(
+    "ANALYTICS_MCP_DISK_CACHE_DIR",
+    str(pathlib.Path.home() / ".analytics-mcp" / "cache"),
+)
+
+# Maximum total size of compressed responses cached on disk, in bytes.
+_MAX_DISK_CACHE_BYTES = int(
+    os.environ.get("ANALYTICS_MCP_DISK_CACHE_BYTES", str(512 * 1024 * 1024))
+)
+
+# Permissions of the directory of the database, and of the database.
+_PRIVATE_DIRECTORY_MODE = 0o700
+_PRIVATE_FILE_MODE = 0o600
+
+# Seconds to wait for another process to release a lock on the database.
+_DISK_CACHE_BUSY_TIMEOUT_SECONDS = 5.0
+
+# Seconds that a response is cached for, depending on the most recent day
+# covered by the request's date ranges. Data for today is still being
+# collected and data for the last couple of days may still be processed, so
+# such responses are only cached briefly.
+_TTL_TODAY_SECONDS = 5 * 60
+_TTL_RECENT_SECONDS = 60 * 60
+_TTL_HISTORICAL_SECONDS = 24 * 60 * 60
+
+# Number of days after which data is considered complete.
+_RECENT_DAYS = 2
+
+# Matches relative dates such as '7daysAgo'.
+_DAYS_AGO_PATTERN = re.compile(r"^(\d+)daysAgo$")
+
+# Relative dates other than 'NdaysAgo'.
+_RELATIVE_DATES = ("today", "yesterday")
+
+
+class ResponseCache:
+    """LRU cache of serialized responses bounded by their total size."""
+
+    def __init__(self, max_bytes: int = _MAX_CACHE_BYTES):
+        """Initializes the cache.
+
+        Args:
+            max_bytes: Least recently used entries are evicted once the total
+              size of cached values exceeds this many bytes.
+        """
+        self._max_bytes = max_bytes
+        # Maps keys to (expiration time, value), least recently used first.
+        self._entries: "collections.OrderedDict[str, Tuple[float, bytes]]" = (
+            collections.OrderedDict()
+        )
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the unexpired value for the key, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Caches the value for the given number of seconds.
+
+        Values larger than the cache itself aren't cached.
+        """
+        if key in self._entries:
+            self._remove(key)
+        if len(value) > self._max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._size += len(value)
+        while self._size > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class DiskCache:
+    """Cache of compressed responses stored in a SQLite database.
+
+    The database is in WAL mode so that any number of server processes can
+    read and write it concurrently. Entries are evicted in least recently
+    used order once their total compressed size exceeds the limit.
+
+    Methods block on disk I/O, so async code should call them in a thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = _MAX_DISK_CACHE_BYTES):
+        """Initializes the cache, creating the database if needed.
+
+        Args:
+            directory: The directory containing the database.
+            max_bytes: Least recently used entries are evicted once the total
+              size of compressed values exceeds this many bytes.
+        """
+        # Responses are only readable by the OS user, whose credentials
+        # fetched them.
+        pathlib.Path(directory).mkdir(
+            mode=_PRIVATE_DIRECTORY_MODE, parents=True, exist_ok=True
+        )
+        os.chmod(directory, _PRIVATE_DIRECTORY_MODE)
+        self._path = str(pathlib.Path(directory) / "responses.sqlite3")
+        self._max_bytes = max_bytes
+        os.close(
+            os.open(self._path, os.O_CREAT | os.O_RDWR, _PRIVATE_FILE_MODE)
+        )
+        os.chmod(self._path, _PRIVATE_FILE_MODE)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_by_access"
+                " ON responses (accessed_at)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Yields a connection that commits on success and is then closed."""
+        connection = sqlite3.connect(
+            self._path, timeout=_DISK_CACHE_BUSY_TIMEOUT_SECONDS
+        )
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Returns the unexpired value for the key and its remaining TTL.
+
+        Returns None if the key isn't cached or has expired.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value, expires_at FROM responses"
+                " WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+        return zlib.decompress(row[0]), row[1] - now
+
+    def put(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Caches the value for the given number of seconds."""
+        compressed = zlib.compress(value)
+        if len(compressed) > self._max_bytes:
+            return
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), now + ttl_seconds, now),
+            )
+            connection.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (now,)
+            )
+            (total,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if total > self._max_bytes:
+                self._evict(connection, total - self._max_bytes)
+
+    @staticmethod
+    def _evict(connection: sqlite3.Connection, excess: int) -> None:
+        """Deletes least recently used entries totalling at least `excess`."""
+        keys = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+
+
+def _canonicalize_filter_expression(expression) -> None:
+    """Reorders a FilterExpression protobuf in place into a canonical form.
+
+    The expressions of AND and OR groups, and the values of in-list filters,
+    are sorted since their order doesn't affect the result.
+    """
+    kind = expression.WhichOneof("expr")
+    if kind in ("and_group", "or_group"):
+        group = getattr(expression, kind)
+        for child in group.expressions:
+            _canonicalize_filter_expression(child)
+        children = sorted(
+            child.SerializeToString(deterministic=True)
+            for child in group.expressions
+        )
+        del group.expressions[:]
+        for child in children:
+            group.expressions.add().ParseFromString(child)
+    elif kind == "not_expression":
+        _canonicalize_filter_expression(expression.not_expression)
+    elif (
+        kind == "filter"
+        and expression.filter.WhichOneof("one_filter") == "in_list_filter"
+    ):
+        in_list = expression.filter.in_list_filter
+        values = sorted(set(in_list.values))
+        del in_list.values[:]
+        in_list.values.extend(values)
+
+
+def request_cache_key(request: "proto.Message") -> str:
+    """Returns a cache key for a report or metadata request.
+
+    Requests that only differ in the order of filter expressions within a
+    group, or of the values of an in-list filter, have the same key. The
+    order of dimensions, metrics, date ranges and order bys is significant
+    since it determines the layout of the response.
+
+    Keys of requests made with the credentials of a user of a shared server
+    include the user's ID.
+    """
+    original = type(request).pb(request)
+    canonical = type(original)()
+    canonical.CopyFrom(original)
+    # Requests other than reports, such as those for metadata, have no
+    # filters.
+    fields = canonical.DESCRIPTOR.fields_by_name
+    for field in ("dimension_filter", "metric_filter"):
+        if field in fields and canonical.HasField(field):
+            _canonicalize_filter_expression(getattr(canonical, field))
+    digest = hashlib.sha256(
+        canonical.SerializeToString(deterministic=True)
+    ).hexdigest()
+    user = current_user()
+    if user is not None:
+        return f"{canonical.DESCRIPTOR.name}:{user}:{digest}"
+    return f"{canonical.DESCRIPTOR.name}:{digest}"
+
+
+def handle_key(kind: str, handle_id: str) -> str:
+    """Returns the cache key of the state behind an ID returned by a tool.
+
+    Such state, like the request of a streamed report, is cached with the
+    responses so that every worker process of a server can look it up. Keys
+    of a user of a shared server include the user's ID.
+
+    Args:
+        kind: The kind of ID, such as 'streamed_report'.
+        handle_id: The ID.
+    """
+    user = current_user()
+    if user is not None:
+        return f"{kind}:{user}:{handle_id}"
+    return f"{kind}:{handle_id}"
+
+
+def _days_ago(date: str, today: datetime.date) -> int:
+    """Returns how many days before today the date of a DateRange is.
+
+    Unrecognized dates are treated as today.
+    """
+    if date == "yesterday":
+        return 1
+    match = _DAYS_AGO_PATTERN.match(date)
+    if match:
+        return int(match.group(1))
+    try:
+        # Relative dates are resolved in the property's time zone, but
+        # absolute dates are compared to the local date. Subtracts a day in
+        # case the property's time zone is ahead of the local one.
+        return (today - datetime.date.fromisoformat(date)).days - 1
+    except ValueError:
+        return 0
+
+
+def _is_relative(date: str) -> bool:
+    """Returns whether the date of a DateRange is relative to today."""
+    return date in _RELATIVE_DATES or bool(_DAYS_AGO_PATTERN.match(date))
+
+
+def _seconds_until_midnight(
+    time_zone: str, now: datetime.datetime
+) -> Optional[float]:
+    """Returns the seconds until the next midnight in the time zone.
+
+    Returns None if the time zone is unknown.
+    """
+    try:
+        zone = zoneinfo.ZoneInfo(time_zone)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return None
+    local_now = now.astimezone(zone)
+    midnight = datetime.datetime.combine(
+        local_now.date() + datetime.timedelta(days=1),
+        datetime.time(),
+        tzinfo=zone,
+    )
+    # Compared in UTC, since datetimes with the same time zone are compared
+    # by wall time, which ignores daylight saving time changes.
+    return (
+        midnight.astimezone(datetime.timezone.utc)
+        - now.astimezone(datetime.timezone.utc)
+    ).total_seconds()
+
+
+def report_ttl_seconds(
+    date_ranges: Iterable["data_v1beta.DateRange"],
+    time_zone: str = "",
+    today: Optional[datetime.date] = None,
+    now: Optional[datetime.datetime] = None,
+) -> float:
+    """Returns how long a response for the date ranges can be cached.
+
+    Relative dates such as 'yesterday' and '7daysAgo' are resolved by the
+    Data API in the property's time zone, so responses for them are only
+    cached until the next midnight there, or briefly if it's unknown.
+
+    Args:
+        date_ranges: The date ranges of the report request.
+        time_zone: The time zone of the property, as returned in the
+          metadata of the response, such as 'America/New_York'.
+        today: The current date. Defaults to the local date.
+        now: The current time. Defaults to the current time.
+    """
+    date_ranges = list(date_ranges)
+    today = today or datetime.date.today()
+    most_recent = min(
+        (_days_ago(dr.end_date, today) for dr in date_ranges), default=0
+    )
+    if most_recent <= 0:
+        ttl = _TTL_TODAY_SECONDS
+    elif most_recent <= _RECENT_DAYS:
+        ttl = _TTL_RECENT_SECONDS
+    else:
+        ttl = _TTL_HISTORICAL_SECONDS
+    if any(
+        _is_relative(dr.start_date) or _is_relative(dr.end_date)
+        for dr in date_ranges
+    ):
+        until_midnight = _seconds_until_midnight(
+            time_zone, now or datetime.datetime.now(datetime.timezone.utc)
+        )
+        ttl = min(
+            ttl,
+            _TTL_TODAY_SECONDS if until_midnight is None else until_midnight,
+        )
+    return ttl
+
+
+# In-process cache for report responses.
+report_cache = ResponseCache()
+
+# On-disk cache shared with other server processes. Created on first use.
+_disk_cache: Optional[DiskCache] = None
+
+
+def _get_disk_cache() -> Optional[DiskCache]:
+    """Returns the on-disk cache, or None if it's disabled."""
+    global _disk_cache
+    if _DISK_CACHE_ENABLED and _disk_cache is None:
+        _disk_cache = DiskCache(_DISK_CACHE_DIR)
+    return _disk_cache
+
+
+def _disk_cache_key(key: str) -> str:
+    """Returns the key of a response in the on-disk cache.
+
+    The database is shared by all server processes of the OS user, which may
+    use different credentials, so keys of responses fetched with the
+    server's own credentials include their identity. Keys of a user of a
+    shared server already include the user's ID.
+
+    Resolves the server's credentials on first use, so may block.
+    """
+    if current_user() is not None:
+        return key
+    return f"{credentials_fingerprint()}:{key}"
+
+
+async def lookup(key: str) -> Optional[bytes]:
+    """Returns the cached response for the key, or None.
+
+    Checks the in-process cache first, then the on-disk cache. Responses
+    found on disk are added to the in-process cache.
+    """
+    value = report_cache.get(key)
+    if value is not None:
+        return value
+    disk_cache = _get_disk_cache()
+    if disk_cache is None:
+        return None
+    entry = await asyncio.to_thread(
+        lambda: disk_cache.get(_disk_cache_key(key))
+    )
+    if entry is None:
+        return None
+    value, ttl_seconds = entry
+    report_cache.put(key, value, ttl_seconds)
+    return value
+
+
+async def store(key: str, value: bytes, ttl_seconds: float) -> None:
+    """Caches the response in process and, if enabled, on disk."""
+    report_cache.put(key, value, ttl_seconds)
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        await asyncio.to_thread(
+            lambda: disk_cache.put(_disk_cache_key(key), value, ttl_seconds)
+        )
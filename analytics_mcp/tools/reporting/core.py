@@ -14,33 +14,57 @@
 
 """Tools for running core reports using the Data API."""
 
-from typing import Any, Dict, List
+import asyncio
+import base64
+import json
+import uuid
+from typing import Any, Dict, List, Literal, NamedTuple
 
 from analytics_mcp.coordinator import mcp
-from analytics_mcp.tools.reporting.metadata import (
-    get_date_ranges_hints,
-    get_dimension_filter_hints,
-    get_metric_filter_hints,
-    get_order_bys_hints,
-)
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools import scheduling
+from analytics_mcp.tools.coalescing import coalescer
+from analytics_mcp.tools.reporting import aggregation, cache, hints, quota
+from analytics_mcp.tools.reporting.formats import format_report
+from analytics_mcp.tools.reporting.validation import validate_report_request
 from analytics_mcp.tools.utils import (
     construct_property_rn,
     create_data_api_client,
-    proto_to_dict,
 )
-from google.analytics import data_v1beta
 
+data_v1beta = lazy_import("google.analytics.data_v1beta")
 
-def _run_report_description() -> str:
-    """Returns the description for the `run_report` tool."""
-    return f"""
-          {run_report.__doc__}
+# Number of rows requested per page when fetching all rows of a report and no
+# `limit` is given.
+_FETCH_ALL_PAGE_SIZE = 100_000
 
-          ## Hints for arguments
+# Minimum number of rows requested per page when fetching all rows of a
+# report, so that a small `limit` doesn't split a report into thousands of
+# requests.
+_MIN_FETCH_ALL_PAGE_SIZE = 10_000
 
-          Here are some hints that outline the expected format and requirements
-          for arguments.
+# Maximum number of page requests in flight when fetching all rows of a
+# report.
+_FETCH_ALL_CONCURRENCY = 4
+
+# Maximum number of reports in a single BatchRunReports request, as defined
+# by the Data API.
+_BATCH_SIZE = 5
+
+# Number of rows per page of a streamed report if no `limit` is given.
+_STREAM_PAGE_SIZE = 10_000
+
+# Seconds that the requests behind report and result IDs are kept. They're
+# cached along with responses, so that the worker processes of a server
+# share them through the disk cache.
+_HANDLE_TTL_SECONDS = 24 * 60 * 60
+
+# URI template of the resources holding the pages of streamed reports.
+_REPORT_PAGE_URI = "analytics-report://{report_id}/pages/{page}"
 
+# Hints for the `dimensions` and `metrics` arguments of the report tools that
+# accept custom definitions.
+DIMENSIONS_AND_METRICS_HINTS = """
           ### Hints for `dimensions`
 
           The `dimensions` list must consist solely of either of the following:
@@ -62,23 +86,166 @@ def _run_report_description() -> str:
           2.  Custom metrics for the `property_id`. Use the
               `get_custom_dimensions_and_metrics` tool to retrieve the list of
               custom metrics for a property.
+"""
+
+
+class ReportKind(NamedTuple):
+    """The Data API methods and messages of a kind of report.
+
+    Messages are named rather than referenced so that defining a kind
+    doesn't import the Data API client library.
+    """
+
+    # Name of the client method that runs a single report.
+    method: str
+    # Name of the client method that runs a batch of reports.
+    batch_method: str
+    # Field of the batch response holding the reports.
+    batch_field: str
+    request_type: str
+    response_type: str
+    batch_request_type: str
+
+    @property
+    def request_class(self) -> Any:
+        """The message class of requests."""
+        return getattr(data_v1beta, self.request_type)
+
+    @property
+    def response_class(self) -> Any:
+        """The message class of responses."""
+        return getattr(data_v1beta, self.response_type)
+
+    @property
+    def batch_request_class(self) -> Any:
+        """The message class of batch requests."""
+        return getattr(data_v1beta, self.batch_request_type)
+
+
+REPORT = ReportKind(
+    method="run_report",
+    batch_method="batch_run_reports",
+    batch_field="reports",
+    request_type="RunReportRequest",
+    response_type="RunReportResponse",
+    batch_request_type="BatchRunReportsRequest",
+)
 
 
+class _StreamedReport(NamedTuple):
+    """A report whose pages are fetched one at a time as they're read."""
+
+    request: "data_v1beta.RunReportRequest"
+    row_count: int
+    page_count: int
+    cache_control: str
+    output_format: str
+
+
+async def _save_handle(
+    kind: str,
+    handle_id: str,
+    request: "data_v1beta.RunReportRequest",
+    **fields: Any,
+) -> None:
+    """Caches the request and other JSON fields behind an ID."""
+    value = {
+        "request": base64.b64encode(
+            data_v1beta.RunReportRequest.serialize(request)
+        ).decode(),
+        **fields,
+    }
+    await cache.store(
+        cache.handle_key(kind, handle_id),
+        json.dumps(value).encode(),
+        _HANDLE_TTL_SECONDS,
+    )
+
+
+async def _load_handle(kind: str, handle_id: str) -> Dict[str, Any] | None:
+    """Returns the request and other fields behind an ID, if still cached."""
+    value = await cache.lookup(cache.handle_key(kind, handle_id))
+    if value is None:
+        return None
+    fields = json.loads(value)
+    fields["request"] = data_v1beta.RunReportRequest.deserialize(
+        base64.b64decode(fields["request"])
+    )
+    return fields
+
+
+def _run_report_description() -> str:
+    """Returns the description for the `run_report` tool."""
+    return f"""
+          {run_report.__doc__}
+
+          ## Hints for arguments
+
+          Here are some hints that outline the expected format and requirements
+          for arguments.
+          {DIMENSIONS_AND_METRICS_HINTS}
+
           ### Hints for `date_ranges`:
-          {get_date_ranges_hints()}
+          {hints.DATE_RANGES_HINTS}
 
           ### Hints for `dimension_filter`:
-          {get_dimension_filter_hints()}
+          {hints.DIMENSION_FILTER_HINTS}
 
           ### Hints for `metric_filter`:
-          {get_metric_filter_hints()}
+          {hints.METRIC_FILTER_HINTS}
 
           ### Hints for `order_bys`:
-          {get_order_bys_hints()}
+          {hints.ORDER_BYS_HINTS}
 
           """
 
 
+def _build_run_report_request(
+    property_id: int | str,
+    date_ranges: List[Dict[str, str]],
+    dimensions: List[str],
+    metrics: List[str],
+    dimension_filter: Dict[str, Any] = None,
+    metric_filter: Dict[str, Any] = None,
+    order_bys: List[Dict[str, Any]] = None,
+    limit: int = None,
+    offset: int = None,
+    currency_code: str = None,
+    return_property_quota: bool = False,
+) -> "data_v1beta.RunReportRequest":
+    """Returns a RunReportRequest for the arguments of `run_report`."""
+    request = data_v1beta.RunReportRequest(
+        property=construct_property_rn(property_id),
+        dimensions=[
+            data_v1beta.Dimension(name=dimension) for dimension in dimensions
+        ],
+        metrics=[data_v1beta.Metric(name=metric) for metric in metrics],
+        date_ranges=[data_v1beta.DateRange(dr) for dr in date_ranges],
+        return_property_quota=return_property_quota,
+    )
+
+    if dimension_filter:
+        request.dimension_filter = data_v1beta.FilterExpression(
+            dimension_filter
+        )
+
+    if metric_filter:
+        request.metric_filter = data_v1beta.FilterExpression(metric_filter)
+
+    if order_bys:
+        request.order_bys = [
+            data_v1beta.OrderBy(order_by) for order_by in order_bys
+        ]
+
+    if limit:
+        request.limit = limit
+    if offset:
+        request.offset = offset
+    if currency_code:
+        request.currency_code = currency_code
+    return request
+
+
 async def run_report(
     property_id: int | str,
     date_ranges: List[Dict[str, str]],
@@ -91,6 +258,11 @@ async def run_report(
     offset: int = None,
     currency_code: str = None,
     return_property_quota: bool = False,
+    cache_control: Literal["default", "refresh", "bypass"] = "default",
+    fetch_all: bool = False,
+    max_rows: int = None,
+    output_format: Literal["proto", "columnar"] = "proto",
+    stream: bool = False,
 ) -> Dict[str, Any]:
     """Runs a Google Analytics Data API report.
 
@@ -137,40 +309,300 @@ async def run_report(
           ISO4217 format, such as "AED", "USD", "JPY". If the field is empty, the
           report uses the property's default currency.
         return_property_quota: Whether to return property quota in the response.
+          Responses that include property quota are never cached, since the
+          quota changes with every request.
+        cache_control: How to use the server's report cache. Accepted values
+          are:
+          - "default": Returns a cached response for an identical request if
+            one is available, and caches new responses. Responses are cached
+            for minutes if the date ranges include today, and for up to a day
+            for date ranges fully in the past. Responses for relative dates
+            such as "7daysAgo" are only cached until midnight in the
+            property's time zone.
+          - "refresh": Always runs the report, and caches the new response.
+          - "bypass": Always runs the report, and doesn't cache the response.
+        fetch_all: Whether to return all rows of the report instead of a
+          single page. Pages of `limit` rows (100,000 if `limit` isn't set,
+          and at least 10,000) starting at `offset` are fetched concurrently
+          and merged in order. Pages are no larger than `max_rows`. Use this
+          instead of paginating manually.
+        max_rows: When `fetch_all` is set, the maximum number of rows to
+          return. If unset, all rows are returned.
+        output_format: The format of the returned report. Accepted values are:
+          - "proto": A dictionary that mirrors the RunReportResponse
+            protobuf, with one nested dictionary per row.
+          - "columnar": A much more compact dictionary with a `headers` list
+            of dimension and metric names, and a `columns` list with one list
+            of values per header. Metric values are numbers. Prefer this
+            format for reports with many rows.
+        stream: Whether to return the report one page at a time instead of in
+          a single response. Use this for reports too large to return at once.
+          If set, returns a summary with a `report_id` and `page_count`
+          instead of the report. Read each page, from 0 to `page_count` - 1,
+          with the `get_report_page` tool or from the
+          `analytics-report://{report_id}/pages/{page}` resource. Pages hold
+          `limit` rows (10,000 if `limit` isn't set) and are fetched from the
+          API as they're read. `max_rows` limits the total number of rows.
+
+    Returns:
+        The report in the requested `output_format`, with a `result_id` that
+        can be passed to the `aggregate_report` tool to compute totals,
+        breakdowns, top-N lists and ratios from its rows. Streamed reports
+        have no `result_id`.
     """
-    request = data_v1beta.RunReportRequest(
-        property=construct_property_rn(property_id),
-        dimensions=[
-            data_v1beta.Dimension(name=dimension) for dimension in dimensions
-        ],
-        metrics=[data_v1beta.Metric(name=metric) for metric in metrics],
-        date_ranges=[data_v1beta.DateRange(dr) for dr in date_ranges],
+    request = _build_run_report_request(
+        property_id=property_id,
+        date_ranges=date_ranges,
+        dimensions=dimensions,
+        metrics=metrics,
+        dimension_filter=dimension_filter,
+        metric_filter=metric_filter,
+        order_bys=order_bys,
+        limit=limit,
+        offset=offset,
+        currency_code=currency_code,
         return_property_quota=return_property_quota,
     )
 
-    if dimension_filter:
-        request.dimension_filter = data_v1beta.FilterExpression(
-            dimension_filter
+    if stream:
+        if not limit:
+            request.limit = _STREAM_PAGE_SIZE
+        return await _start_streamed_report(
+            request, max_rows, cache_control, output_format
+        )
+    if fetch_all:
+        request.limit = max(
+            limit or _FETCH_ALL_PAGE_SIZE, _MIN_FETCH_ALL_PAGE_SIZE
         )
+        if max_rows:
+            request.limit = min(request.limit, max_rows)
+    response = await _run_report_rows(
+        request, fetch_all, max_rows, cache_control
+    )
+    result_id = aggregation.result_id(request, fetch_all, max_rows)
+    aggregation.register(result_id, response)
+    await _save_handle(
+        "result", result_id, request, fetch_all=fetch_all, max_rows=max_rows
+    )
+    result = format_report(response, output_format)
+    result["result_id"] = result_id
+    return result
 
-    if metric_filter:
-        request.metric_filter = data_v1beta.FilterExpression(metric_filter)
 
-    if order_bys:
-        request.order_bys = [
-            data_v1beta.OrderBy(order_by) for order_by in order_bys
-        ]
+async def _run_report_rows(
+    request: "data_v1beta.RunReportRequest",
+    fetch_all: bool,
+    max_rows: int | None,
+    cache_control: str,
+) -> "data_v1beta.RunReportResponse":
+    """Runs a report, fetching all its pages if `fetch_all` is set."""
+    if not fetch_all:
+        return await run_report_request(REPORT, request, cache_control)
+    # Large reports shouldn't hold up interactive calls.
+    with scheduling.priority("bulk"):
+        return await _run_report_all_pages(request, max_rows, cache_control)
 
-    if limit:
-        request.limit = limit
-    if offset:
-        request.offset = offset
-    if currency_code:
-        request.currency_code = currency_code
 
-    response = await create_data_api_client().run_report(request)
+async def load_result(
+    result_id: str,
+) -> "data_v1beta.RunReportResponse | None":
+    """Returns the report behind a `result_id` returned by `run_report`.
+
+    Used when the result isn't kept in this process, for example because
+    another worker process of the server ran the report. The report is run
+    again, but pages that are still cached aren't fetched from the API.
+
+    Returns:
+        The report, or None if its request is no longer cached.
+    """
+    handle = await _load_handle("result", result_id)
+    if handle is None:
+        return None
+    return await _run_report_rows(
+        handle["request"], handle["fetch_all"], handle["max_rows"], "default"
+    )
+
+
+async def run_report_request(
+    kind: ReportKind, request: Any, cache_control: str
+) -> Any:
+    """Runs a single report request, using the report cache if allowed.
+
+    Args:
+        kind: The kind of the report.
+        request: The report request, of the kind's request type.
+        cache_control: How to use the report cache, as described for the
+          `run_report` tool.
+
+    Returns:
+        The report response, of the kind's response type.
+    """
+    use_cache = cache_control != "bypass" and not request.return_property_quota
+    cache_key = cache.request_cache_key(request)
+    if use_cache and cache_control != "refresh":
+        cached = await cache.lookup(cache_key)
+        if cached is not None:
+            return kind.response_class.deserialize(cached)
+
+    # Identical concurrent requests share one API call. Each caller gets its
+    # own copy of the response, since responses are modified in place.
+    serialized = await coalescer.run(
+        (kind.method, cache_key),
+        lambda: _fetch_report(kind, request, cache_key, use_cache),
+    )
+    return kind.response_class.deserialize(serialized)
+
+
+async def _fetch_report(
+    kind: ReportKind, request: Any, cache_key: str, use_cache: bool
+) -> bytes:
+    """Validates and runs a report request, returning the response bytes."""
+    await validate_report_request(request)
+    response = await _send_report_request(kind, request)
+    serialized = kind.response_class.serialize(response)
+    if use_cache:
+        await cache.store(
+            cache_key,
+            serialized,
+            cache.report_ttl_seconds(
+                request.date_ranges, response.metadata.time_zone
+            ),
+        )
+    return serialized
+
+
+async def _send_report_request(kind: ReportKind, request: Any) -> Any:
+    """Sends a report request to the Data API within the property's quota.
+
+    The property quota is always requested so that the quota tracker stays
+    up to date, but is only returned if the request asked for it.
+    """
+    async with quota.tracker.reserve(request.property):
+        response = await getattr(create_data_api_client(), kind.method)(
+            kind.request_class(request, return_property_quota=True)
+        )
+    quota.tracker.record(request.property, response.property_quota)
+    if not request.return_property_quota:
+        quota.strip_property_quota(response)
+    return response
+
+
+async def _run_report_all_pages(
+    request: "data_v1beta.RunReportRequest",
+    max_rows: int | None,
+    cache_control: str,
+) -> "data_v1beta.RunReportResponse":
+    """Runs a report and merges the rows of all its pages into one response.
+
+    The first page determines the total row count. The remaining pages are
+    then requested concurrently.
+    """
+    page_size = request.limit
+    first_offset = request.offset
+    response = await run_report_request(REPORT, request, cache_control)
+
+    end = response.row_count
+    if max_rows:
+        end = min(end, first_offset + max_rows)
+    semaphore = asyncio.Semaphore(_FETCH_ALL_CONCURRENCY)
 
-    return proto_to_dict(response)
+    async def fetch_page(offset: int) -> data_v1beta.RunReportResponse:
+        page_request = data_v1beta.RunReportRequest(request)
+        page_request.offset = offset
+        async with semaphore:
+            return await run_report_request(REPORT, page_request, cache_control)
+
+    pages = await asyncio.gather(
+        *(
+            fetch_page(offset)
+            for offset in range(first_offset + page_size, end, page_size)
+        )
+    )
+    for page in pages:
+        response.rows.extend(page.rows)
+    if max_rows and len(response.rows) > max_rows:
+        del response.rows[max_rows:]
+    return response
+
+
+async def run_report_batches(
+    kind: ReportKind,
+    property_rn: str,
+    requests: List[Any],
+    cache_control: str,
+) -> List[Any]:
+    """Runs report requests for a property in batches, using the cache.
+
+    Requests whose responses are cached are served from the cache. The
+    others are validated, then sent to the Data API in batches of 5, and
+    batches run concurrently.
+
+    Args:
+        kind: The kind of the reports.
+        property_rn: The resource name of the property of the requests.
+        requests: The report requests, of the kind's request type.
+        cache_control: How to use the report cache, as described for the
+          `run_report` tool. Applies to each report separately.
+
+    Returns:
+        The report responses, in the same order as `requests`.
+    """
+    responses: List[Any] = [None] * len(requests)
+    cache_keys = [cache.request_cache_key(request) for request in requests]
+    uncached = []
+    for index, request in enumerate(requests):
+        if cache_control == "default" and not request.return_property_quota:
+            cached = await cache.lookup(cache_keys[index])
+            if cached is not None:
+                responses[index] = kind.response_class.deserialize(cached)
+                continue
+        uncached.append(index)
+    for index in uncached:
+        await validate_report_request(requests[index])
+
+    async def run_batch(indexes: List[int]) -> None:
+        async with quota.tracker.reserve(
+            property_rn, request_count=len(indexes)
+        ):
+            batch_response = await getattr(
+                create_data_api_client(), kind.batch_method
+            )(
+                kind.batch_request_class(
+                    property=property_rn,
+                    requests=[
+                        kind.request_class(
+                            requests[index], return_property_quota=True
+                        )
+                        for index in indexes
+                    ],
+                )
+            )
+        for index, response in zip(
+            indexes, getattr(batch_response, kind.batch_field)
+        ):
+            quota.tracker.record(property_rn, response.property_quota)
+            if not requests[index].return_property_quota:
+                quota.strip_property_quota(response)
+            responses[index] = response
+            if cache_control != "bypass" and not (
+                requests[index].return_property_quota
+            ):
+                await cache.store(
+                    cache_keys[index],
+                    kind.response_class.serialize(response),
+                    cache.report_ttl_seconds(
+                        requests[index].date_ranges,
+                        response.metadata.time_zone,
+                    ),
+                )
+
+    await asyncio.gather(
+        *(
+            run_batch(uncached[start : start + _BATCH_SIZE])
+            for start in range(0, len(uncached), _BATCH_SIZE)
+        )
+    )
+    return responses
 
 
 # The `run_report` tool requires a more complex description that's generated at
@@ -182,3 +614,135 @@ mcp.add_tool(
     title="Run a Google Analytics Data API report using the Data API",
     description=_run_report_description(),
 )
+
+
+async def _start_streamed_report(
+    request: "data_v1beta.RunReportRequest",
+    max_rows: int | None,
+    cache_control: str,
+    output_format: str,
+) -> Dict[str, Any]:
+    """Registers a streamed report and returns its summary.
+
+    Runs the first page to learn the row count. The page is left in the
+    report cache, so reading it doesn't run it again.
+    """
+    first_page = await run_report_request(REPORT, request, cache_control)
+    row_count = max(first_page.row_count - request.offset, 0)
+    if max_rows:
+        row_count = min(row_count, max_rows)
+    page_count = max(-(-row_count // request.limit), 1)
+
+    report_id = uuid.uuid4().hex
+    await _save_handle(
+        "streamed_report",
+        report_id,
+        request,
+        row_count=row_count,
+        page_count=page_count,
+        # The first page was just refreshed if requested, so later reads can
+        # use the cache.
+        cache_control="bypass" if cache_control == "bypass" else "default",
+        output_format=output_format,
+    )
+    return {
+        "report_id": report_id,
+        "row_count": row_count,
+        "page_size": request.limit,
+        "page_count": page_count,
+        "page_uri_template": _REPORT_PAGE_URI,
+    }
+
+
+@mcp.tool(title="Gets a page of a streamed Google Analytics Data API report")
+async def get_report_page(report_id: str, page: int) -> Dict[str, Any]:
+    """Returns a page of a report started with `run_report(stream=True)`.
+
+    Args:
+        report_id: The `report_id` returned by `run_report`.
+        page: The page number, from 0 to `page_count` - 1.
+
+    Returns:
+        A dictionary with the `page` number, the `page_count`, and the
+        `report` page in the requested output format.
+    """
+    handle = await _load_handle("streamed_report", report_id)
+    if handle is None:
+        raise ValueError(
+            f"Unknown report ID: {report_id}. Run the report again with "
+            "stream=True to get a new report ID."
+        )
+    streamed = _StreamedReport(**handle)
+    if not 0 <= page < streamed.page_count:
+        raise ValueError(
+            f"Invalid page: {page}. The report has {streamed.page_count} "
+            "pages, numbered from 0."
+        )
+    request = data_v1beta.RunReportRequest(streamed.request)
+    request.offset += page * request.limit
+    response = await run_report_request(REPORT, request, streamed.cache_control)
+    # Drops rows past `max_rows`, which can only be on the last page.
+    del response.rows[streamed.row_count - page * request.limit :]
+    return {
+        "page": page,
+        "page_count": streamed.page_count,
+        "report": format_report(response, streamed.output_format),
+    }
+
+
+@mcp.resource(
+    _REPORT_PAGE_URI,
+    name="report_page",
+    description="A page of a report started with `run_report(stream=True)`.",
+    mime_type="application/json",
+)
+async def read_report_page(report_id: str, page: str) -> str:
+    """Returns a page of a streamed report as JSON."""
+    return json.dumps(await get_report_page(report_id, int(page)))
+
+
+@mcp.tool(title="Run multiple Google Analytics Data API reports in batches")
+async def batch_run_reports(
+    property_id: int | str,
+    reports: List[Dict[str, Any]],
+    cache_control: Literal["default", "refresh", "bypass"] = "default",
+    output_format: Literal["proto", "columnar"] = "proto",
+) -> List[Dict[str, Any]]:
+    """Runs multiple Google Analytics Data API reports for a property.
+
+    Prefer this over multiple `run_report` calls when several reports are
+    needed for the same property, since it uses fewer API requests and less
+    quota. Reports are sent to the Data API in batches of 5, and batches run
+    concurrently.
+
+    Args:
+        property_id: The Google Analytics property ID. Accepted formats are:
+          - A number
+          - A string consisting of 'properties/' followed by a number
+        reports: A list of report specs. Each spec is a dictionary with the
+          same keys and formats as the arguments of the `run_report` tool,
+          except for `property_id`, `cache_control`, `fetch_all` and
+          `max_rows`. `date_ranges`, `dimensions` and `metrics` are required.
+        cache_control: How to use the server's report cache, as described for
+          the `run_report` tool. Applies to each report separately.
+        output_format: The format of the returned reports, as described for
+          the `run_report` tool.
+
+    Returns:
+        The report responses, in the same order as `reports`.
+    """
+    requests = []
+    for index, spec in enumerate(reports):
+        try:
+            requests.append(
+                _build_run_report_request(property_id=property_id, **spec)
+            )
+        except TypeError as e:
+            raise ValueError(
+                f"Invalid report spec at index {index}: {e}"
+            ) from e
+
+    responses = await run_report_batches(
+        REPORT, construct_property_rn(property_id), requests, cache_control
+    )
+    return [format_report(response, output_format) for response in responses]
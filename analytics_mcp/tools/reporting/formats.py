@@ -0,0 +1,133 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Output formats for report responses."""
+
+from typing import Any, Callable, Dict, List
+
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.utils import proto_to_dict
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+proto = lazy_import("proto")
+
+
+def _parse_float(value: str) -> float | str:
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _parse_int(value: str) -> int | str:
+    try:
+        return int(value)
+    except ValueError:
+        return _parse_float(value)
+
+
+def _metric_parser(metric_type: int) -> Callable[[str], Any]:
+    """Returns a function that parses values of the given MetricType.
+
+    Values that can't be parsed, such as those of unspecified type, are
+    returned as is.
+    """
+    if metric_type == data_v1beta.MetricType.TYPE_INTEGER:
+        return _parse_int
+    if metric_type == data_v1beta.MetricType.METRIC_TYPE_UNSPECIFIED:
+        return str
+    return _parse_float
+
+
+def _rows_to_columns(
+    rows, dimension_count: int, parsers: List[Callable[[str], Any]]
+) -> List[list]:
+    """Returns the values of the Row protobufs as one list per column.
+
+    Dimension columns come first, followed by metric columns parsed with the
+    corresponding parser.
+    """
+    columns: List[list] = [[] for _ in range(dimension_count + len(parsers))]
+    dimension_columns = columns[:dimension_count]
+    metric_columns = list(zip(columns[dimension_count:], parsers))
+    for row in rows:
+        for column, value in zip(dimension_columns, row.dimension_values):
+            column.append(value.value)
+        for (column, parse), value in zip(metric_columns, row.metric_values):
+            column.append(parse(value.value))
+    return columns
+
+
+def to_columnar(response: "proto.Message") -> Dict[str, Any]:
+    """Converts a report response to a compact, column-oriented dictionary.
+
+    Reads the underlying protobuf directly instead of converting the whole
+    response to a dictionary first.
+
+    Args:
+        response: A RunReportResponse or RunRealtimeReportResponse.
+
+    Returns:
+        A dictionary with:
+          - `headers`: The names of the dimensions followed by the names of
+            the metrics.
+          - `metric_types`: The MetricType of each metric, by name.
+          - `columns`: One list of values per header, in the same order.
+            Metric values are parsed to numbers.
+          - `row_count`: The total number of rows in the report.
+          - `totals`, `maximums` and `minimums`: Aggregate rows, in the same
+            column-oriented form, if requested.
+          - `metadata` and `property_quota`, if present in the response.
+    """
+    pb = type(response).pb(response)
+    dimension_names = [header.name for header in pb.dimension_headers]
+    metric_names = [header.name for header in pb.metric_headers]
+    parsers = [_metric_parser(header.type_) for header in pb.metric_headers]
+    columns = _rows_to_columns(pb.rows, len(dimension_names), parsers)
+
+    result: Dict[str, Any] = {
+        "headers": dimension_names + metric_names,
+        "metric_types": {
+            header.name: data_v1beta.MetricType(header.type_).name
+            for header in pb.metric_headers
+        },
+        "columns": columns,
+        "row_count": pb.row_count,
+    }
+    for aggregate in ("totals", "maximums", "minimums"):
+        rows = getattr(pb, aggregate)
+        if rows:
+            result[aggregate] = _rows_to_columns(
+                rows, len(dimension_names), parsers
+            )
+    for field in ("metadata", "property_quota"):
+        if field in pb.DESCRIPTOR.fields_by_name and pb.HasField(field):
+            result[field] = proto_to_dict(getattr(response, field))
+    return result
+
+
+def format_report(
+    response: "proto.Message", output_format: str
+) -> Dict[str, Any]:
+    """Converts a report response to a dictionary in the requested format.
+
+    Args:
+        response: A RunReportResponse or RunRealtimeReportResponse.
+        output_format: Either "proto", for a dictionary that mirrors the
+          response protobuf, or "columnar", for the format returned by
+          `to_columnar`.
+    """
+    if output_format == "columnar":
+        return to_columnar(response)
+    return proto_to_dict(response)
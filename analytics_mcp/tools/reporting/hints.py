@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hints for the arguments of the report tools.
+
+Generated from the examples in `metadata.py` by `nox -s hints` so that tool
+descriptions can be built without importing the Data API client library.
+Don't edit this file by hand.
+"""
+
+DATE_RANGES_HINTS = (
+    "Example date_range arguments:\n"
+    "      1. A single date range:\n"
+    "\n"
+    '        [ {"start_date": "2025-01-01", "end_date": "2025-01-31", "name": "Jan2025"} ]\n'
+    "\n"
+    "      2. A relative date range using 'yesterday' and 'today':\n"
+    '        [ {"start_date": "yesterday", "end_date": "today", "name": "YesterdayAndToday"} ]\n'
+    "\n"
+    "      3. A relative date range using 'NdaysAgo' and 'today':\n"
+    '        [ {"start_date": "30daysAgo", "end_date": "yesterday", "name": "Previous30Days"}]\n'
+    "\n"
+    "      4. Multiple date ranges:\n"
+    '        [ {"start_date": "2025-01-01", "end_date": "2025-01-31", "name": "Jan2025"}, {"start_date": "2025-02-01", "end_date": "2025-02-28", "name": "Feb2025"} ]\n'
+    "    "
+)
+
+DIMENSION_FILTER_HINTS = (
+    "Example dimension_filter arguments:\n"
+    "      1. A simple filter:\n"
+    '        {"filter": {"field_name": "eventName", "string_filter": {"match_type": 2, "value": "add", "case_sensitive": false}}}\n'
+    "\n"
+    "      2. A NOT filter:\n"
+    '        {"not_expression": {"filter": {"field_name": "eventName", "string_filter": {"match_type": 2, "value": "add", "case_sensitive": false}}}}\n'
+    "\n"
+    "      3. An empty value filter:\n"
+    '        {"filter": {"field_name": "source", "empty_filter": {}}}\n'
+    "\n"
+    "      4. An AND group filter:\n"
+    '        {"and_group": {"expressions": [{"filter": {"field_name": "sourceMedium", "string_filter": {"match_type": 1, "value": "google / cpc", "case_sensitive": false}}}, {"filter": {"field_name": "eventName", "in_list_filter": {"values": ["first_visit", "purchase", "add_to_cart"], "case_sensitive": true}}}]}}\n'
+    "\n"
+    "      5. An OR group filter:\n"
+    '        {"or_group": {"expressions": [{"filter": {"field_name": "sourceMedium", "string_filter": {"match_type": 1, "value": "google / cpc", "case_sensitive": false}}}, {"filter": {"field_name": "eventName", "in_list_filter": {"values": ["first_visit", "purchase", "add_to_cart"], "case_sensitive": true}}}]}}\n'
+    "\n"
+    "    \n"
+    "  Notes:\n"
+    "    The API applies the `dimension_filter` and `metric_filter`\n"
+    "    independently. As a result, some complex combinations of dimension and\n"
+    "    metric filters are not possible in a single report request.\n"
+    "\n"
+    "    For example, you can't create a `dimension_filter` and `metric_filter`\n"
+    "    combination for the following condition:\n"
+    "\n"
+    "    (\n"
+    '      (eventName = "page_view" AND eventCount > 100)\n'
+    "      OR\n"
+    '      (eventName = "join_group" AND eventCount < 50)\n'
+    "    )\n"
+    "\n"
+    "    This isn't possible because there's no way to apply the condition\n"
+    '    "eventCount > 100" only to the data with eventName of "page_view", and\n'
+    '    the condition "eventCount < 50" only to the data with eventName of\n'
+    '    "join_group".\n'
+    "\n"
+    "    More generally, you can't define a `dimension_filter` and `metric_filter`\n"
+    "    for:\n"
+    "\n"
+    "    (\n"
+    "      ((dimension condition D1) AND (metric condition M1))\n"
+    "      OR\n"
+    "      ((dimension condition D2) AND (metric condition M2))\n"
+    "    )\n"
+    "\n"
+    "    If you have complex conditions like this, either:\n"
+    "\n"
+    "    a)  Run a single report that applies a subset of the conditions that\n"
+    "        the API supports as well as the data needed to perform filtering of the\n"
+    "        API response on the client side. For example, for the condition:\n"
+    "        (\n"
+    '          (eventName = "page_view" AND eventCount > 100)\n'
+    "          OR\n"
+    '          (eventName = "join_group" AND eventCount < 50)\n'
+    "        )\n"
+    "        You could run a report that filters only on:\n"
+    '        eventName one of "page_view" or "join_group"\n'
+    "        and include the eventCount metric, then filter the API response on the\n"
+    "        client side to apply the different metric filters for the different\n"
+    "        events.\n"
+    "\n"
+    "    or\n"
+    "\n"
+    "    b)  Run a separate report for each combination of dimension condition and\n"
+    "        metric condition. For the example above, you'd run one report for the\n"
+    "        combination of (D1 AND M1), and another report for the combination of\n"
+    "        (D2 AND M2).\n"
+    "\n"
+    "    Try to run fewer reports (option a) if possible. However, if running\n"
+    "    fewer reports results in excessive quota usage for the API, use option\n"
+    "    b. More information on quota usage is at\n"
+    "    https://developers.google.com/analytics/blog/2023/data-api-quota-management.\n"
+    "  "
+)
+
+METRIC_FILTER_HINTS = (
+    "Example metric_filter arguments:\n"
+    "      1. A simple filter:\n"
+    '        {"filter": {"field_name": "eventCount", "numeric_filter": {"operation": 4, "value": {"int64_value": "10"}}}}\n'
+    "\n"
+    "      2. A NOT filter:\n"
+    '        {"not_expression": {"filter": {"field_name": "eventCount", "numeric_filter": {"operation": 4, "value": {"int64_value": "10"}}}}}\n'
+    "\n"
+    "      3. An empty value filter:\n"
+    '        {"filter": {"field_name": "purchaseRevenue", "empty_filter": {}}}\n'
+    "\n"
+    "      4. An AND group filter:\n"
+    '        {"and_group": {"expressions": [{"filter": {"field_name": "eventCount", "numeric_filter": {"operation": 4, "value": {"int64_value": "10"}}}}, {"filter": {"field_name": "purchaseRevenue", "between_filter": {"from_value": {"double_value": 10.0}, "to_value": {"double_value": 25.0}}}}]}}\n'
+    "\n"
+    "      5. An OR group filter:\n"
+    '        {"or_group": {"expressions": [{"filter": {"field_name": "eventCount", "numeric_filter": {"operation": 4, "value": {"int64_value": "10"}}}}, {"filter": {"field_name": "purchaseRevenue", "between_filter": {"from_value": {"double_value": 10.0}, "to_value": {"double_value": 25.0}}}}]}}\n'
+    "\n"
+    "    \n"
+    "  Notes:\n"
+    "    The API applies the `dimension_filter` and `metric_filter`\n"
+    "    independently. As a result, some complex combinations of dimension and\n"
+    "    metric filters are not possible in a single report request.\n"
+    "\n"
+    "    For example, you can't create a `dimension_filter` and `metric_filter`\n"
+    "    combination for the following condition:\n"
+    "\n"
+    "    (\n"
+    '      (eventName = "page_view" AND eventCount > 100)\n'
+    "      OR\n"
+    '      (eventName = "join_group" AND eventCount < 50)\n'
+    "    )\n"
+    "\n"
+    "    This isn't possible because there's no way to apply the condition\n"
+    '    "eventCount > 100" only to the data with eventName of "page_view", and\n'
+    '    the condition "eventCount < 50" only to the data with eventName of\n'
+    '    "join_group".\n'
+    "\n"
+    "    More generally, you can't define a `dimension_filter` and `metric_filter`\n"
+    "    for:\n"
+    "\n"
+    "    (\n"
+    "      ((dimension condition D1) AND (metric condition M1))\n"
+    "      OR\n"
+    "      ((dimension condition D2) AND (metric condition M2))\n"
+    "    )\n"
+    "\n"
+    "    If you have complex conditions like this, either:\n"
+    "\n"
+    "    a)  Run a single report that applies a subset of the conditions that\n"
+    "        the API supports as well as the data needed to perform filtering of the\n"
+    "        API response on the client side. For example, for the condition:\n"
+    "        (\n"
+    '          (eventName = "page_view" AND eventCount > 100)\n'
+    "          OR\n"
+    '          (eventName = "join_group" AND eventCount < 50)\n'
+    "        )\n"
+    "        You could run a report that filters only on:\n"
+    '        eventName one of "page_view" or "join_group"\n'
+    "        and include the eventCount metric, then filter the API response on the\n"
+    "        client side to apply the different metric filters for the different\n"
+    "        events.\n"
+    "\n"
+    "    or\n"
+    "\n"
+    "    b)  Run a separate report for each combination of dimension condition and\n"
+    "        metric condition. For the example above, you'd run one report for the\n"
+    "        combination of (D1 AND M1), and another report for the combination of\n"
+    "        (D2 AND M2).\n"
+    "\n"
+    "    Try to run fewer reports (option a) if possible. However, if running\n"
+    "    fewer reports results in excessive quota usage for the API, use option\n"
+    "    b. More information on quota usage is at\n"
+    "    https://developers.google.com/analytics/blog/2023/data-api-quota-management.\n"
+    "  "
+)
+
+ORDER_BYS_HINTS = (
+    "Example order_bys arguments:\n"
+    "\n"
+    "    1.  Order by ascending 'eventName':\n"
+    '        [ {"dimension": {"dimension_name": "eventName", "order_type": 1}, "desc": false} ]\n'
+    "\n"
+    "    2.  Order by descending 'eventName', ignoring case:\n"
+    '        [ {"dimension": {"dimension_name": "campaignName", "order_type": 2}, "desc": true} ]\n'
+    "\n"
+    "    3.  Order by ascending 'audienceId':\n"
+    '        [ {"dimension": {"dimension_name": "audienceId", "order_type": 3}, "desc": false} ]\n'
+    "\n"
+    "    4.  Order by descending 'eventCount':\n"
+    '        [ {"metric": {"metric_name": "eventValue"}, "desc": true} ]\n'
+    "\n"
+    "    5.  Order by ascending 'eventCount':\n"
+    '        [ {"metric": {"metric_name": "eventCount"}, "desc": false} ]\n'
+    "\n"
+    "    6.  Combination of dimension and metric order bys:\n"
+    "        [\n"
+    '          {"dimension": {"dimension_name": "eventName", "order_type": 1}, "desc": false},\n'
+    '          {"metric": {"metric_name": "eventValue"}, "desc": true},\n'
+    "        ]\n"
+    "\n"
+    "    7.  Order by multiple dimensions and metrics:\n"
+    "        [\n"
+    '          {"dimension": {"dimension_name": "eventName", "order_type": 1}, "desc": false},\n'
+    '          {"dimension": {"dimension_name": "audienceId", "order_type": 3}, "desc": false},\n'
+    '          {"metric": {"metric_name": "eventValue"}, "desc": true},\n'
+    "        ]\n"
+    "\n"
+    "    The dimensions and metrics in order_bys must also be present in the report\n"
+    '    request\'s "dimensions" and "metrics" arguments, respectively.\n'
+    "    "
+)
+
+PIVOTS_HINTS = (
+    "Example pivots arguments:\n"
+    "\n"
+    "    1.  The 10 countries with the most sessions, broken down by the first 5\n"
+    '        browsers in alphabetical order. Requires "country" and "browser" in\n'
+    '        `dimensions` and "sessions" in `metrics`:\n'
+    "        [\n"
+    '          {"field_names": ["country"], "order_bys": [{"metric": {"metric_name": "sessions"}, "desc": true}], "limit": "10", "offset": "0", "metric_aggregations": []},\n'
+    '          {"field_names": ["browser"], "order_bys": [{"dimension": {"dimension_name": "browser", "order_type": 0}, "desc": false}], "limit": "5", "offset": "0", "metric_aggregations": []},\n'
+    "        ]\n"
+    "\n"
+    "    2.  The 10 countries with the most sessions, broken down by device\n"
+    '        category, with the total of each country. Requires "country" and\n'
+    '        "deviceCategory" in `dimensions` and "sessions" in `metrics`:\n'
+    "        [\n"
+    '          {"field_names": ["country"], "order_bys": [{"metric": {"metric_name": "sessions"}, "desc": true}], "limit": "10", "offset": "0", "metric_aggregations": []},\n'
+    '          {"field_names": ["deviceCategory"], "limit": "3", "metric_aggregations": [1], "order_bys": [], "offset": "0"},\n'
+    "        ]\n"
+    "\n"
+    "    Each pivot groups the report by the dimensions in its `field_names`, and\n"
+    "    keeps the first `limit` combinations of their values in the order of its\n"
+    "    order_bys. Every dimension in `dimensions` must be in the `field_names` of\n"
+    "    exactly one pivot, and every pivot must set `limit`. The product of the\n"
+    "    limits of all pivots can't exceed 250,000. The order_bys of a pivot can\n"
+    "    only use its own dimensions and the report's metrics.\n"
+    "    "
+)
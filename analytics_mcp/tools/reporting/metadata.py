@@ -14,18 +14,34 @@
 
 """Metadata to provide context and hints for reporting tools."""
 
+import functools
 from typing import Any, Dict, List
 
 from analytics_mcp.coordinator import mcp
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.reporting import cache
+from analytics_mcp.tools.reporting.metadata_cache import MetadataCache
 from analytics_mcp.tools.utils import (
     construct_property_rn,
     create_data_api_client,
-    proto_to_dict,
     proto_to_json,
 )
-from google.analytics import data_v1beta
 
+data_v1beta = lazy_import("google.analytics.data_v1beta")
 
+# Seconds that a property's metadata is cached for. Custom definitions change
+# rarely.
+_METADATA_TTL_SECONDS = 60 * 60
+
+# Seconds that a property's metadata is still served after its TTL while it's
+# refreshed in the background.
+_METADATA_MAX_STALE_SECONDS = 24 * 60 * 60
+
+# Maximum number of properties whose metadata is cached in process.
+_MAX_METADATA_PROPERTIES = 256
+
+
+@functools.cache
 def get_date_ranges_hints():
     range_jan = data_v1beta.DateRange(
         start_date="2025-01-01", end_date="2025-01-31", name="Jan2025"
@@ -116,6 +132,7 @@ _FILTER_NOTES = """
   """
 
 
+@functools.cache
 def get_metric_filter_hints():
     """Returns hints and samples for metric_filter arguments."""
     event_count_gt_10_filter = data_v1beta.FilterExpression(
@@ -174,6 +191,7 @@ def get_metric_filter_hints():
     """ + _FILTER_NOTES
 
 
+@functools.cache
 def get_dimension_filter_hints():
     """Returns hints and samples for dimension_filter arguments."""
     begins_with = data_v1beta.FilterExpression(
@@ -238,6 +256,7 @@ def get_dimension_filter_hints():
     """ + _FILTER_NOTES
 
 
+@functools.cache
 def get_order_bys_hints():
     """Returns hints and examples for order_bys arguments."""
     dimension_alphanumeric_ascending = data_v1beta.OrderBy(
@@ -309,6 +328,147 @@ def get_order_bys_hints():
     """
 
 
+@functools.cache
+def get_pivots_hints():
+    """Returns hints and examples for pivots arguments."""
+    top_countries = data_v1beta.Pivot(
+        field_names=["country"],
+        limit=10,
+        order_bys=[
+            data_v1beta.OrderBy(
+                metric=data_v1beta.OrderBy.MetricOrderBy(
+                    metric_name="sessions"
+                ),
+                desc=True,
+            )
+        ],
+    )
+    by_browser = data_v1beta.Pivot(
+        field_names=["browser"],
+        limit=5,
+        order_bys=[
+            data_v1beta.OrderBy(
+                dimension=data_v1beta.OrderBy.DimensionOrderBy(
+                    dimension_name="browser"
+                )
+            )
+        ],
+    )
+    by_device_with_totals = data_v1beta.Pivot(
+        field_names=["deviceCategory"],
+        limit=3,
+        metric_aggregations=[data_v1beta.MetricAggregation.TOTAL],
+    )
+
+    return f"""Example pivots arguments:
+
+    1.  The 10 countries with the most sessions, broken down by the first 5
+        browsers in alphabetical order. Requires "country" and "browser" in
+        `dimensions` and "sessions" in `metrics`:
+        [
+          {proto_to_json(top_countries)},
+          {proto_to_json(by_browser)},
+        ]
+
+    2.  The 10 countries with the most sessions, broken down by device
+        category, with the total of each country. Requires "country" and
+        "deviceCategory" in `dimensions` and "sessions" in `metrics`:
+        [
+          {proto_to_json(top_countries)},
+          {proto_to_json(by_device_with_totals)},
+        ]
+
+    Each pivot groups the report by the dimensions in its `field_names`, and
+    keeps the first `limit` combinations of their values in the order of its
+    order_bys. Every dimension in `dimensions` must be in the `field_names` of
+    exactly one pivot, and every pivot must set `limit`. The product of the
+    limits of all pivots can't exceed 250,000. The order_bys of a pivot can
+    only use its own dimensions and the report's metrics.
+    """
+
+
+# The functions whose output is stored in the `hints` module, by the name of
+# the constant that holds it.
+_HINT_CONSTANTS = {
+    "DATE_RANGES_HINTS": get_date_ranges_hints,
+    "DIMENSION_FILTER_HINTS": get_dimension_filter_hints,
+    "METRIC_FILTER_HINTS": get_metric_filter_hints,
+    "ORDER_BYS_HINTS": get_order_bys_hints,
+    "PIVOTS_HINTS": get_pivots_hints,
+}
+
+_HINTS_MODULE_HEADER = '''# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hints for the arguments of the report tools.
+
+Generated from the examples in `metadata.py` by `nox -s hints` so that tool
+descriptions can be built without importing the Data API client library.
+Don't edit this file by hand.
+"""
+'''
+
+
+def render_hints_module() -> str:
+    """Returns the source code of the `hints` module.
+
+    Each hint is written as one string literal per line of text so that the
+    module stays readable and trailing whitespace is preserved.
+    """
+    source = _HINTS_MODULE_HEADER
+    for name, hint_function in _HINT_CONSTANTS.items():
+        lines = hint_function().splitlines(keepends=True)
+        literals = "".join(f"    {line!r}\n" for line in lines)
+        source += f"\n{name} = (\n{literals})\n"
+    return source
+
+
+async def _fetch_metadata(
+    property_rn: str, refresh: bool = False
+) -> "data_v1beta.Metadata":
+    """Returns the property's metadata from the cache or the Data API.
+
+    Args:
+        property_rn: The resource name of the property.
+        refresh: Whether to fetch the metadata from the Data API even if it's
+          cached, and replace the cached copy.
+    """
+    request = data_v1beta.GetMetadataRequest(name=f"{property_rn}/metadata")
+    cache_key = cache.request_cache_key(request)
+    if not refresh:
+        cached = await cache.lookup(cache_key)
+        if cached is not None:
+            return data_v1beta.Metadata.deserialize(cached)
+    metadata = await create_data_api_client().get_metadata(request)
+    await cache.store(
+        cache_key,
+        data_v1beta.Metadata.serialize(metadata),
+        _METADATA_TTL_SECONDS,
+    )
+    return metadata
+
+
+# Dimensions and metrics of recently used properties, shared by the tools
+# that need them.
+property_metadata = MetadataCache(
+    _fetch_metadata,
+    ttl_seconds=_METADATA_TTL_SECONDS,
+    max_stale_seconds=_METADATA_MAX_STALE_SECONDS,
+    max_properties=_MAX_METADATA_PROPERTIES,
+)
+
+
 @mcp.tool(
     title="Retrieves the custom Core Reporting dimensions and metrics for a specific property"
 )
@@ -323,20 +483,8 @@ async def get_custom_dimensions_and_metrics(
           - A string consisting of 'properties/' followed by a number
 
     """
-    metadata = await create_data_api_client().get_metadata(
-        name=f"{construct_property_rn(property_id)}/metadata"
-    )
-    custom_metrics = [
-        proto_to_dict(metric)
-        for metric in metadata.metrics
-        if metric.custom_definition
-    ]
-    custom_dimensions = [
-        proto_to_dict(dimension)
-        for dimension in metadata.dimensions
-        if dimension.custom_definition
-    ]
+    metadata = await property_metadata.get(construct_property_rn(property_id))
     return {
-        "custom_dimensions": custom_dimensions,
-        "custom_metrics": custom_metrics,
+        "custom_dimensions": metadata.custom_dimensions,
+        "custom_metrics": metadata.custom_metrics,
     }
@@ -0,0 +1,250 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of property metadata with stale-while-revalidate semantics."""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.utils import current_user, proto_to_dict
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+
+
+class PropertyMetadata:
+    """The dimensions and metrics of a property, indexed by API name."""
+
+    def __init__(self, metadata: "data_v1beta.Metadata"):
+        """Indexes the metadata returned by the Data API.
+
+        Args:
+            metadata: The response of a `GetMetadata` request.
+        """
+        self.dimensions: Dict[str, "data_v1beta.DimensionMetadata"] = {
+            dimension.api_name: dimension for dimension in metadata.dimensions
+        }
+        self.metrics: Dict[str, "data_v1beta.MetricMetadata"] = {
+            metric.api_name: metric for metric in metadata.metrics
+        }
+        # Converted up front since they're returned by every call of
+        # `get_custom_dimensions_and_metrics`.
+        self.custom_dimensions: List[Dict[str, Any]] = [
+            proto_to_dict(dimension)
+            for dimension in self.dimensions.values()
+            if dimension.custom_definition
+        ]
+        self.custom_metrics: List[Dict[str, Any]] = [
+            proto_to_dict(metric)
+            for metric in self.metrics.values()
+            if metric.custom_definition
+        ]
+
+
+class _Entry(NamedTuple):
+    """Cached metadata and when it was fetched, in monotonic seconds."""
+
+    metadata: PropertyMetadata
+    fetched_at: float
+
+
+# Key of cached metadata: the user, if any, and the property.
+_Key = Tuple[Optional[str], str]
+
+
+class MetadataCache:
+    """Caches the metadata of the most recently used properties.
+
+    Metadata younger than the TTL is served from the cache. Older metadata
+    is still served, but refreshed in the background so that the next call
+    gets the new version. Only metadata that's more than `max_stale_seconds`
+    past its TTL, or isn't cached, makes the caller wait for a fetch.
+    Concurrent fetches of the same property share one request.
+
+    Metadata is cached per user of a shared server, since it's fetched with
+    the user's credentials.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., Awaitable["data_v1beta.Metadata"]],
+        ttl_seconds: float,
+        max_stale_seconds: float,
+        max_properties: int,
+    ):
+        """Initializes the cache.
+
+        Args:
+            fetch: Returns the metadata of a property, given its resource
+              name and a `refresh` keyword argument. `refresh` is True when
+              copies of the metadata cached elsewhere must not be used.
+            ttl_seconds: How long fetched metadata is considered fresh.
+            max_stale_seconds: How long metadata is served past its TTL while
+              it's refreshed in the background.
+            max_properties: Least recently used properties are evicted once
+              more than this many are cached.
+        """
+        self._fetch = fetch
+        self._ttl_seconds = ttl_seconds
+        self._max_stale_seconds = max_stale_seconds
+        self._max_properties = max_properties
+        # Entries by user and property, least recently used first.
+        self._entries: "collections.OrderedDict[_Key, _Entry]" = (
+            collections.OrderedDict()
+        )
+        # Fetches in flight, by user and property, and forced refreshes in
+        # flight.
+        self._fetches: Dict[_Key, "asyncio.Task[PropertyMetadata]"] = {}
+        self._forced_refreshes: Dict[_Key, "asyncio.Task[PropertyMetadata]"] = (
+            {}
+        )
+        # References to background refreshes so they aren't garbage
+        # collected before they complete.
+        self._background: Set["asyncio.Task[PropertyMetadata]"] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    async def get(self, property_rn: str) -> PropertyMetadata:
+        """Returns the metadata of the property.
+
+        Args:
+            property_rn: The resource name of the property, such as
+              'properties/123'.
+
+        Raises:
+            Any error raised by `fetch` if the metadata had to be fetched.
+        """
+        key = (current_user(), property_rn)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self._ttl_seconds + self._max_stale_seconds:
+                self._entries.move_to_end(key)
+                if age < self._ttl_seconds:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key)
+                return entry.metadata
+        self.misses += 1
+        # Shielded so that a cancelled caller doesn't cancel the fetch for
+        # other callers waiting on it.
+        return await asyncio.shield(self._start_fetch(key))
+
+    async def refresh(self, property_rn: str) -> PropertyMetadata:
+        """Fetches and returns the metadata of the property, even if cached.
+
+        Used when cached metadata may be missing definitions created since
+        it was fetched, so copies cached elsewhere, such as in the report
+        cache, aren't used either. Concurrent refreshes of the property share
+        one fetch.
+
+        Args:
+            property_rn: The resource name of the property, such as
+              'properties/123'.
+
+        Raises:
+            Any error raised by `fetch`.
+        """
+        key = (current_user(), property_rn)
+        return await asyncio.shield(self._start_fetch(key, refresh=True))
+
+    def clear(self) -> None:
+        """Removes all cached metadata."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and number of cached properties."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "properties": len(self._entries),
+        }
+
+    def _start_fetch(
+        self, key: "_Key", refresh: bool = False
+    ) -> "asyncio.Task[PropertyMetadata]":
+        """Returns the property's fetch in flight, starting one if needed.
+
+        The fetch runs with the credentials of the caller that starts it,
+        which are those of the user in the key. Forced refreshes don't join
+        other fetches, which may return copies cached elsewhere.
+        """
+        fetches = self._forced_refreshes if refresh else self._fetches
+        task = fetches.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, refresh))
+            fetches[key] = task
+            task.add_done_callback(lambda _: fetches.pop(key, None))
+        return task
+
+    def _refresh_in_background(self, key: "_Key") -> None:
+        """Refreshes the metadata of the property without waiting for it."""
+        if key in self._fetches:
+            return
+        task = self._start_fetch(key)
+        self._background.add(task)
+        task.add_done_callback(self._finish_background_refresh)
+
+    def _finish_background_refresh(
+        self, task: "asyncio.Task[PropertyMetadata]"
+    ) -> None:
+        """Logs the error of a failed background refresh.
+
+        The stale metadata stays cached, so the refresh is retried the next
+        time the property is used.
+        """
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.getLogger(__name__).warning(
+                "Failed to refresh property metadata",
+                exc_info=task.exception(),
+            )
+
+    async def _fetch_and_store(
+        self, key: "_Key", refresh: bool
+    ) -> PropertyMetadata:
+        """Fetches and caches the metadata of the property."""
+        self.refreshes += 1
+        try:
+            metadata = PropertyMetadata(
+                await self._fetch(key[1], refresh=refresh)
+            )
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        self._entries[key] = _Entry(metadata, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_properties:
+            self._entries.popitem(last=False)
+        return metadata
@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools for running pivot reports using the Data API."""
+
+from typing import Any, Dict, List, Literal
+
+from analytics_mcp.coordinator import mcp
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.reporting import core, hints
+from analytics_mcp.tools.utils import construct_property_rn, proto_to_dict
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+
+# The Data API methods and messages of pivot reports.
+_PIVOT_REPORT = core.ReportKind(
+    method="run_pivot_report",
+    batch_method="batch_run_pivot_reports",
+    batch_field="pivot_reports",
+    request_type="RunPivotReportRequest",
+    response_type="RunPivotReportResponse",
+    batch_request_type="BatchRunPivotReportsRequest",
+)
+
+
+def _run_pivot_report_description() -> str:
+    """Returns the description for the `run_pivot_report` tool."""
+    return f"""
+          {run_pivot_report.__doc__}
+
+          ## Hints for arguments
+
+          Here are some hints that outline the expected format and requirements
+          for arguments.
+          {core.DIMENSIONS_AND_METRICS_HINTS}
+
+          ### Hints for `pivots`:
+          {hints.PIVOTS_HINTS}
+
+          ### Hints for `date_ranges`:
+          {hints.DATE_RANGES_HINTS}
+
+          ### Hints for `dimension_filter`:
+          {hints.DIMENSION_FILTER_HINTS}
+
+          ### Hints for `metric_filter`:
+          {hints.METRIC_FILTER_HINTS}
+
+          ### Hints for the `order_bys` of pivots:
+          {hints.ORDER_BYS_HINTS}
+
+          """
+
+
+def _build_run_pivot_report_request(
+    property_id: int | str,
+    date_ranges: List[Dict[str, str]],
+    dimensions: List[str],
+    metrics: List[str],
+    pivots: List[Dict[str, Any]],
+    dimension_filter: Dict[str, Any] = None,
+    metric_filter: Dict[str, Any] = None,
+    currency_code: str = None,
+    keep_empty_rows: bool = False,
+    return_property_quota: bool = False,
+) -> "data_v1beta.RunPivotReportRequest":
+    """Returns a RunPivotReportRequest for the arguments of the tool."""
+    request = data_v1beta.RunPivotReportRequest(
+        property=construct_property_rn(property_id),
+        dimensions=[
+            data_v1beta.Dimension(name=dimension) for dimension in dimensions
+        ],
+        metrics=[data_v1beta.Metric(name=metric) for metric in metrics],
+        date_ranges=[data_v1beta.DateRange(dr) for dr in date_ranges],
+        pivots=[data_v1beta.Pivot(pivot) for pivot in pivots],
+        keep_empty_rows=keep_empty_rows,
+        return_property_quota=return_property_quota,
+    )
+
+    if dimension_filter:
+        request.dimension_filter = data_v1beta.FilterExpression(
+            dimension_filter
+        )
+
+    if metric_filter:
+        request.metric_filter = data_v1beta.FilterExpression(metric_filter)
+
+    if currency_code:
+        request.currency_code = currency_code
+    return request
+
+
+async def run_pivot_report(
+    property_id: int | str,
+    date_ranges: List[Dict[str, str]],
+    dimensions: List[str],
+    metrics: List[str],
+    pivots: List[Dict[str, Any]],
+    dimension_filter: Dict[str, Any] = None,
+    metric_filter: Dict[str, Any] = None,
+    currency_code: str = None,
+    keep_empty_rows: bool = False,
+    return_property_quota: bool = False,
+    cache_control: Literal["default", "refresh", "bypass"] = "default",
+) -> Dict[str, Any]:
+    """Runs a Google Analytics Data API pivot report.
+
+    Pivoting happens in the Data API, so prefer this over `run_report` when
+    a report is needed as a cross-tabulation, such as sessions per country
+    and browser: the response is much smaller than the equivalent flat
+    report. See
+    https://developers.google.com/analytics/devguides/reporting/data/v1/pivots
+    for more information.
+
+    Field names passed to this method should be in snake_case since the tool
+    is using the protocol buffers (protobuf) format.
+
+    Args:
+        property_id: The Google Analytics property ID. Accepted formats are:
+          - A number
+          - A string consisting of 'properties/' followed by a number
+        date_ranges: A list of date ranges
+          (https://developers.google.com/analytics/devguides/reporting/data/v1/rest/v1beta/DateRange)
+          to include in the report.
+        dimensions: A list of dimensions to include in the report. Each
+          dimension must be in exactly one of the `pivots`.
+        metrics: A list of metrics to include in the report.
+        pivots: A list of Data API Pivot
+          (https://developers.google.com/analytics/devguides/reporting/data/v1/rest/v1beta/Pivot)
+          objects that describe how the dimensions are grouped. Each pivot has
+          `field_names`, a required `limit`, and optional `order_bys`,
+          `offset` and `metric_aggregations`.
+        dimension_filter: A Data API FilterExpression
+          (https://developers.google.com/analytics/devguides/reporting/data/v1/rest/v1beta/FilterExpression)
+          to apply to the dimensions.  Don't use this for filtering metrics. Use
+          metric_filter instead.
+        metric_filter: A Data API FilterExpression
+          (https://developers.google.com/analytics/devguides/reporting/data/v1/rest/v1beta/FilterExpression)
+          to apply to the metrics.  Don't use this for filtering dimensions. Use
+          dimension_filter instead.
+        currency_code: The currency code to use for currency values. Must be in
+          ISO4217 format, such as "AED", "USD", "JPY". If the field is empty, the
+          report uses the property's default currency.
+        keep_empty_rows: Whether to return rows whose metric values are all 0.
+        return_property_quota: Whether to return property quota in the response.
+          Responses that include property quota are never cached.
+        cache_control: How to use the server's report cache, as described for
+          the `run_report` tool.
+    """
+    request = _build_run_pivot_report_request(
+        property_id=property_id,
+        date_ranges=date_ranges,
+        dimensions=dimensions,
+        metrics=metrics,
+        pivots=pivots,
+        dimension_filter=dimension_filter,
+        metric_filter=metric_filter,
+        currency_code=currency_code,
+        keep_empty_rows=keep_empty_rows,
+        return_property_quota=return_property_quota,
+    )
+    response = await core.run_report_request(
+        _PIVOT_REPORT, request, cache_control
+    )
+    return proto_to_dict(response)
+
+
+# Uses the `add_tool` method instead of an annotation so that the description
+# can include the argument hints, as for `run_report`.
+mcp.add_tool(
+    run_pivot_report,
+    title="Run a Google Analytics Data API pivot report using the Data API",
+    description=_run_pivot_report_description(),
+)
+
+
+@mcp.tool(title="Run multiple Google Analytics Data API pivot reports")
+async def batch_run_pivot_reports(
+    property_id: int | str,
+    reports: List[Dict[str, Any]],
+    cache_control: Literal["default", "refresh", "bypass"] = "default",
+) -> List[Dict[str, Any]]:
+    """Runs multiple Google Analytics Data API pivot reports for a property.
+
+    Prefer this over multiple `run_pivot_report` calls when several pivot
+    reports are needed for the same property. Reports are sent to the Data
+    API in batches of 5, and batches run concurrently.
+
+    Args:
+        property_id: The Google Analytics property ID. Accepted formats are:
+          - A number
+          - A string consisting of 'properties/' followed by a number
+        reports: A list of report specs. Each spec is a dictionary with the
+          same keys and formats as the arguments of the `run_pivot_report`
+          tool, except for `property_id` and `cache_control`. `date_ranges`,
+          `dimensions`, `metrics` and `pivots` are required.
+        cache_control: How to use the server's report cache, as described for
+          the `run_report` tool. Applies to each report separately.
+
+    Returns:
+        The pivot report responses, in the same order as `reports`.
+    """
+    requests = []
+    for index, spec in enumerate(reports):
+        try:
+            requests.append(
+                _build_run_pivot_report_request(property_id=property_id, **spec)
+            )
+        except TypeError as e:
+            raise ValueError(
+                f"Invalid report spec at index {index}: {e}"
+            ) from e
+
+    responses = await core.run_report_batches(
+        _PIVOT_REPORT,
+        construct_property_rn(property_id),
+        requests,
+        cache_control,
+    )
+    return [proto_to_dict(response) for response in responses]
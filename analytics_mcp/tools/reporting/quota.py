@@ -0,0 +1,251 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tracking of Data API property quotas.
+
+Every report request asks the Data API for the property's quota status. The
+latest status of each property is kept in memory and used to reject requests
+locally, with an explanation, when the tokens left for the hour or day
+wouldn't cover them, instead of sending requests that fail with
+`RESOURCE_EXHAUSTED`. Concurrent requests are limited by
+`analytics_mcp.tools.scheduling`.
+
+Core and realtime reports have separate quotas, so they're tracked
+separately. See
+https://developers.google.com/analytics/devguides/reporting/data/v1/quotas.
+"""
+
+import contextlib
+import datetime
+import logging
+import time
+import zoneinfo
+from typing import (
+    AsyncIterator,
+    Dict,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from analytics_mcp.lazy_imports import lazy_import
+
+api_exceptions = lazy_import("google.api_core.exceptions")
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+
+# The kinds of reports that have separate quotas.
+QuotaCategory = Literal["core", "realtime"]
+
+# Tokens a request is assumed to use until the Data API reports the tokens
+# used by requests for the property.
+_DEFAULT_REQUEST_TOKENS = 10.0
+
+# Weight of the latest request in the moving average of tokens per request.
+_REQUEST_TOKENS_SMOOTHING = 0.2
+
+# A warning is logged when the tokens left would cover fewer than this many
+# requests.
+_LOW_QUOTA_REQUESTS = 10
+
+
+def _pacific_time() -> datetime.tzinfo:
+    """Returns the time zone in which daily quotas reset."""
+    try:
+        return zoneinfo.ZoneInfo("America/Los_Angeles")
+    except zoneinfo.ZoneInfoNotFoundError:
+        # No time zone database, as on Windows without the tzdata package.
+        return datetime.timezone(datetime.timedelta(hours=-8))
+
+
+# Daily quotas reset at midnight Pacific Time.
+_QUOTA_TIMEZONE = _pacific_time()
+
+
+class QuotaExhaustedError(Exception):
+    """Raised instead of sending a request that the quota wouldn't allow."""
+
+
+class _Budget(NamedTuple):
+    """Tokens left for a period, and when the period ends in epoch seconds."""
+
+    remaining: int
+    resets_at: float
+
+
+def _next_hour(now: float) -> float:
+    """Returns when an hourly quota observed at `now` is known to reset."""
+    # The Data API doesn't say when hourly quotas are replenished, so the
+    # observed status is assumed to hold for at most an hour.
+    return now + 60 * 60
+
+
+def _next_day(now: float) -> float:
+    """Returns the next midnight Pacific Time after `now`."""
+    local = datetime.datetime.fromtimestamp(now, _QUOTA_TIMEZONE)
+    midnight = datetime.datetime.combine(
+        local.date() + datetime.timedelta(days=1),
+        datetime.time(),
+        tzinfo=_QUOTA_TIMEZONE,
+    )
+    return midnight.timestamp()
+
+
+class _PropertyQuota:
+    """The quota status of one property for one category of reports."""
+
+    def __init__(self):
+        # Estimated tokens of the requests in flight.
+        self.reserved_tokens = 0.0
+        self.request_tokens = _DEFAULT_REQUEST_TOKENS
+        self.budgets: Dict[str, _Budget] = {}
+
+    def check(self, name: str, request_count: int) -> None:
+        """Raises an error if the tokens left can't cover the requests."""
+        now = time.time()
+        needed = self.request_tokens * request_count
+        for period, budget in self.budgets.items():
+            if budget.resets_at <= now:
+                continue
+            available = budget.remaining - self.reserved_tokens
+            if available < needed:
+                minutes = max(1, round((budget.resets_at - now) / 60))
+                raise QuotaExhaustedError(
+                    f"Quota nearly exhausted: {name} has"
+                    f" {budget.remaining} {period.replace('_', ' ')} left,"
+                    f" and this request needs about {round(needed)}. The"
+                    f" quota resets in at most {minutes} minutes. Run fewer"
+                    " or smaller reports, or try again later."
+                )
+            if available - needed < self.request_tokens * _LOW_QUOTA_REQUESTS:
+                logging.getLogger(__name__).warning(
+                    "Only %d %s left for %s",
+                    budget.remaining,
+                    period.replace("_", " "),
+                    name,
+                )
+
+    def record(self, property_quota: "data_v1beta.PropertyQuota") -> None:
+        """Updates the status from the quota returned with a response."""
+        now = time.time()
+        consumed = 0
+        for period, resets_at in (
+            ("tokens_per_hour", _next_hour(now)),
+            ("tokens_per_project_per_hour", _next_hour(now)),
+            ("tokens_per_day", _next_day(now)),
+        ):
+            status = getattr(property_quota, period)
+            if status.consumed or status.remaining:
+                self.budgets[period] = _Budget(status.remaining, resets_at)
+                consumed = max(consumed, status.consumed)
+        if consumed:
+            self.request_tokens += _REQUEST_TOKENS_SMOOTHING * (
+                consumed - self.request_tokens
+            )
+
+    def mark_exhausted(self, message: str) -> None:
+        """Records that the Data API rejected a request for lack of quota."""
+        now = time.time()
+        if "per day" in message.lower():
+            period, resets_at = "tokens_per_day", _next_day(now)
+        elif "concurrent" in message.lower():
+            # The request can be retried once others complete.
+            return
+        else:
+            period, resets_at = "tokens_per_hour", _next_hour(now)
+        self.budgets[period] = _Budget(0, resets_at)
+
+
+class QuotaTracker:
+    """Tracks the quota of each property and throttles requests with it."""
+
+    def __init__(self):
+        self._quotas: Dict[Tuple[str, QuotaCategory], _PropertyQuota] = {}
+
+    def _quota(
+        self, property_rn: str, category: QuotaCategory
+    ) -> _PropertyQuota:
+        key = (property_rn, category)
+        quota = self._quotas.get(key)
+        if quota is None:
+            quota = self._quotas[key] = _PropertyQuota()
+        return quota
+
+    @contextlib.asynccontextmanager
+    async def reserve(
+        self,
+        property_rn: str,
+        category: QuotaCategory = "core",
+        request_count: int = 1,
+    ) -> AsyncIterator[None]:
+        """Reserves quota for sending requests for a property.
+
+        Args:
+            property_rn: The resource name of the property.
+            category: The kind of reports being requested.
+            request_count: The number of reports in the request, for batch
+              requests.
+
+        Raises:
+            QuotaExhaustedError: If the tokens left for the property
+              wouldn't cover the requests, or if the Data API rejected them
+              with `RESOURCE_EXHAUSTED`.
+        """
+        quota = self._quota(property_rn, category)
+        name = f"{property_rn} ({category} reports)"
+        quota.check(name, request_count)
+        tokens = quota.request_tokens * request_count
+        quota.reserved_tokens += tokens
+        try:
+            yield
+        except api_exceptions.ResourceExhausted as e:
+            quota.mark_exhausted(str(e))
+            raise QuotaExhaustedError(
+                f"The Data API quota of {name} is exhausted: {e.message}"
+            ) from e
+        finally:
+            quota.reserved_tokens -= tokens
+
+    def record(
+        self,
+        property_rn: str,
+        property_quota: "data_v1beta.PropertyQuota",
+        category: QuotaCategory = "core",
+    ) -> None:
+        """Updates the quota of a property from a response."""
+        self._quota(property_rn, category).record(property_quota)
+
+    def status(
+        self, property_rn: str, category: QuotaCategory = "core"
+    ) -> Optional[Dict[str, Dict[str, float]]]:
+        """Returns the last known token budgets of a property, or None."""
+        quota = self._quotas.get((property_rn, category))
+        if quota is None:
+            return None
+        return {
+            period: budget._asdict() for period, budget in quota.budgets.items()
+        }
+
+    def clear(self) -> None:
+        """Forgets the quota of all properties."""
+        self._quotas.clear()
+
+
+# Quota of the properties used by this server.
+tracker = QuotaTracker()
+
+
+def strip_property_quota(response) -> None:
+    """Removes the property quota from a report response in place."""
+    type(response).pb(response).ClearField("property_quota")
@@ -14,21 +14,18 @@
 
 """Tools for running realtime reports using the Data API."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal
 
 from analytics_mcp.coordinator import mcp
+from analytics_mcp.lazy_imports import lazy_import
 from analytics_mcp.tools.utils import (
     construct_property_rn,
     create_data_api_client,
-    proto_to_dict,
 )
-from analytics_mcp.tools.reporting.metadata import (
-    get_date_ranges_hints,
-    get_dimension_filter_hints,
-    get_metric_filter_hints,
-    get_order_bys_hints,
-)
-from google.analytics import data_v1beta
+from analytics_mcp.tools.reporting import hints, quota
+from analytics_mcp.tools.reporting.formats import format_report
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
 
 
 def _run_realtime_report_description() -> str:
@@ -63,16 +60,16 @@ def _run_realtime_report_description() -> str:
           Realtime reports can't use custom metrics.
 
           ### Hints for `date_ranges`:
-          {get_date_ranges_hints()}
+          {hints.DATE_RANGES_HINTS}
 
           ### Hints for `dimension_filter`:
-          {get_dimension_filter_hints()}
+          {hints.DIMENSION_FILTER_HINTS}
 
           ### Hints for `metric_filter`:
-          {get_metric_filter_hints()}
+          {hints.METRIC_FILTER_HINTS}
 
           ### Hints for `order_bys`:
-          {get_order_bys_hints()}
+          {hints.ORDER_BYS_HINTS}
 
 """
 
@@ -87,6 +84,7 @@ async def run_realtime_report(
     limit: int = None,
     offset: int = None,
     return_property_quota: bool = False,
+    output_format: Literal["proto", "columnar"] = "proto",
 ) -> Dict[str, Any]:
     """Runs a Google Analytics Data API realtime report.
 
@@ -130,6 +128,12 @@ async def run_realtime_report(
           reports, following the guide at
           https://developers.google.com/analytics/devguides/reporting/data/v1/basics#pagination.
         return_property_quota: Whether to return realtime property quota in the response.
+        output_format: The format of the returned report. Accepted values are:
+          - "proto": A dictionary that mirrors the RunRealtimeReportResponse
+            protobuf, with one nested dictionary per row.
+          - "columnar": A much more compact dictionary with a `headers` list
+            of dimension and metric names, and a `columns` list with one list
+            of values per header. Metric values are numbers.
     """
     request = data_v1beta.RunRealtimeReportRequest(
         property=construct_property_rn(property_id),
@@ -158,8 +162,17 @@ async def run_realtime_report(
     if offset:
         request.offset = offset
 
-    response = await create_data_api_client().run_realtime_report(request)
-    return proto_to_dict(response)
+    # Always requests the quota so that the quota tracker stays up to date.
+    async with quota.tracker.reserve(request.property, "realtime"):
+        response = await create_data_api_client().run_realtime_report(
+            data_v1beta.RunRealtimeReportRequest(
+                request, return_property_quota=True
+            )
+        )
+    quota.tracker.record(request.property, response.property_quota, "realtime")
+    if not return_property_quota:
+        quota.strip_property_quota(response)
+    return format_report(response, output_format)
 
 
 # The `run_realtime_report` tool requires a more complex description that's generated at
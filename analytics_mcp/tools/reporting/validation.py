@@ -0,0 +1,352 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Validation of report requests against the metadata of the property.
+
+Requests with unknown or misplaced dimensions and metrics, or, if enabled,
+with incompatible fields, are rejected before they're sent to the Data API,
+so they don't use quota. Validation is best effort: if the metadata or
+compatibility of fields can't be retrieved, the request is sent anyway and
+the Data API reports any error.
+"""
+
+import collections
+import difflib
+import logging
+import os
+import time
+from typing import Iterator, List, Optional, Set, Tuple
+
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.reporting.metadata import property_metadata
+from analytics_mcp.tools.reporting.metadata_cache import PropertyMetadata
+from analytics_mcp.tools.utils import create_data_api_client, current_user
+
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+api_exceptions = lazy_import("google.api_core.exceptions")
+auth_exceptions = lazy_import("google.auth.exceptions")
+
+# Whether report requests are validated before they're sent.
+_VALIDATE_REPORTS = os.environ.get(
+    "ANALYTICS_MCP_VALIDATE_REPORTS", "true"
+).lower() in ("1", "true")
+
+# Whether the compatibility of the fields of report requests is checked with
+# the Data API before they're sent. Off by default since each new set of
+# fields adds a CheckCompatibility call before the report.
+_CHECK_COMPATIBILITY = os.environ.get(
+    "ANALYTICS_MCP_CHECK_COMPATIBILITY", ""
+).lower() in ("1", "true")
+
+# Prefixes of custom dimensions and metrics, which are listed in the metadata
+# of the property. Other names with a colon, such as 'keyEvents:purchase', are
+# parameterized versions of standard fields and aren't checked.
+_CUSTOM_PREFIXES = ("customEvent:", "customUser:", "customItem:")
+
+# Seconds that the result of a compatibility check is reused for, and the
+# maximum number of results kept.
+_COMPATIBILITY_TTL_SECONDS = 60 * 60
+_MAX_COMPATIBILITY_RESULTS = 1024
+
+# Key for the compatibility of the fields used by a request: the user, if
+# any, the property, then the request's dimensions, metrics, dimension filter
+# fields and metric filter fields, each sorted.
+_CompatibilityKey = Tuple[
+    Optional[str],
+    str,
+    Tuple[str, ...],
+    Tuple[str, ...],
+    Tuple[str, ...],
+    Tuple[str, ...],
+]
+
+# Maps keys to (expiration time, why the fields are incompatible or None),
+# least recently used first.
+_compatibility_results: (
+    "collections.OrderedDict[_CompatibilityKey, Tuple[float, Optional[str]]]"
+) = collections.OrderedDict()
+
+
+def _filter_field_names(expression) -> Iterator[str]:
+    """Yields the field names of the filters in a FilterExpression protobuf."""
+    kind = expression.WhichOneof("expr")
+    if kind in ("and_group", "or_group"):
+        for child in getattr(expression, kind).expressions:
+            yield from _filter_field_names(child)
+    elif kind == "not_expression":
+        yield from _filter_field_names(expression.not_expression)
+    elif kind == "filter":
+        yield expression.filter.field_name
+
+
+def _unknown_field_message(
+    kind: str, name: str, metadata: PropertyMetadata
+) -> str:
+    """Returns an error message for an unknown dimension or metric."""
+    known = metadata.dimensions if kind == "dimension" else metadata.metrics
+    other_kind, other = (
+        ("metric", metadata.metrics)
+        if kind == "dimension"
+        else ("dimension", metadata.dimensions)
+    )
+    if name in other:
+        return f"'{name}' is a {other_kind}, not a {kind}."
+    message = f"Unknown {kind} '{name}'."
+    suggestions = difflib.get_close_matches(name, known, n=3)
+    if suggestions:
+        quoted = " or ".join(f"'{suggestion}'" for suggestion in suggestions)
+        message += f" Did you mean {quoted}?"
+    return message
+
+
+def _is_known(name: str, known) -> bool:
+    """Returns whether the name is in the metadata or can't be checked."""
+    return name in known or (
+        ":" in name and not name.startswith(_CUSTOM_PREFIXES)
+    )
+
+
+def check_fields(
+    request: "data_v1beta.RunReportRequest", metadata: PropertyMetadata
+) -> List[str]:
+    """Returns errors for fields of the request that can't be used.
+
+    Checks that dimensions, metrics and the fields of filters exist for the
+    property, and that the fields of order bys and pivots are in the request.
+
+    Args:
+        request: The report request, or a RunPivotReportRequest.
+        metadata: The metadata of the request's property.
+
+    Returns:
+        One message per error, or an empty list if the request is valid.
+    """
+    pb = type(request).pb(request)
+    errors = []
+    dimension_names = set()
+    for dimension in pb.dimensions:
+        dimension_names.add(dimension.name)
+        if not dimension.HasField("dimension_expression") and not _is_known(
+            dimension.name, metadata.dimensions
+        ):
+            errors.append(
+                _unknown_field_message("dimension", dimension.name, metadata)
+            )
+    if len(pb.date_ranges) > 1:
+        # Added to the response of reports with multiple date ranges.
+        dimension_names.add("dateRange")
+    metric_names = set()
+    for metric in pb.metrics:
+        metric_names.add(metric.name)
+        if not metric.expression and not _is_known(
+            metric.name, metadata.metrics
+        ):
+            errors.append(
+                _unknown_field_message("metric", metric.name, metadata)
+            )
+    if pb.HasField("dimension_filter"):
+        for name in _filter_field_names(pb.dimension_filter):
+            if name not in dimension_names and not _is_known(
+                name, metadata.dimensions
+            ):
+                errors.append(
+                    "dimension_filter: "
+                    + _unknown_field_message("dimension", name, metadata)
+                )
+    if pb.HasField("metric_filter"):
+        for name in _filter_field_names(pb.metric_filter):
+            if name not in metric_names and not _is_known(
+                name, metadata.metrics
+            ):
+                errors.append(
+                    "metric_filter: "
+                    + _unknown_field_message("metric", name, metadata)
+                )
+    if "pivots" in pb.DESCRIPTOR.fields_by_name:
+        order_bys = []
+        for pivot in pb.pivots:
+            order_bys.extend(pivot.order_bys)
+            for name in pivot.field_names:
+                if name not in dimension_names:
+                    errors.append(
+                        f"pivots: Dimension '{name}' must also be in"
+                        " `dimensions`."
+                    )
+    else:
+        order_bys = pb.order_bys
+    for order_by in order_bys:
+        kind = order_by.WhichOneof("one_order_by")
+        if kind == "dimension":
+            name = order_by.dimension.dimension_name
+            if name not in dimension_names:
+                errors.append(
+                    f"order_bys: Dimension '{name}' must also be in"
+                    " `dimensions`."
+                )
+        elif kind == "metric":
+            name = order_by.metric.metric_name
+            if name not in metric_names:
+                errors.append(
+                    f"order_bys: Metric '{name}' must also be in `metrics`."
+                )
+    return errors
+
+
+def _compatibility_key(
+    request: "data_v1beta.RunReportRequest",
+) -> _CompatibilityKey:
+    """Returns the key for the compatibility of the request's fields."""
+    pb = type(request).pb(request)
+    dimension_filter_fields: Set[str] = set()
+    if pb.HasField("dimension_filter"):
+        dimension_filter_fields.update(_filter_field_names(pb.dimension_filter))
+    metric_filter_fields: Set[str] = set()
+    if pb.HasField("metric_filter"):
+        metric_filter_fields.update(_filter_field_names(pb.metric_filter))
+    return (
+        current_user(),
+        pb.property,
+        tuple(sorted({dimension.name for dimension in pb.dimensions})),
+        tuple(sorted({metric.name for metric in pb.metrics})),
+        tuple(sorted(dimension_filter_fields)),
+        tuple(sorted(metric_filter_fields)),
+    )
+
+
+def _request_fields(key: _CompatibilityKey) -> Set[str]:
+    """Returns the names of the fields used by a request, given its key."""
+    return {name for names in key[2:] for name in names}
+
+
+async def _compatibility_error(
+    request: "data_v1beta.RunReportRequest",
+) -> Optional[str]:
+    """Returns why the fields of the request can't be used together, if so.
+
+    The Data API lists the compatibility of the dimensions and metrics of
+    the property with the request, so only the incompatible fields that the
+    request itself uses make it invalid. It rejects the check outright if
+    the request's fields conflict in other ways. Successful checks are
+    cached by user, property and set of fields. Rejections aren't, since
+    they may not last.
+    """
+    key = _compatibility_key(request)
+    result = _compatibility_results.get(key)
+    if result is not None and result[0] > time.monotonic():
+        _compatibility_results.move_to_end(key)
+        return result[1]
+    check = data_v1beta.CheckCompatibilityRequest(
+        property=request.property,
+        dimensions=request.dimensions,
+        metrics=request.metrics,
+        compatibility_filter=data_v1beta.Compatibility.INCOMPATIBLE,
+    )
+    pb = type(request).pb(request)
+    if pb.HasField("dimension_filter"):
+        check.dimension_filter = request.dimension_filter
+    if pb.HasField("metric_filter"):
+        check.metric_filter = request.metric_filter
+    try:
+        response = await create_data_api_client().check_compatibility(check)
+    except api_exceptions.InvalidArgument as e:
+        return e.message
+    fields = _request_fields(key)
+    incompatible = [
+        c.dimension_metadata.api_name
+        for c in response.dimension_compatibilities
+        if c.compatibility == data_v1beta.Compatibility.INCOMPATIBLE
+        and c.dimension_metadata.api_name in fields
+    ] + [
+        c.metric_metadata.api_name
+        for c in response.metric_compatibilities
+        if c.compatibility == data_v1beta.Compatibility.INCOMPATIBLE
+        and c.metric_metadata.api_name in fields
+    ]
+    error = (
+        "These dimensions and metrics can't be used together: "
+        + ", ".join(f"'{name}'" for name in incompatible)
+        + "."
+        if incompatible
+        else None
+    )
+    _compatibility_results[key] = (
+        time.monotonic() + _COMPATIBILITY_TTL_SECONDS,
+        error,
+    )
+    _compatibility_results.move_to_end(key)
+    while len(_compatibility_results) > _MAX_COMPATIBILITY_RESULTS:
+        _compatibility_results.popitem(last=False)
+    return error
+
+
+def _has_unknown_custom_fields(
+    request: "data_v1beta.RunReportRequest", metadata: PropertyMetadata
+) -> bool:
+    """Returns whether the request uses custom fields missing from metadata."""
+    return any(
+        name.startswith(_CUSTOM_PREFIXES)
+        and name not in metadata.dimensions
+        and name not in metadata.metrics
+        for name in _request_fields(_compatibility_key(request))
+    )
+
+
+async def validate_report_request(
+    request: "data_v1beta.RunReportRequest",
+) -> None:
+    """Raises an error if the Data API would reject the report request.
+
+    Accepts both RunReportRequest and RunPivotReportRequest. Does nothing if
+    validation is disabled with the `ANALYTICS_MCP_VALIDATE_REPORTS`
+    environment variable. The compatibility of the fields is only checked if
+    enabled with `ANALYTICS_MCP_CHECK_COMPATIBILITY`.
+
+    Raises:
+        ValueError: If the request uses unknown or misplaced fields, or
+          fields that can't be used together.
+    """
+    if not _VALIDATE_REPORTS:
+        return
+    # Only errors of the API and of credentials are ignored, so that bugs in
+    # the validation itself aren't hidden.
+    try:
+        metadata = await property_metadata.get(request.property)
+        errors = check_fields(request, metadata)
+        if errors and _has_unknown_custom_fields(request, metadata):
+            # The custom fields may have been created since the metadata
+            # was cached.
+            errors = check_fields(
+                request, await property_metadata.refresh(request.property)
+            )
+    except (api_exceptions.GoogleAPIError, auth_exceptions.GoogleAuthError):
+        logging.getLogger(__name__).warning(
+            "Skipping validation since the metadata of %s is unavailable",
+            request.property,
+            exc_info=True,
+        )
+        return
+    if errors:
+        raise ValueError("Invalid report request: " + " ".join(errors))
+    if not _CHECK_COMPATIBILITY:
+        return
+    try:
+        error = await _compatibility_error(request)
+    except (api_exceptions.GoogleAPIError, auth_exceptions.GoogleAuthError):
+        logging.getLogger(__name__).warning(
+            "Skipping the compatibility check of a report request",
+            exc_info=True,
+        )
+        return
+    if error:
+        raise ValueError("Invalid report request: " + error)
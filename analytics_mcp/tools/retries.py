@@ -0,0 +1,275 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retry and timeout policy of calls to the Google Analytics APIs.
+
+Calls that fail with a transient error, such as `UNAVAILABLE`, are retried
+with exponential backoff and full jitter. Every tool call has a deadline,
+`ANALYTICS_MCP_TOOL_DEADLINE_SECONDS`, that bounds the attempts and backoff
+of all the API calls it makes, and each attempt is also limited to
+`ANALYTICS_MCP_ATTEMPT_TIMEOUT_SECONDS`.
+
+Calls that don't use report quota are hedged: if one takes longer than the
+99th percentile of recent calls of the same method, a second attempt is
+started and the first to succeed wins.
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from analytics_mcp.lazy_imports import lazy_import
+
+api_exceptions = lazy_import("google.api_core.exceptions")
+
+T = TypeVar("T")
+
+# Maximum number of attempts of a call.
+_MAX_ATTEMPTS = int(os.environ.get("ANALYTICS_MCP_MAX_ATTEMPTS", "4"))
+
+# Backoff before the first retry, its growth per retry, and its maximum. The
+# actual delay is drawn uniformly between 0 and the backoff.
+_INITIAL_BACKOFF_SECONDS = 0.5
+_BACKOFF_MULTIPLIER = 2.0
+_MAX_BACKOFF_SECONDS = 8.0
+
+# Maximum duration of a single attempt.
+_ATTEMPT_TIMEOUT_SECONDS = float(
+    os.environ.get("ANALYTICS_MCP_ATTEMPT_TIMEOUT_SECONDS", "60")
+)
+
+# Maximum duration of the API calls of a tool call, including retries.
+TOOL_DEADLINE_SECONDS = float(
+    os.environ.get("ANALYTICS_MCP_TOOL_DEADLINE_SECONDS", "120")
+)
+
+# Whether slow calls are hedged.
+_HEDGE_REQUESTS = os.environ.get(
+    "ANALYTICS_MCP_HEDGE_REQUESTS", "true"
+).lower() in ("1", "true")
+
+# Calls are never hedged sooner than this, so that fast methods aren't
+# hedged because of small variations in latency.
+_MIN_HEDGE_DELAY_SECONDS = 1.0
+
+# Number of recent latencies kept per method, and the number needed before
+# its calls are hedged.
+_LATENCY_WINDOW = 100
+_MIN_LATENCY_SAMPLES = 20
+
+# Methods that use report quota. Hedging them would spend it twice.
+_UNHEDGED_METHODS = frozenset(
+    (
+        "run_report",
+        "batch_run_reports",
+        "run_pivot_report",
+        "batch_run_pivot_reports",
+        "run_realtime_report",
+    )
+)
+
+# The monotonic time by which the API calls of the current tool call must
+# complete, if any.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "analytics_mcp_deadline", default=None
+)
+
+# Recent latencies of successful calls, in seconds, by method.
+_latencies: Dict[str, Deque[float]] = collections.defaultdict(
+    lambda: collections.deque(maxlen=_LATENCY_WINDOW)
+)
+
+# Counters of retries and hedged calls.
+_stats = collections.Counter()
+
+
+@contextlib.contextmanager
+def deadline(seconds: float = TOOL_DEADLINE_SECONDS) -> Iterator[None]:
+    """Limits the duration of the API calls made within the context.
+
+    A deadline set in an enclosing context is kept if it's earlier.
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(current, new_deadline)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Returns whether a failed call may succeed if it's retried."""
+    return isinstance(
+        error,
+        (
+            api_exceptions.ServiceUnavailable,
+            api_exceptions.InternalServerError,
+            api_exceptions.DeadlineExceeded,
+            api_exceptions.Aborted,
+        ),
+    )
+
+
+def _attempt_timeout() -> float:
+    """Returns the time left for an attempt.
+
+    Raises:
+        google.api_core.exceptions.DeadlineExceeded: If the deadline of the
+          tool call has passed.
+    """
+    timeout = _ATTEMPT_TIMEOUT_SECONDS
+    current = _deadline.get()
+    if current is not None:
+        timeout = min(timeout, current - time.monotonic())
+        if timeout <= 0:
+            raise api_exceptions.DeadlineExceeded(
+                "The tool call didn't complete within its deadline."
+            )
+    return timeout
+
+
+def _hedge_delay(method: str) -> Optional[float]:
+    """Returns when to hedge a call of the method, or None to not hedge it."""
+    if not _HEDGE_REQUESTS or method in _UNHEDGED_METHODS:
+        return None
+    latencies = _latencies[method]
+    if len(latencies) < _MIN_LATENCY_SAMPLES:
+        return None
+    p99 = sorted(latencies)[int(0.99 * (len(latencies) - 1))]
+    return max(p99, _MIN_HEDGE_DELAY_SECONDS)
+
+
+async def _attempt(
+    method: str, attempt: Callable[[float], Awaitable[T]], timeout: float
+) -> T:
+    """Makes an attempt, hedging it if it's slow.
+
+    Args:
+        method: The name of the client method.
+        attempt: Makes the call, given the time it has left.
+        timeout: The time left for the attempt.
+
+    Raises:
+        google.api_core.exceptions.DeadlineExceeded: If no call succeeded
+          within the timeout.
+        Exception: The error of the last failed call, if all failed.
+    """
+    start = time.monotonic()
+    end = start + timeout
+    hedge_delay = _hedge_delay(method)
+    hedge_at = start + hedge_delay if hedge_delay is not None else None
+    tasks: List[asyncio.Future] = [asyncio.ensure_future(attempt(timeout))]
+    try:
+        while True:
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                _stats["hedges"] += 1
+                tasks.append(asyncio.ensure_future(attempt(end - now)))
+            pending = [task for task in tasks if not task.done()]
+            if not pending:
+                # All calls failed.
+                raise tasks[-1].exception()
+            if now >= end:
+                raise api_exceptions.DeadlineExceeded(
+                    f"{method} didn't complete within {timeout:.1f} seconds."
+                )
+            wake_at = end if hedge_at is None else min(end, hedge_at)
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=wake_at - now,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    _latencies[method].append(time.monotonic() - start)
+                    if len(tasks) > 1 and task is tasks[-1]:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Marks the errors of losing calls as retrieved.
+                task.exception()
+
+
+async def call(method: str, attempt: Callable[[float], Awaitable[T]]) -> T:
+    """Makes a call, retrying it on transient errors.
+
+    Args:
+        method: The name of the client method, such as 'get_property'.
+        attempt: Makes the call, given the time it has left. Called once per
+          attempt, and twice for hedged attempts.
+
+    Raises:
+        google.api_core.exceptions.DeadlineExceeded: If the call didn't
+          succeed before the deadline of the tool call.
+        Exception: The error of the last attempt, if it isn't retryable or
+          no attempts are left.
+    """
+    backoff = _INITIAL_BACKOFF_SECONDS
+    attempts = 0
+    while True:
+        attempts += 1
+        timeout = _attempt_timeout()
+        try:
+            return await _attempt(method, attempt, timeout)
+        except Exception as e:
+            if not _is_retryable(e) or attempts >= _MAX_ATTEMPTS:
+                raise
+            delay = random.uniform(0, backoff)
+            current = _deadline.get()
+            if current is not None and time.monotonic() + delay >= current:
+                raise
+            logging.getLogger(__name__).warning(
+                "Retrying %s in %.2f seconds after error: %s", method, delay, e
+            )
+            _stats["retries"] += 1
+            await asyncio.sleep(delay)
+            backoff = min(backoff * _BACKOFF_MULTIPLIER, _MAX_BACKOFF_SECONDS)
+
+
+def stats() -> Dict[str, int]:
+    """Returns the number of retries and hedged calls, and hedges that won."""
+    return {
+        "retries": _stats["retries"],
+        "hedges": _stats["hedges"],
+        "hedge_wins": _stats["hedge_wins"],
+    }
+
+
+def clear() -> None:
+    """Forgets the recorded latencies and counters."""
+    _latencies.clear()
+    _stats.clear()
@@ -0,0 +1,320 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Scheduling of calls to the Google Analytics APIs.
+
+Every call made with a client from `analytics_mcp.tools.utils` waits for a
+slot from the scheduler. At most `ANALYTICS_MCP_MAX_CONCURRENT_API_CALLS`
+calls run at the same time, and at most
+`ANALYTICS_MCP_MAX_CONCURRENT_REQUESTS` per property and kind of report,
+matching the concurrent requests quota of the Data API.
+
+Waiting calls are started by priority: realtime reports first, then other
+interactive calls, then bulk calls such as the pages of `fetch_all` reports.
+Within a priority, properties take turns so that a burst of calls for one
+property doesn't hold up the others.
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterator,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from analytics_mcp.tools import metrics, retries
+
+Priority = Literal["realtime", "interactive", "bulk"]
+
+# Priorities from highest to lowest.
+_PRIORITIES: Tuple[Priority, ...] = ("realtime", "interactive", "bulk")
+
+# Maximum number of API calls in flight.
+_MAX_CONCURRENT_API_CALLS = int(
+    os.environ.get("ANALYTICS_MCP_MAX_CONCURRENT_API_CALLS", "32")
+)
+
+# Maximum number of API calls in flight per property and kind of report.
+# Defaults to the concurrent requests quota of standard properties.
+_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("ANALYTICS_MCP_MAX_CONCURRENT_REQUESTS", "10")
+)
+
+# Priority of the calls made in the current context, if set with `priority`.
+_priority: contextvars.ContextVar[Optional[Priority]] = contextvars.ContextVar(
+    "analytics_mcp_priority", default=None
+)
+
+
+@contextlib.contextmanager
+def priority(value: Priority) -> Iterator[None]:
+    """Sets the priority of the API calls made within the context.
+
+    Also applies to tasks started within the context.
+    """
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _WaitStats:
+    """Counts the calls started with a priority and how long they waited."""
+
+    def __init__(self):
+        self.started = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float) -> None:
+        self.started += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+class Scheduler:
+    """Limits concurrent calls globally and per key, queuing the others."""
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_concurrent_per_key: Optional[int] = None,
+    ):
+        """Initializes the scheduler.
+
+        Args:
+            max_concurrent: Maximum number of calls in flight. Defaults to
+              `ANALYTICS_MCP_MAX_CONCURRENT_API_CALLS`, or 32.
+            max_concurrent_per_key: Maximum number of calls in flight with
+              the same key. Defaults to
+              `ANALYTICS_MCP_MAX_CONCURRENT_REQUESTS`, or 10.
+        """
+        self._max_concurrent = max_concurrent or _MAX_CONCURRENT_API_CALLS
+        self._max_concurrent_per_key = (
+            max_concurrent_per_key or _MAX_CONCURRENT_REQUESTS
+        )
+        self._in_flight = 0
+        self._in_flight_by_key: Dict[Hashable, int] = collections.Counter()
+        # For each priority, the waiting calls by key. Keys are served in
+        # turn: a key moves to the end once one of its calls starts.
+        self._queues: Dict[
+            Priority,
+            "collections.OrderedDict[Hashable, Deque[asyncio.Future]]",
+        ] = {p: collections.OrderedDict() for p in _PRIORITIES}
+        self._wait_stats = {p: _WaitStats() for p in _PRIORITIES}
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, key: Hashable, call_priority: Optional[Priority] = None
+    ) -> AsyncIterator[None]:
+        """Waits for a slot to make a call, and holds it within the context.
+
+        Args:
+            key: Identifies the calls that share a concurrency limit, such as
+              the reports of one property.
+            call_priority: The priority of the call. Defaults to the priority
+              set with `priority`, or "interactive".
+        """
+        call_priority = call_priority or _priority.get() or "interactive"
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues[call_priority].setdefault(key, collections.deque())
+        queue.append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation.
+                self._release(key)
+            else:
+                self._remove(call_priority, key, waiter)
+            raise
+        self._wait_stats[call_priority].record(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the calls in flight, and the queue and waits by priority."""
+        return {
+            "in_flight": self._in_flight,
+            "priorities": {
+                p: {
+                    "queued": sum(len(q) for q in self._queues[p].values()),
+                    "started": stats.started,
+                    "mean_wait_ms": (
+                        1000 * stats.total_wait_seconds / stats.started
+                        if stats.started
+                        else 0.0
+                    ),
+                    "max_wait_ms": 1000 * stats.max_wait_seconds,
+                }
+                for p, stats in self._wait_stats.items()
+            },
+        }
+
+    def _dispatch(self) -> None:
+        """Starts waiting calls while slots are available."""
+        while self._in_flight < self._max_concurrent:
+            next_call = self._next_waiter()
+            if next_call is None:
+                return
+            key, waiter = next_call
+            self._in_flight += 1
+            self._in_flight_by_key[key] += 1
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> Optional[Tuple[Hashable, asyncio.Future]]:
+        """Removes and returns the next call that can start, and its key."""
+        for queues in self._queues.values():
+            for key, queue in queues.items():
+                if self._in_flight_by_key[key] >= self._max_concurrent_per_key:
+                    continue
+                waiter = queue.popleft()
+                if queue:
+                    queues.move_to_end(key)
+                else:
+                    del queues[key]
+                return key, waiter
+        return None
+
+    def _remove(
+        self, call_priority: Priority, key: Hashable, waiter: asyncio.Future
+    ) -> None:
+        """Removes a cancelled call from its queue."""
+        queues = self._queues[call_priority]
+        queue = queues[key]
+        queue.remove(waiter)
+        if not queue:
+            del queues[key]
+
+    def _release(self, key: Hashable) -> None:
+        """Frees the slot of a finished call and starts waiting calls."""
+        self._in_flight -= 1
+        self._in_flight_by_key[key] -= 1
+        if not self._in_flight_by_key[key]:
+            del self._in_flight_by_key[key]
+        self._dispatch()
+
+
+# Schedules the calls of all API clients.
+scheduler = Scheduler()
+
+
+def _scheduling_key(
+    service: str, method_name: str, args: Tuple[Any, ...], kwargs: Dict
+) -> Hashable:
+    """Returns the scheduling key of a call: its service, property and kind.
+
+    Calls that aren't about a property, such as listing account summaries,
+    share a key per service.
+    """
+    request = kwargs.get("request", args[0] if args else None)
+    property_rn = None
+    for field in ("property", "name", "parent"):
+        value = getattr(request, field, None)
+        if isinstance(value, str) and value.startswith("properties/"):
+            property_rn = "/".join(value.split("/")[:2])
+            break
+    kind = "realtime" if "realtime" in method_name else "core"
+    return (service, property_rn, kind)
+
+
+class ScheduledClient:
+    """Wraps an async API client so that its calls go through the scheduler.
+
+    Calls also follow the retry and timeout policy of
+    `analytics_mcp.tools.retries`, which replaces the default retry settings
+    of the client. Each attempt waits for its own slot, so that retries
+    don't hold a slot while they back off. Only the initial call of methods
+    that return pagers is scheduled, not the requests for subsequent pages.
+
+    The latency, status code and response size of each call are recorded in
+    `analytics_mcp.tools.metrics`.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        metadata: Optional[Callable[[], Sequence[Tuple[str, str]]]] = None,
+    ):
+        """Wraps the client.
+
+        Args:
+            client: The async API client.
+            metadata: Returns gRPC metadata to add to each call, such as the
+              authorization of the caller. Pagers reuse the metadata of the
+              initial call for subsequent pages.
+        """
+        self._client = client
+        self._service = type(client).__name__
+        self._metadata = metadata
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            if self._metadata is not None:
+                kwargs["metadata"] = tuple(kwargs.get("metadata", ())) + tuple(
+                    self._metadata()
+                )
+            key = _scheduling_key(self._service, name, args, kwargs)
+            default_priority = "realtime" if "realtime" in name else None
+            call_priority = _priority.get() or default_priority
+
+            async def attempt(timeout: float) -> Any:
+                end = time.monotonic() + timeout
+                async with scheduler.slot(key, call_priority):
+                    return await attribute(
+                        *args,
+                        retry=None,
+                        timeout=max(end - time.monotonic(), 0.001),
+                        **kwargs,
+                    )
+
+            start = time.monotonic()
+            try:
+                response = await retries.call(name, attempt)
+            except Exception as e:
+                metrics.record_api_call(
+                    name, time.monotonic() - start, metrics.error_code(e)
+                )
+                raise
+            metrics.record_api_call(
+                name, time.monotonic() - start, "OK", response
+            )
+            return response
+
+        return call
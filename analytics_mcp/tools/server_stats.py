@@ -0,0 +1,127 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The `get_server_stats` tool and the `/metrics` endpoint of HTTP mode."""
+
+import math
+from typing import Any, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from analytics_mcp.coordinator import mcp
+from analytics_mcp.tools import metrics, retries, utils
+from analytics_mcp.tools.admin.info import account_directory
+from analytics_mcp.tools.coalescing import coalescer
+from analytics_mcp.tools.reporting import cache
+from analytics_mcp.tools.reporting.metadata import property_metadata
+from analytics_mcp.tools.scheduling import scheduler
+
+# Content type of the Prometheus text format.
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _with_hit_ratio(stats: Dict[str, int]) -> Dict[str, float]:
+    """Adds the ratio of lookups served from a cache to its counters.
+
+    Stale hits count as hits since they're served without waiting.
+    """
+    hits = stats["hits"] + stats.get("stale_hits", 0)
+    lookups = hits + stats["misses"]
+    return {**stats, "hit_ratio": hits / lookups if lookups else 0.0}
+
+
+def component_stats() -> Dict[str, Dict[str, float]]:
+    """Returns the counters of the caches and schedulers, by component."""
+    scheduler_stats = scheduler.stats()
+    flat_scheduler_stats = {"in_flight": scheduler_stats["in_flight"]}
+    for priority, values in scheduler_stats["priorities"].items():
+        for key, value in values.items():
+            flat_scheduler_stats[f"{priority}_{key}"] = value
+    return {
+        "report_cache": _with_hit_ratio(cache.report_cache.stats()),
+        "metadata_cache": _with_hit_ratio(property_metadata.stats()),
+        "account_directory": _with_hit_ratio(account_directory.stats()),
+        "credentials": _with_hit_ratio(utils.get_credentials_stats()),
+        "users": utils.users.stats(),
+        "coalescer": coalescer.stats(),
+        "retries": retries.stats(),
+        "scheduler": flat_scheduler_stats,
+    }
+
+
+def _summary(
+    histogram: metrics.Histogram, label: str, scale: float = 1.0
+) -> Optional[Dict[str, Optional[float]]]:
+    """Returns the mean and quantiles of a histogram, scaled."""
+    summary = histogram.summary(label)
+    if summary is None:
+        return None
+    return {
+        key: (
+            None
+            if math.isinf(value)
+            else round(value * scale, 3) if key != "count" else value
+        )
+        for key, value in summary.items()
+    }
+
+
+@mcp.tool(title="Get statistics about the server")
+async def get_server_stats() -> Dict[str, Any]:
+    """Returns statistics about the tool calls and API calls of the server.
+
+    Use this to find out why the server is slow or failing: latencies and
+    errors of each tool and API method, sizes of responses, and how often
+    cached results are reused.
+
+    Returns:
+        A dictionary with:
+          - `tools`: for each tool, the calls by outcome, and the count, mean
+            and estimated 50th, 95th and 99th percentiles of the latency in
+            milliseconds and of the size of responses in bytes.
+          - `api_calls`: for each API method, the calls by status code, the
+            latency and response size, and the rows of reports.
+          - `components`: the counters of the server's caches, coalescer,
+            retries and scheduler.
+    """
+    tools: Dict[str, Dict[str, Any]] = {}
+    for (tool, status), count in metrics.tool_calls.values().items():
+        tools.setdefault(tool, {"calls": {}})["calls"][status] = int(count)
+    for tool, entry in tools.items():
+        entry["latency_ms"] = _summary(metrics.tool_duration, tool, 1000)
+        entry["response_bytes"] = _summary(metrics.tool_response_bytes, tool)
+
+    api_calls: Dict[str, Dict[str, Any]] = {}
+    for (method, code), count in metrics.api_calls.values().items():
+        api_calls.setdefault(method, {"calls": {}})["calls"][code] = int(count)
+    for method, entry in api_calls.items():
+        entry["latency_ms"] = _summary(metrics.api_duration, method, 1000)
+        entry["response_bytes"] = _summary(metrics.api_response_bytes, method)
+        entry["rows"] = _summary(metrics.report_rows, method)
+
+    return {
+        "tools": tools,
+        "api_calls": api_calls,
+        "components": component_stats(),
+    }
+
+
+@mcp.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Serves the metrics of the server in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics.render(component_stats()),
+        media_type=_PROMETHEUS_CONTENT_TYPE,
+    )
@@ -14,15 +14,45 @@
 
 """Common utilities used by the MCP server."""
 
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import datetime
+import functools
+import hashlib
+import json
 import os
 import threading
-from typing import Any, Dict, Optional
+import time
+import urllib.parse
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from google.analytics import admin_v1beta, data_v1beta, admin_v1alpha
-from google.api_core.gapic_v1.client_info import ClientInfo
+from analytics_mcp.lazy_imports import lazy_import
+from analytics_mcp.tools.scheduling import ScheduledClient
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
 from importlib import metadata
 import google.auth
-import proto
+import google.auth.credentials
+
+admin_v1alpha = lazy_import("google.analytics.admin_v1alpha")
+admin_v1beta = lazy_import("google.analytics.admin_v1beta")
+auth_requests = lazy_import("google.auth.transport.requests")
+client_info = lazy_import("google.api_core.gapic_v1.client_info")
+data_v1beta = lazy_import("google.analytics.data_v1beta")
+proto = lazy_import("proto")
 
 
 def _get_package_version_with_fallback():
@@ -36,19 +66,233 @@ def _get_package_version_with_fallback():
         return "unknown"
 
 
-# Client information that adds a custom user agent to all API requests.
-_CLIENT_INFO = ClientInfo(
-    user_agent=f"analytics-mcp/{_get_package_version_with_fallback()}"
-)
+@functools.cache
+def _client_info() -> "client_info.ClientInfo":
+    """Returns client information that adds a custom user agent to requests."""
+    return client_info.ClientInfo(
+        user_agent=f"analytics-mcp/{_get_package_version_with_fallback()}"
+    )
+
 
 # Read-only scope for Analytics Admin API and Analytics Data API.
 _READ_ONLY_ANALYTICS_SCOPE = (
     "https://www.googleapis.com/auth/analytics.readonly"
 )
 
-# Global credentials cache for OAuth mode
-_oauth_credentials: Optional[google.auth.credentials.Credentials] = None
-_oauth_credentials_lock = threading.Lock()
+# Access tokens that expire within this many seconds are refreshed in the
+# background so that API calls don't have to wait for a refresh.
+_TOKEN_REFRESH_SKEW_SECONDS = float(
+    os.environ.get("ANALYTICS_MCP_TOKEN_REFRESH_SKEW_SECONDS", "300")
+)
+
+# Runs token refreshes so they never block the event loop. A single worker is
+# enough since refreshes are single-flighted.
+_refresh_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="analytics-mcp-credentials"
+)
+
+
+class _SingleFlightCredentials(google.auth.credentials.Credentials):
+    """Wraps credentials so that concurrent refreshes share one request.
+
+    API clients refresh expired credentials on gRPC's auth plugin threads.
+    Routing those refreshes through the owning `_CachedCredentials` makes
+    concurrent callers wait on the same refresh instead of each issuing one.
+    Other attributes, like `service_account_email`, are read from the wrapped
+    credentials.
+    """
+
+    def __init__(
+        self,
+        wrapped: google.auth.credentials.Credentials,
+        cache: "_CachedCredentials",
+    ):
+        super().__init__()
+        self._wrapped = wrapped
+        self._cache = cache
+        self._copy_token()
+
+    def __getattr__(self, name: str) -> Any:
+        wrapped = self.__dict__.get("_wrapped")
+        if wrapped is None:
+            raise AttributeError(name)
+        return getattr(wrapped, name)
+
+    @property
+    def quota_project_id(self) -> Optional[str]:
+        return self._wrapped.quota_project_id
+
+    @property
+    def universe_domain(self) -> str:
+        return self._wrapped.universe_domain
+
+    def refresh(self, request: Any) -> None:
+        """Refreshes the token, or waits for the refresh already in flight."""
+        self._cache.refresh()
+
+    def _refresh_wrapped(self) -> None:
+        """Refreshes the wrapped credentials and copies their new token."""
+        self._wrapped.refresh(auth_requests.Request())
+        self._copy_token()
+
+    def _copy_token(self) -> None:
+        self.token = self._wrapped.token
+        self.expiry = self._wrapped.expiry
+
+
+class _CachedCredentials:
+    """Resolves credentials once and refreshes their token before it expires.
+
+    Refreshes run on `_refresh_executor` and are single-flighted: callers
+    that need a token while a refresh is in progress wait for that refresh.
+    Counts cache hits, misses (resolutions) and refreshes so the
+    effectiveness of the cache can be observed.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[], google.auth.credentials.Credentials],
+        refresh_skew_seconds: Optional[float] = None,
+    ):
+        """Initializes the cache.
+
+        Args:
+            resolve: Returns new credentials. Called at most once unless
+              `clear` is called. May return credentials without a valid
+              token, in which case the token is fetched on first use.
+            refresh_skew_seconds: Tokens expiring within this many seconds
+              are refreshed in the background. Defaults to the
+              ANALYTICS_MCP_TOKEN_REFRESH_SKEW_SECONDS environment variable,
+              or 300 seconds.
+        """
+        if refresh_skew_seconds is None:
+            refresh_skew_seconds = _TOKEN_REFRESH_SKEW_SECONDS
+        self._resolve = resolve
+        self._refresh_skew = datetime.timedelta(seconds=refresh_skew_seconds)
+        self._credentials: Optional[_SingleFlightCredentials] = None
+        self._refresh_future: Optional[concurrent.futures.Future] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def get(self) -> google.auth.credentials.Credentials:
+        """Returns the cached credentials, resolving them on first use.
+
+        Never waits for a token refresh. If the token expires soon, starts a
+        background refresh and returns the credentials with the current token.
+        """
+        with self._lock:
+            if self._credentials is None:
+                self.misses += 1
+                self._credentials = _SingleFlightCredentials(
+                    self._resolve(), self
+                )
+            else:
+                self.hits += 1
+            credentials = self._credentials
+            if self._refresh_future is None and self._expires_soon(credentials):
+                self._start_refresh()
+        return credentials
+
+    def refresh(self) -> None:
+        """Refreshes the token, or waits for the refresh already in flight.
+
+        Blocks the calling thread, so must not be called on the event loop.
+
+        Raises:
+            Exception: If the refresh fails.
+        """
+        with self._lock:
+            future = self._refresh_future or self._start_refresh()
+        future.result()
+
+    def clear(self) -> None:
+        """Drops the cached credentials so the next `get` resolves them."""
+        with self._lock:
+            self._credentials = None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+    def _expires_soon(self, credentials: _SingleFlightCredentials) -> bool:
+        """Returns whether the token exists and expires within the skew.
+
+        Credentials without a token yet are left alone, since the API client
+        fetches the first token as part of its first request.
+        """
+        if not credentials.token or credentials.expiry is None:
+            return False
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return credentials.expiry - now <= self._refresh_skew
+
+    def _start_refresh(self) -> concurrent.futures.Future:
+        """Submits a refresh of the cached credentials.
+
+        Must be called with `_lock` held.
+        """
+        self._refresh_future = _refresh_executor.submit(
+            self._refresh, self._credentials
+        )
+        return self._refresh_future
+
+    def _refresh(self, credentials: _SingleFlightCredentials) -> None:
+        """Refreshes the token. Runs on `_refresh_executor`."""
+        try:
+            credentials._refresh_wrapped()
+        except Exception:
+            with self._lock:
+                self._refresh_future = None
+                self.refresh_failures += 1
+            raise
+        with self._lock:
+            self._refresh_future = None
+            self.refreshes += 1
+
+
+def _resolve_default_credentials() -> google.auth.credentials.Credentials:
+    """Returns Application Default Credentials with read-only scope."""
+    credentials, _ = google.auth.default(scopes=[_READ_ONLY_ANALYTICS_SCOPE])
+    return credentials
+
+
+def _resolve_oauth_credentials() -> google.auth.credentials.Credentials:
+    """Returns OAuth user credentials, prompting for authentication if needed.
+
+    An expired stored token isn't refreshed here; the refresh happens off the
+    event loop when the credentials are first used.
+    """
+    from analytics_mcp.oauth_handler import OAuthHandler
+
+    return OAuthHandler().get_credentials(refresh=False)
+
+
+# Credentials caches for ADC and OAuth mode.
+_adc_credentials = _CachedCredentials(_resolve_default_credentials)
+_oauth_credentials = _CachedCredentials(_resolve_oauth_credentials)
+
+
+def _credentials_cache() -> _CachedCredentials:
+    """Returns the credentials cache for the configured authentication mode.
+
+    OAuth mode is enabled when GOOGLE_OAUTH_CLIENT_SECRETS environment
+    variable is set. Otherwise, Application Default Credentials are used.
+    """
+    if os.environ.get("GOOGLE_OAUTH_CLIENT_SECRETS"):
+        return _oauth_credentials
+    return _adc_credentials
+
+
+def get_credentials_stats() -> Dict[str, int]:
+    """Returns hit, miss and refresh counters of the credentials cache."""
+    return _credentials_cache().stats()
 
 
 def _create_credentials() -> google.auth.credentials.Credentials:
@@ -61,56 +305,360 @@ def _create_credentials() -> google.auth.credentials.Credentials:
 
     ADC mode is used when GOOGLE_OAUTH_CLIENT_SECRETS is not set.
     This is the default behavior and uses gcloud credentials or service accounts.
+
+    Credentials are resolved once per process and their tokens are refreshed
+    off the event loop.
     """
-    global _oauth_credentials
+    return _credentials_cache().get()
 
-    # Check if OAuth mode is enabled
-    if os.environ.get("GOOGLE_OAUTH_CLIENT_SECRETS"):
-        # Use OAuth user authentication with thread-safe caching
-        with _oauth_credentials_lock:
-            if _oauth_credentials is None:
-                from analytics_mcp.oauth_handler import OAuthHandler
-
-                handler = OAuthHandler()
-                _oauth_credentials = handler.get_credentials()
-            return _oauth_credentials
+
+# Maximum number of API clients, and therefore gRPC channels, with the
+# server's own credentials that are kept open at the same time. Each client
+# type needs one slot per credential identity. The clients of the users of a
+# shared server don't count, since they're closed when the user goes idle.
+_MAX_POOLED_CLIENTS = int(os.environ.get("ANALYTICS_MCP_MAX_CLIENTS", "8"))
+
+# Seconds that an evicted client's channel is given to finish in-flight calls
+# before it is closed.
+_EVICTED_CLIENT_GRACE_SECONDS = 30.0
+
+# Process-wide pool of API clients keyed by (client class, credential
+# identity), ordered from least to most recently used.
+_clients: "collections.OrderedDict[Tuple[type, Hashable], Any]" = (
+    collections.OrderedDict()
+)
+_clients_lock = threading.Lock()
+
+# Holds references to channel close tasks so they aren't garbage collected
+# before they finish.
+_closing_tasks: Set[asyncio.Task] = set()
+
+
+def _credentials_identity(
+    credentials: google.auth.credentials.Credentials,
+) -> Hashable:
+    """Returns a key identifying the principal behind the credentials.
+
+    Credentials for the same principal are interchangeable, so clients built
+    with them can be shared even if the credentials objects differ.
+    """
+    for attribute in ("service_account_email", "client_id", "signer_email"):
+        value = getattr(credentials, attribute, None)
+        if isinstance(value, str) and value:
+            return (type(credentials).__name__, value)
+    return (type(credentials).__name__, None)
+
+
+def credentials_fingerprint() -> str:
+    """Returns a digest of the identity of the server's own credentials.
+
+    Caches shared by the server processes of an OS user, which may each use
+    different ADC or OAuth accounts, include it in their keys. User
+    credentials of different accounts can have the same OAuth client ID, so
+    their refresh token tells them apart too.
+
+    Resolves the credentials on first use, so may block.
+    """
+    credentials = _create_credentials()
+    identity = (
+        _credentials_identity(credentials),
+        getattr(credentials, "refresh_token", None),
+    )
+    return hashlib.sha256(repr(identity).encode()).hexdigest()[:32]
+
+
+def _close_client_later(client: Any) -> None:
+    """Closes the client's channel once in-flight calls complete.
+
+    Gives up silently if there's no running event loop, in which case the
+    channel is released when the client is garbage collected.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(
+        client.transport.grpc_channel.close(grace=_EVICTED_CLIENT_GRACE_SECONDS)
+    )
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+def _get_pooled_client(client_class: type) -> Any:
+    """Returns a shared client of the given class for the current credentials.
+
+    Creates the client on first use. If the pool has more clients with the
+    server's credentials than allowed, the least recently used one is
+    evicted and its channel closed. Calls made with the client
+    are scheduled by `analytics_mcp.tools.scheduling`.
+
+    Within `user_context`, the client belongs to the user, and its calls
+    are authorized with the access token of the context.
+    """
+    user = current_user()
+    if user is not None:
+        # Calls carry the access token of the request instead.
+        credentials = google.auth.credentials.AnonymousCredentials()
+        metadata = _access_token_metadata
+        key = (client_class, ("user", user))
     else:
-        # Use Application Default Credentials (existing behavior)
-        credentials, _ = google.auth.default(
-            scopes=[_READ_ONLY_ANALYTICS_SCOPE]
+        credentials = _create_credentials()
+        metadata = None
+        key = (client_class, _credentials_identity(credentials))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+        client = ScheduledClient(
+            client_class(client_info=_client_info(), credentials=credentials),
+            metadata,
         )
-        return credentials
+        _clients[key] = client
+        if user is None:
+            server_keys = [k for k in _clients if not _is_user_key(k)]
+            evicted_count = len(server_keys) - _MAX_POOLED_CLIENTS
+            for evicted_key in server_keys[:evicted_count]:
+                _close_client_later(_clients.pop(evicted_key))
+        return client
 
 
-def create_admin_api_client() -> admin_v1beta.AnalyticsAdminServiceAsyncClient:
-    """Returns a properly configured Google Analytics Admin API async client.
+def _is_user_key(key: Tuple[type, Hashable]) -> bool:
+    """Returns whether a pool key is that of a client of a user."""
+    identity = key[1]
+    return isinstance(identity, tuple) and identity[0] == "user"
+
 
-    Uses Application Default Credentials with read-only scope.
+async def close_api_clients() -> None:
+    """Closes the channels of all pooled clients and empties the pool.
+
+    Called when the server shuts down.
     """
-    return admin_v1beta.AnalyticsAdminServiceAsyncClient(
-        client_info=_CLIENT_INFO, credentials=_create_credentials()
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.transport.close()
+
+
+# Endpoint that returns the user and expiration time of an access token.
+_TOKEN_INFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+
+# Users whose credentials haven't been used for this many seconds are
+# forgotten, and their API clients closed.
+_USER_IDLE_SECONDS = float(
+    os.environ.get("ANALYTICS_MCP_USER_IDLE_SECONDS", "1800")
+)
+
+# The user whose credentials are used in the current context, if any.
+_current_user: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "analytics_mcp_user", default=None
+)
+
+# The access token that API calls are made with in the current context, if
+# any.
+_current_token: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "analytics_mcp_token", default=None
+)
+
+
+class _Token(NamedTuple):
+    """The user that an access token belongs to, and when it expires."""
+
+    user: str
+    expiry: datetime.datetime
+
+
+class _UserRegistry:
+    """The users of a shared server, keyed by Google user ID.
+
+    Users authenticate each request with an OAuth access token. The user
+    behind a token is looked up once, and again once the token has expired,
+    which fails unless it's still valid. API calls are made with the token
+    of the request, but the clients they go through belong to the user, so
+    that new tokens of the user keep the clients' channels. Idle users are
+    evicted along with their clients.
+    """
+
+    def __init__(self, idle_seconds: Optional[float] = None):
+        """Initializes the registry.
+
+        Args:
+            idle_seconds: How long the clients of unused tokens are kept.
+              Defaults to the ANALYTICS_MCP_USER_IDLE_SECONDS environment
+              variable, or 1800 seconds.
+        """
+        self._idle_seconds = (
+            _USER_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        )
+        # Hashes of the access tokens of each user, least recently used
+        # user first.
+        self._users: "collections.OrderedDict[str, Set[str]]" = (
+            collections.OrderedDict()
+        )
+        self._last_used: Dict[str, float] = {}
+        # Tokens by their SHA-256 hash.
+        self._tokens: Dict[str, _Token] = {}
+        self.lookups = 0
+        self.evictions = 0
+
+    async def authenticate(self, access_token: str) -> str:
+        """Returns the ID of the user with the access token.
+
+        Raises:
+            ValueError: If the token is invalid or has expired.
+        """
+        self.evict_idle()
+        token_hash = hashlib.sha256(access_token.encode()).hexdigest()
+        token = self._tokens.get(token_hash)
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        if token is not None and token.expiry <= now:
+            self._forget_token(token_hash)
+            token = None
+        if token is None:
+            self.lookups += 1
+            user, expiry = await asyncio.to_thread(_look_up_token, access_token)
+            token = self._tokens[token_hash] = _Token(user, expiry)
+            self._users.setdefault(user, set()).add(token_hash)
+        self._users.move_to_end(token.user)
+        self._last_used[token.user] = time.monotonic()
+        return token.user
+
+    def evict_idle(self) -> None:
+        """Forgets idle users and closes their API clients."""
+        cutoff = time.monotonic() - self._idle_seconds
+        while self._users:
+            user = next(iter(self._users))
+            if self._last_used[user] > cutoff:
+                break
+            for token_hash in self._users.pop(user):
+                self._tokens.pop(token_hash, None)
+            del self._last_used[user]
+            self.evictions += 1
+            _close_user_clients(user)
+
+    def clear(self) -> None:
+        """Forgets all users."""
+        self._users.clear()
+        self._last_used.clear()
+        self._tokens.clear()
+
+    def _forget_token(self, token_hash: str) -> None:
+        token = self._tokens.pop(token_hash)
+        self._users.get(token.user, set()).discard(token_hash)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of users, token lookups and evicted users."""
+        return {
+            "users": len(self._users),
+            "lookups": self.lookups,
+            "evictions": self.evictions,
+        }
+
+
+def _look_up_token(access_token: str) -> Tuple[str, datetime.datetime]:
+    """Returns the user ID and expiration time of an access token.
+
+    Blocks the calling thread, so must not be called on the event loop.
+
+    Raises:
+        ValueError: If the token is invalid or has expired.
+    """
+    response = auth_requests.Request()(
+        url=_TOKEN_INFO_URL,
+        method="POST",
+        body=urllib.parse.urlencode({"access_token": access_token}),
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
     )
+    if response.status != 200:
+        raise ValueError(
+            "The access token in the Authorization header is invalid or has"
+            " expired."
+        )
+    info = json.loads(response.data)
+    expiry = datetime.datetime.fromtimestamp(
+        int(info["exp"]), datetime.timezone.utc
+    ).replace(tzinfo=None)
+    return info["sub"], expiry
+
+
+def _access_token_metadata() -> Tuple[Tuple[str, str], ...]:
+    """Returns the gRPC metadata that authorizes a call as the user."""
+    return (("authorization", f"Bearer {_current_token.get()}"),)
+
+
+def _close_user_clients(user: str) -> None:
+    """Removes the pooled clients of a user and closes their channels."""
+    with _clients_lock:
+        keys = [key for key in _clients if key[1] == ("user", user)]
+        clients = [_clients.pop(key) for key in keys]
+    for client in clients:
+        _close_client_later(client)
+
+
+# Credentials of the users of the server.
+users = _UserRegistry()
+
+
+def current_user() -> Optional[str]:
+    """Returns the ID of the user whose credentials are used, if any.
+
+    Returns None when the server's own credentials are used. Caches and
+    shared calls include the user in their keys so that users only get
+    results fetched with their own credentials.
+    """
+    return _current_user.get()
 
 
-def create_data_api_client() -> data_v1beta.BetaAnalyticsDataAsyncClient:
+@contextlib.asynccontextmanager
+async def user_context(access_token: Optional[str]) -> AsyncIterator[None]:
+    """Uses the credentials of the user with the access token in the context.
+
+    Uses the server's own credentials if `access_token` is empty.
+
+    Raises:
+        ValueError: If the token is invalid or has expired.
+    """
+    if not access_token:
+        yield
+        return
+    user = _current_user.set(await users.authenticate(access_token))
+    token = _current_token.set(access_token)
+    try:
+        yield
+    finally:
+        _current_token.reset(token)
+        _current_user.reset(user)
+
+
+def create_admin_api_client() -> (
+    "admin_v1beta.AnalyticsAdminServiceAsyncClient"
+):
+    """Returns a properly configured Google Analytics Admin API async client.
+
+    Uses Application Default Credentials with read-only scope. The client and
+    its channel are shared across calls.
+    """
+    return _get_pooled_client(admin_v1beta.AnalyticsAdminServiceAsyncClient)
+
+
+def create_data_api_client() -> "data_v1beta.BetaAnalyticsDataAsyncClient":
     """Returns a properly configured Google Analytics Data API async client.
 
-    Uses Application Default Credentials with read-only scope.
+    Uses Application Default Credentials with read-only scope. The client and
+    its channel are shared across calls.
     """
-    return data_v1beta.BetaAnalyticsDataAsyncClient(
-        client_info=_CLIENT_INFO, credentials=_create_credentials()
-    )
+    return _get_pooled_client(data_v1beta.BetaAnalyticsDataAsyncClient)
 
 
 def create_admin_alpha_api_client() -> (
-    admin_v1alpha.AnalyticsAdminServiceAsyncClient
+    "admin_v1alpha.AnalyticsAdminServiceAsyncClient"
 ):
     """Returns a properly configured Google Analytics Admin API (alpha) async client.
-    Uses Application Default Credentials with read-only scope.
+    Uses Application Default Credentials with read-only scope. The client and
+    its channel are shared across calls.
     """
-    return admin_v1alpha.AnalyticsAdminServiceAsyncClient(
-        client_info=_CLIENT_INFO, credentials=_create_credentials()
-    )
+    return _get_pooled_client(admin_v1alpha.AnalyticsAdminServiceAsyncClient)
 
 
 def construct_property_rn(property_value: int | str) -> str:
@@ -138,13 +686,156 @@ def construct_property_rn(property_value: int | str) -> str:
     return f"properties/{property_num}"
 
 
-def proto_to_dict(obj: proto.Message) -> Dict[str, Any]:
-    """Converts a proto message to a dictionary."""
+# Field types that `_fast_message_to_dict` converts without special handling.
+_PASSTHROUGH_FIELD_TYPES = frozenset(
+    (
+        FieldDescriptor.TYPE_STRING,
+        FieldDescriptor.TYPE_BOOL,
+        FieldDescriptor.TYPE_INT32,
+        FieldDescriptor.TYPE_UINT32,
+        FieldDescriptor.TYPE_SINT32,
+        FieldDescriptor.TYPE_FIXED32,
+        FieldDescriptor.TYPE_SFIXED32,
+    )
+)
+
+# Field types that are converted to strings, as in the proto3 JSON mapping.
+_INT64_FIELD_TYPES = frozenset(
+    (
+        FieldDescriptor.TYPE_INT64,
+        FieldDescriptor.TYPE_UINT64,
+        FieldDescriptor.TYPE_SINT64,
+        FieldDescriptor.TYPE_FIXED64,
+        FieldDescriptor.TYPE_SFIXED64,
+    )
+)
+
+# Maps full message names to the plan used by `_fast_message_to_dict` to
+# convert them, or to None if they contain fields it doesn't support.
+_FIELD_PLANS: Dict[str, Optional[List[Tuple[str, bool, bool, Any]]]] = {}
+
+
+def _field_plan(
+    descriptor: Descriptor,
+) -> Optional[List[Tuple[str, bool, bool, Any]]]:
+    """Returns how to convert each field of a message type.
+
+    Each entry is a tuple of the field name, whether the field is repeated,
+    whether it has presence, and a function that converts a value, or None
+    if values are used as is. Returns None if the message type, or any type
+    nested in it, has fields that need the full proto3 JSON mapping, such as
+    maps, floats and well-known types.
+    """
+    if descriptor.full_name in _FIELD_PLANS:
+        return _FIELD_PLANS[descriptor.full_name]
+    # Guards against recursive message types.
+    _FIELD_PLANS[descriptor.full_name] = None
+    plan = []
+    for field in descriptor.fields:
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            if field.message_type.GetOptions().map_entry or (
+                field.message_type.file.package == "google.protobuf"
+            ):
+                return None
+            convert = _SPECIALIZED_CONVERTERS.get(field.message_type.full_name)
+            if convert is None:
+                nested_plan = _field_plan(field.message_type)
+                if nested_plan is None:
+                    return None
+                convert = functools.partial(
+                    _fast_message_to_dict, plan=nested_plan
+                )
+        elif field.type == FieldDescriptor.TYPE_ENUM:
+            names = {
+                value.number: value.name for value in field.enum_type.values
+            }
+            convert = functools.partial(_enum_name, names)
+        elif field.type in _INT64_FIELD_TYPES:
+            convert = str
+        elif field.type in _PASSTHROUGH_FIELD_TYPES:
+            convert = None
+        else:
+            return None
+        plan.append(
+            (field.name, field.is_repeated, field.has_presence, convert)
+        )
+    _FIELD_PLANS[descriptor.full_name] = plan
+    return plan
+
+
+def _enum_name(names: Dict[int, str], value: int) -> str | int:
+    return names.get(value, value)
+
+
+def _row_to_dict(row: Any) -> Dict[str, Any]:
+    """Converts a Data API Row protobuf to a dictionary.
+
+    Rows make up almost all of a large report, so they're converted with
+    inlined field accesses. The `value` field of dimension and metric values
+    is in a oneof, so it's omitted if unset, which is only checked for empty
+    values.
+    """
+    return {
+        "dimension_values": [
+            {"value": text} if (text := v.value) or v.HasField("value") else {}
+            for v in row.dimension_values
+        ],
+        "metric_values": [
+            {"value": text} if (text := v.value) or v.HasField("value") else {}
+            for v in row.metric_values
+        ],
+    }
+
+
+# Hand-written converters for message types that dominate large responses,
+# keyed by full message name.
+_SPECIALIZED_CONVERTERS = {
+    "google.analytics.data.v1beta.Row": _row_to_dict,
+}
+
+
+def _fast_message_to_dict(
+    message: Any, plan: List[Tuple[str, bool, bool, Any]]
+) -> Dict[str, Any]:
+    """Converts a protobuf message to a dictionary following a field plan.
+
+    Produces the same dictionary as `proto.Message.to_dict`, but reads the
+    protobuf directly instead of going through proto-plus marshaling and the
+    proto3 JSON printer.
+    """
+    result = {}
+    for name, repeated, has_presence, convert in plan:
+        value = getattr(message, name)
+        if repeated:
+            if convert is None:
+                result[name] = list(value)
+            else:
+                result[name] = [convert(item) for item in value]
+        elif has_presence and not message.HasField(name):
+            continue
+        elif convert is None:
+            result[name] = value
+        else:
+            result[name] = convert(value)
+    return result
+
+
+def proto_to_dict(obj: "proto.Message") -> Dict[str, Any]:
+    """Converts a proto message to a dictionary.
+
+    Messages with simple field types, such as report responses and metadata,
+    are converted from the underlying protobuf directly, which is many times
+    faster than `proto.Message.to_dict`.
+    """
+    pb = type(obj).pb(obj)
+    plan = _field_plan(pb.DESCRIPTOR)
+    if plan is not None:
+        return _fast_message_to_dict(pb, plan)
     return type(obj).to_dict(
         obj, use_integers_for_enums=False, preserving_proto_field_name=True
     )
 
 
-def proto_to_json(obj: proto.Message) -> str:
+def proto_to_json(obj: "proto.Message") -> str:
     """Converts a proto message to a JSON string."""
     return type(obj).to_json(obj, indent=None, preserving_proto_field_name=True)
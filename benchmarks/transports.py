@@ -0,0 +1,171 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the throughput of the stdio and streamable HTTP transports.
+
+Simulates a team of clients that each open a session and list the tools
+repeatedly. With stdio, every client starts its own server process, as
+desktop MCP clients do. With HTTP, all clients share one server.
+
+Listing tools doesn't call the Google Analytics APIs, so no credentials are
+needed and the results measure the overhead of the server itself.
+
+Usage:
+    python benchmarks/transports.py [--clients 8] [--requests 50]
+        [--workers 1 2 4]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+# How long to wait for the HTTP server to accept connections.
+_STARTUP_TIMEOUT_SECONDS = 30.0
+
+
+class _Result(NamedTuple):
+    """The outcome of a benchmark run."""
+
+    setup: str
+    requests: int
+    seconds: float
+    first_response_seconds: float
+
+
+async def _run_session(session: ClientSession, requests: int) -> float:
+    """Lists the tools repeatedly, returning the time to initialize."""
+    start = time.perf_counter()
+    await session.initialize()
+    first_response = time.perf_counter() - start
+    for _ in range(requests):
+        await session.list_tools()
+    return first_response
+
+
+async def _stdio_client(requests: int) -> float:
+    server = StdioServerParameters(
+        command=sys.executable, args=["-m", "analytics_mcp.server"]
+    )
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(server, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                return await _run_session(session, requests)
+
+
+async def _http_client(url: str, requests: int) -> float:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            return await _run_session(session, requests)
+
+
+async def _benchmark(setup: str, clients: List, requests: int) -> _Result:
+    start = time.perf_counter()
+    first_responses = await asyncio.gather(*clients)
+    return _Result(
+        setup=setup,
+        requests=len(clients) * requests,
+        seconds=time.perf_counter() - start,
+        first_response_seconds=sum(first_responses) / len(first_responses),
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + _STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("The HTTP server exited during startup.")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("The HTTP server didn't start in time.")
+
+
+def _benchmark_http(clients: int, requests: int, workers: int) -> _Result:
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "analytics_mcp.server",
+            "--transport=http",
+            f"--port={port}",
+            f"--workers={workers}",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port, server)
+        url = f"http://127.0.0.1:{port}/mcp"
+        return asyncio.run(
+            _benchmark(
+                f"http, {workers} worker(s)",
+                [_http_client(url, requests) for _ in range(clients)],
+                requests,
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(
+            _benchmark(
+                "stdio, 1 process per client",
+                [_stdio_client(args.requests) for _ in range(args.clients)],
+                args.requests,
+            )
+        )
+    ]
+    for workers in args.workers:
+        results.append(_benchmark_http(args.clients, args.requests, workers))
+
+    print(
+        f"{args.clients} clients, {args.requests} requests each\n"
+        f"{'setup':<30} {'requests/s':>12} {'first response (ms)':>20}"
+    )
+    for result in results:
+        print(
+            f"{result.setup:<30} {result.requests / result.seconds:>12.1f}"
+            f" {1000 * result.first_response_seconds:>20.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
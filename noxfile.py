@@ -85,3 +85,24 @@ def tests(session):
     session.run(
         *TEST_COMMAND,
     )
+
+
+HINTS_PATH = "analytics_mcp/tools/reporting/hints.py"
+
+
+@nox.session(venv_backend="none")
+def hints(session):
+    """Regenerates the argument hints used in the report tool descriptions."""
+    session.run(
+        "python",
+        "-c",
+        "from analytics_mcp.tools.reporting import metadata; "
+        f"open({HINTS_PATH!r}, 'w').write(metadata.render_hints_module())",
+    )
+    session.run("black", "-l", "80", HINTS_PATH)
+
+
+@nox.session(venv_backend="none")
+def benchmark(session):
+    """Compares the throughput of the stdio and streamable HTTP transports."""
+    session.run("python", "benchmarks/transports.py", *session.posargs)
@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the aggregation module."""
+
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import aggregation, core
+from google.analytics import data_v1beta
+
+_ROWS = [
+    ("US", "Chrome", "10", "30"),
+    ("US", "Safari", "5", "5"),
+    ("FR", "Chrome", "4", "8"),
+    ("DE", "Chrome", "0", "0"),
+]
+
+
+def _response() -> data_v1beta.RunReportResponse:
+    """Returns a report of sessions and events by country and browser."""
+    return data_v1beta.RunReportResponse(
+        dimension_headers=[
+            data_v1beta.DimensionHeader(name="country"),
+            data_v1beta.DimensionHeader(name="browser"),
+        ],
+        metric_headers=[
+            data_v1beta.MetricHeader(
+                name="sessions", type_=data_v1beta.MetricType.TYPE_INTEGER
+            ),
+            data_v1beta.MetricHeader(
+                name="eventCount", type_=data_v1beta.MetricType.TYPE_INTEGER
+            ),
+        ],
+        rows=[
+            data_v1beta.Row(
+                dimension_values=[
+                    data_v1beta.DimensionValue(value=value) for value in row[:2]
+                ],
+                metric_values=[
+                    data_v1beta.MetricValue(value=value) for value in row[2:]
+                ],
+            )
+            for row in _ROWS
+        ],
+        row_count=len(_ROWS),
+    )
+
+
+class TestAggregateReport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the aggregate_report tool."""
+
+    def setUp(self):
+        self.addCleanup(aggregation.clear)
+        aggregation.register("report", _response())
+
+    async def test_totals(self):
+        """Tests that all rows are aggregated without group_by."""
+        result = await aggregation.aggregate_report("report")
+        self.assertEqual(
+            {
+                "headers": ["sessions", "eventCount"],
+                "columns": [[19], [43]],
+                "row_count": 1,
+            },
+            result,
+        )
+
+    async def test_group_by_with_derived_metric_and_top_n(self):
+        """Tests grouping, ratios of sums and top-N."""
+        result = await aggregation.aggregate_report(
+            "report",
+            group_by=["country"],
+            metrics=["sessions", "eventCount"],
+            derived_metrics={"eventsPerSession": "eventCount / sessions"},
+            order_by="eventsPerSession",
+            limit=2,
+        )
+        self.assertEqual(
+            ["country", "sessions", "eventCount", "eventsPerSession"],
+            result["headers"],
+        )
+        self.assertEqual(
+            [["US", "FR"], [15, 4], [35, 8], [35 / 15, 2.0]],
+            result["columns"],
+        )
+        self.assertEqual(3, result["row_count"])
+
+    async def test_derived_metric_with_scientific_notation(self):
+        """Tests that numbers with exponents aren't read as names."""
+        result = await aggregation.aggregate_report(
+            "report",
+            metrics=["sessions"],
+            derived_metrics={"scaled": "sessions * 1e3 + 2.5E-1"},
+        )
+        self.assertEqual([[19], [19000.25]], result["columns"])
+
+    async def test_division_by_zero_sorts_last(self):
+        """Tests that undefined ratios are null and sorted last."""
+        result = await aggregation.aggregate_report(
+            "report",
+            group_by=["country"],
+            derived_metrics={"ratio": "eventCount / sessions"},
+            order_by="ratio",
+            desc=False,
+        )
+        self.assertEqual(["FR", "US", "DE"], result["columns"][0])
+        self.assertEqual([2.0, 35 / 15, None], result["columns"][3])
+
+    async def test_mean_min_max(self):
+        """Tests the other aggregations."""
+        for aggregation_name, expected in (
+            ("mean", [19 / 4]),
+            ("min", [0]),
+            ("max", [10]),
+        ):
+            with self.subTest(aggregation=aggregation_name):
+                result = await aggregation.aggregate_report(
+                    "report", metrics=["sessions"], aggregation=aggregation_name
+                )
+                self.assertEqual([expected], result["columns"])
+
+    async def test_invalid_arguments(self):
+        """Tests that unknown IDs, fields and expressions are rejected."""
+        for kwargs in (
+            {"result_id": "unknown"},
+            {"result_id": "report", "group_by": ["city"]},
+            {"result_id": "report", "metrics": ["users"]},
+            {"result_id": "report", "derived_metrics": {"x": "users / 2"}},
+            {"result_id": "report", "derived_metrics": {"x": "sessions ** 2"}},
+            {"result_id": "report", "order_by": "browser"},
+        ):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    await aggregation.aggregate_report(**kwargs)
+
+    async def test_results_are_bounded_by_size(self):
+        """Tests that old reports are dropped and loaded again if needed."""
+        size = data_v1beta.RunReportResponse.pb(_response()).ByteSize()
+        results = aggregation._Results(max_bytes=size * 2)
+        with mock.patch.object(aggregation, "_results", results):
+            for result_id in ("first", "second", "third"):
+                aggregation.register(result_id, _response())
+            self.assertIsNone(results.get((None, "first")))
+            self.assertIsNotNone(results.get((None, "third")))
+
+            with mock.patch.object(
+                core, "load_result", return_value=_response()
+            ) as load_result:
+                result = await aggregation.aggregate_report("first")
+            load_result.assert_awaited_once_with("first")
+            self.assertEqual([[19], [43]], result["columns"])
+
+    async def test_reports_larger_than_the_limit_are_not_kept(self):
+        """Tests that a report too large to keep can still be aggregated."""
+        results = aggregation._Results(max_bytes=1)
+        with mock.patch.object(aggregation, "_results", results):
+            aggregation.register("large", _response())
+            self.assertIsNone(results.get((None, "large")))
+            with mock.patch.object(
+                core, "load_result", return_value=_response()
+            ):
+                result = await aggregation.aggregate_report("large")
+        self.assertEqual([[19], [43]], result["columns"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -85,8 +85,14 @@ class TestAuthorization(unittest.TestCase):
         """Test that sensitive tools require approval."""
         sensitive_tools = [
             "run_report",
+            "batch_run_reports",
+            "get_report_page",
+            "run_pivot_report",
+            "batch_run_pivot_reports",
+            "aggregate_report",
             "run_realtime_report",
             "get_account_summaries",
+            "search_properties",
             "get_property_details",
             "list_google_ads_links",
             "get_custom_dimensions_and_metrics",
@@ -107,6 +113,7 @@ class TestAuthorization(unittest.TestCase):
         """Test getting approval prompt for account-related tools."""
         account_tools = [
             "get_account_summaries",
+            "search_properties",
             "get_property_details",
             "list_google_ads_links",
         ]
@@ -119,6 +126,11 @@ class TestAuthorization(unittest.TestCase):
         """Test getting approval prompt for data-related tools."""
         data_tools = [
             "run_report",
+            "batch_run_reports",
+            "get_report_page",
+            "run_pivot_report",
+            "batch_run_pivot_reports",
+            "aggregate_report",
             "run_realtime_report",
             "get_custom_dimensions_and_metrics",
         ]
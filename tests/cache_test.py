@@ -0,0 +1,255 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the report cache module."""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import cache
+from google.analytics import data_v1beta
+
+
+def _in_list_filter(field_name, values):
+    return data_v1beta.FilterExpression(
+        filter=data_v1beta.Filter(
+            field_name=field_name,
+            in_list_filter=data_v1beta.Filter.InListFilter(values=values),
+        )
+    )
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache class."""
+
+    def test_get_returns_cached_value(self):
+        """Tests that a cached value is returned before it expires."""
+        response_cache = cache.ResponseCache(max_bytes=100)
+        response_cache.put("key", b"value", ttl_seconds=60)
+        self.assertEqual(response_cache.get("key"), b"value")
+        self.assertIsNone(response_cache.get("other"))
+        self.assertEqual(response_cache.stats()["hits"], 1)
+        self.assertEqual(response_cache.stats()["misses"], 1)
+
+    def test_expired_value_is_not_returned(self):
+        """Tests that values expire after their TTL."""
+        response_cache = cache.ResponseCache(max_bytes=100)
+        with mock.patch.object(cache.time, "monotonic", return_value=0):
+            response_cache.put("key", b"value", ttl_seconds=60)
+        with mock.patch.object(cache.time, "monotonic", return_value=61):
+            self.assertIsNone(response_cache.get("key"))
+        self.assertEqual(response_cache.stats()["bytes"], 0)
+
+    def test_evicts_least_recently_used_by_size(self):
+        """Tests that LRU entries are evicted once the size limit is hit."""
+        response_cache = cache.ResponseCache(max_bytes=10)
+        response_cache.put("a", b"aaaa", ttl_seconds=60)
+        response_cache.put("b", b"bbbb", ttl_seconds=60)
+        response_cache.get("a")
+        response_cache.put("c", b"cccc", ttl_seconds=60)
+        self.assertIsNone(response_cache.get("b"), "b should be evicted")
+        self.assertEqual(response_cache.get("a"), b"aaaa")
+        self.assertEqual(response_cache.get("c"), b"cccc")
+        self.assertEqual(response_cache.stats()["bytes"], 8)
+
+    def test_oversized_value_is_not_cached(self):
+        """Tests that values larger than the cache are skipped."""
+        response_cache = cache.ResponseCache(max_bytes=4)
+        response_cache.put("key", b"too large", ttl_seconds=60)
+        self.assertIsNone(response_cache.get("key"))
+
+
+class TestRequestCacheKey(unittest.TestCase):
+    """Test cases for request_cache_key."""
+
+    def _request(self, dimension_filter, metrics=("sessions",)):
+        return data_v1beta.RunReportRequest(
+            property="properties/123",
+            metrics=[data_v1beta.Metric(name=m) for m in metrics],
+            dimension_filter=dimension_filter,
+        )
+
+    def test_filter_order_is_ignored(self):
+        """Tests that commutative parts of filters don't change the key."""
+        first = data_v1beta.FilterExpression(
+            and_group=data_v1beta.FilterExpressionList(
+                expressions=[
+                    _in_list_filter("country", ["FR", "DE"]),
+                    _in_list_filter("city", ["Paris"]),
+                ]
+            )
+        )
+        second = data_v1beta.FilterExpression(
+            and_group=data_v1beta.FilterExpressionList(
+                expressions=[
+                    _in_list_filter("city", ["Paris"]),
+                    _in_list_filter("country", ["DE", "FR"]),
+                ]
+            )
+        )
+        self.assertEqual(
+            cache.request_cache_key(self._request(first)),
+            cache.request_cache_key(self._request(second)),
+        )
+
+    def test_metric_order_is_significant(self):
+        """Tests that the order of metrics changes the key."""
+        self.assertNotEqual(
+            cache.request_cache_key(
+                self._request(None, metrics=("sessions", "users"))
+            ),
+            cache.request_cache_key(
+                self._request(None, metrics=("users", "sessions"))
+            ),
+        )
+
+    def test_user_is_significant(self):
+        """Tests that requests of different users have different keys."""
+        request = self._request(None)
+        server_key = cache.request_cache_key(request)
+        with mock.patch.object(cache, "current_user", return_value="alice"):
+            alice_key = cache.request_cache_key(request)
+        with mock.patch.object(cache, "current_user", return_value="bob"):
+            bob_key = cache.request_cache_key(request)
+        self.assertEqual(3, len({server_key, alice_key, bob_key}))
+
+
+class TestReportTtl(unittest.TestCase):
+    """Test cases for report_ttl_seconds."""
+
+    def _ttl(self, *end_dates, time_zone="UTC", hour=10):
+        return cache.report_ttl_seconds(
+            [
+                data_v1beta.DateRange(start_date="2025-01-01", end_date=end)
+                for end in end_dates
+            ],
+            time_zone,
+            today=datetime.date(2025, 6, 15),
+            now=datetime.datetime(
+                2025, 6, 15, hour, 30, tzinfo=datetime.timezone.utc
+            ),
+        )
+
+    def test_ttl_depends_on_most_recent_date(self):
+        """Tests that recent date ranges are cached for less time."""
+        self.assertEqual(self._ttl("today"), cache._TTL_TODAY_SECONDS)
+        self.assertEqual(self._ttl("yesterday"), cache._TTL_RECENT_SECONDS)
+        self.assertEqual(self._ttl("2daysAgo"), cache._TTL_RECENT_SECONDS)
+        # Until midnight, 13.5 hours later.
+        self.assertEqual(self._ttl("30daysAgo"), 13.5 * 60 * 60)
+        self.assertEqual(self._ttl("2025-01-31"), cache._TTL_HISTORICAL_SECONDS)
+        self.assertEqual(self._ttl("2025-06-15"), cache._TTL_TODAY_SECONDS)
+        self.assertEqual(
+            self._ttl("2025-01-31", "today"),
+            cache._TTL_TODAY_SECONDS,
+            "The most recent date range should determine the TTL",
+        )
+
+    def test_relative_dates_expire_at_midnight(self):
+        """Tests that relative dates are only cached until they change."""
+        # 23:30 in New York, where the property's day ends in 30 minutes.
+        self.assertEqual(
+            self._ttl("30daysAgo", time_zone="America/New_York", hour=3),
+            30 * 60,
+        )
+        self.assertEqual(
+            self._ttl("2025-01-31", time_zone="America/New_York", hour=3),
+            cache._TTL_HISTORICAL_SECONDS,
+        )
+        self.assertEqual(
+            self._ttl("30daysAgo", time_zone=""), cache._TTL_TODAY_SECONDS
+        )
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test cases for the DiskCache class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_shared_between_instances(self):
+        """Tests that values written by one instance are read by another."""
+        cache.DiskCache(self.directory).put("key", b"value" * 100, 60)
+        value, ttl_seconds = cache.DiskCache(self.directory).get("key")
+        self.assertEqual(value, b"value" * 100)
+        self.assertGreater(ttl_seconds, 0)
+        self.assertIsNone(cache.DiskCache(self.directory).get("other"))
+
+    def test_expired_value_is_not_returned(self):
+        """Tests that values expire after their TTL."""
+        disk_cache = cache.DiskCache(self.directory)
+        with mock.patch.object(cache.time, "time", return_value=1000):
+            disk_cache.put("key", b"value", 60)
+        with mock.patch.object(cache.time, "time", return_value=1061):
+            self.assertIsNone(disk_cache.get("key"))
+
+    def test_evicts_least_recently_used_by_size(self):
+        """Tests that LRU entries are evicted once the size limit is hit."""
+        values = {key: os.urandom(100) for key in ("a", "b", "c")}
+        disk_cache = cache.DiskCache(self.directory, max_bytes=250)
+        with mock.patch.object(cache.time, "time", return_value=1000):
+            disk_cache.put("a", values["a"], 60)
+        with mock.patch.object(cache.time, "time", return_value=1001):
+            disk_cache.put("b", values["b"], 60)
+        with mock.patch.object(cache.time, "time", return_value=1002):
+            disk_cache.get("a")
+        with mock.patch.object(cache.time, "time", return_value=1003):
+            disk_cache.put("c", values["c"], 60)
+            self.assertIsNone(disk_cache.get("b"), "b should be evicted")
+            self.assertEqual(disk_cache.get("a")[0], values["a"])
+            self.assertEqual(disk_cache.get("c")[0], values["c"])
+
+    def test_database_is_private(self):
+        """Tests that only the OS user can read the cached responses."""
+        directory = os.path.join(self.directory, "cache")
+        disk_cache = cache.DiskCache(directory)
+        disk_cache.put("key", b"value", 60)
+        self.assertEqual(0o700, os.stat(directory).st_mode & 0o777)
+        self.assertEqual(0o600, os.stat(disk_cache._path).st_mode & 0o777)
+
+
+class TestSharedCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for looking up and storing responses on disk."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.fingerprint = "alice"
+        for patcher in (
+            mock.patch.object(cache, "_disk_cache", cache.DiskCache(directory)),
+            mock.patch.object(cache, "_DISK_CACHE_ENABLED", True),
+            mock.patch.object(
+                cache,
+                "credentials_fingerprint",
+                side_effect=lambda: self.fingerprint,
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cache.report_cache.clear()
+        self.addCleanup(cache.report_cache.clear)
+
+    async def test_processes_with_other_credentials_miss(self):
+        """Tests that responses on disk are only served to their principal."""
+        await cache.store("key", b"value", 60)
+        cache.report_cache.clear()
+        self.fingerprint = "bob"
+        self.assertIsNone(await cache.lookup("key"))
+        self.fingerprint = "alice"
+        self.assertEqual(b"value", await cache.lookup("key"))
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the coalescing module."""
+
+import asyncio
+import unittest
+
+from analytics_mcp.tools import coalescing, utils
+
+
+class TestRequestCoalescer(unittest.IsolatedAsyncioTestCase):
+    """Test cases for RequestCoalescer."""
+
+    def setUp(self):
+        self.coalescer = coalescing.RequestCoalescer()
+        self.release = asyncio.Event()
+        self.call_count = 0
+
+    async def _call(self):
+        self.call_count += 1
+        await self.release.wait()
+        return self.call_count
+
+    async def test_concurrent_calls_are_coalesced(self):
+        """Tests that concurrent calls with the same key share a call."""
+        tasks = [
+            asyncio.ensure_future(self.coalescer.run("key", self._call))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual([1, 1, 1], await asyncio.gather(*tasks))
+        self.assertEqual(
+            {"calls": 1, "coalesced": 2, "in_flight": 0},
+            self.coalescer.stats(),
+        )
+
+    async def test_different_keys_are_not_coalesced(self):
+        """Tests that calls with different keys run separately."""
+        self.release.set()
+        await asyncio.gather(
+            self.coalescer.run("a", self._call),
+            self.coalescer.run("b", self._call),
+        )
+        self.assertEqual(2, self.call_count)
+
+    async def test_calls_of_different_users_are_not_coalesced(self):
+        """Tests that calls with the same key don't share credentials."""
+
+        async def run_as(user):
+            utils._current_user.set(user)
+            return await self.coalescer.run("key", self._call)
+
+        tasks = [
+            asyncio.ensure_future(run_as(user)) for user in ("alice", "bob")
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(2, self.call_count)
+
+    async def test_sequential_calls_are_not_coalesced(self):
+        """Tests that a completed call isn't reused."""
+        self.release.set()
+        self.assertEqual(1, await self.coalescer.run("key", self._call))
+        self.assertEqual(2, await self.coalescer.run("key", self._call))
+
+    async def test_errors_are_shared(self):
+        """Tests that every caller of a failed call gets its error."""
+
+        async def fail():
+            await self.release.wait()
+            raise ValueError("failed")
+
+        tasks = [
+            asyncio.ensure_future(self.coalescer.run("key", fail))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_cancelled_caller_does_not_cancel_call(self):
+        """Tests that the call continues for others if a caller cancels."""
+        first = asyncio.ensure_future(self.coalescer.run("key", self._call))
+        second = asyncio.ensure_future(self.coalescer.run("key", self._call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(1, await second)
+        self.assertTrue(first.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,356 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the core reporting module."""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import (
+    aggregation,
+    cache,
+    core,
+    metadata,
+    quota,
+    validation,
+)
+from analytics_mcp.tools.reporting.cache import report_cache
+from google.analytics import data_v1beta
+
+
+class TestRunReport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the run_report tool."""
+
+    async def asyncSetUp(self):
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+        self.addCleanup(quota.tracker.clear)
+        self.addCleanup(aggregation.clear)
+        self.client = mock.AsyncMock()
+        self.client.run_report.return_value = data_v1beta.RunReportResponse(
+            row_count=1
+        )
+        patcher = mock.patch.object(
+            core, "create_data_api_client", return_value=self.client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Requests are validated in validation_test.py.
+        patcher = mock.patch.object(validation, "_VALIDATE_REPORTS", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Lets the tests page through small reports.
+        patcher = mock.patch.object(core, "_MIN_FETCH_ALL_PAGE_SIZE", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _run_report(self, **kwargs):
+        return await core.run_report(
+            property_id=123,
+            date_ranges=[
+                {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+            ],
+            dimensions=["country"],
+            metrics=["sessions"],
+            **kwargs,
+        )
+
+    async def test_identical_requests_are_cached(self):
+        """Tests that a repeated report is served from the cache."""
+        first = await self._run_report()
+        second = await self._run_report()
+        self.assertEqual(first, second)
+        self.client.run_report.assert_awaited_once()
+
+    async def test_result_can_be_aggregated(self):
+        """Tests that reports return an ID for aggregate_report."""
+        first = await self._run_report()
+        second = await self._run_report(output_format="columnar")
+        self.assertEqual(first["result_id"], second["result_id"])
+        self.assertNotEqual(
+            first["result_id"],
+            (await self._run_report(fetch_all=True))["result_id"],
+        )
+        totals = await aggregation.aggregate_report(first["result_id"])
+        self.assertEqual(1, totals["row_count"])
+
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        """Tests that identical concurrent reports share one API call."""
+        release = asyncio.Event()
+
+        async def run_report(request):
+            await release.wait()
+            return data_v1beta.RunReportResponse(row_count=1)
+
+        self.client.run_report.side_effect = run_report
+        tasks = [
+            asyncio.ensure_future(self._run_report(cache_control="bypass"))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual([results[0]] * 3, results)
+        self.client.run_report.assert_awaited_once()
+
+    async def test_property_quota_always_requested(self):
+        """Tests that quota is requested but only returned if asked for."""
+        self.client.run_report.side_effect = lambda request: (
+            data_v1beta.RunReportResponse(
+                property_quota=data_v1beta.PropertyQuota(
+                    tokens_per_hour=data_v1beta.QuotaStatus(
+                        consumed=10, remaining=1000
+                    )
+                )
+            )
+        )
+        without_quota = await self._run_report()
+        with_quota = await self._run_report(return_property_quota=True)
+        for call in self.client.run_report.await_args_list:
+            self.assertTrue(call.args[0].return_property_quota)
+        self.assertNotIn("property_quota", without_quota)
+        self.assertIn("property_quota", with_quota)
+        self.assertEqual(
+            1000,
+            quota.tracker.status("properties/123")["tokens_per_hour"][
+                "remaining"
+            ],
+        )
+
+    async def test_cache_control(self):
+        """Tests that cache_control skips the cache lookup."""
+        await self._run_report()
+        await self._run_report(cache_control="refresh")
+        await self._run_report(cache_control="bypass")
+        self.assertEqual(self.client.run_report.await_count, 3)
+
+    async def test_reports_are_validated_against_metadata(self):
+        """Tests that invalid reports are rejected before they're sent."""
+        self.client.get_metadata.return_value = data_v1beta.Metadata(
+            dimensions=[data_v1beta.DimensionMetadata(api_name="country")],
+            metrics=[data_v1beta.MetricMetadata(api_name="sessions")],
+        )
+        self.client.check_compatibility.return_value = (
+            data_v1beta.CheckCompatibilityResponse()
+        )
+        metadata.property_metadata.clear()
+        self.addCleanup(metadata.property_metadata.clear)
+        for patcher in (
+            mock.patch.object(validation, "_VALIDATE_REPORTS", True),
+            mock.patch.object(
+                metadata, "create_data_api_client", return_value=self.client
+            ),
+            mock.patch.object(
+                validation, "create_data_api_client", return_value=self.client
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        await self._run_report()
+        with self.assertRaisesRegex(ValueError, "Unknown metric 'sesions'"):
+            await core.run_report(
+                property_id=123,
+                date_ranges=[
+                    {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+                ],
+                dimensions=["country"],
+                metrics=["sesions"],
+            )
+        self.client.run_report.assert_awaited_once()
+        self.client.get_metadata.assert_awaited_once()
+
+    def _paged_responses(self, row_count):
+        """Makes the mock client return pages of a report with row_count rows."""
+
+        def run_report(request):
+            end = min(request.offset + request.limit, row_count)
+            return data_v1beta.RunReportResponse(
+                row_count=row_count,
+                rows=[
+                    data_v1beta.Row(
+                        dimension_values=[
+                            data_v1beta.DimensionValue(value=str(i))
+                        ]
+                    )
+                    for i in range(request.offset, end)
+                ],
+            )
+
+        self.client.run_report.side_effect = run_report
+
+    async def test_fetch_all_merges_pages_in_order(self):
+        """Tests that fetch_all returns the rows of every page in order."""
+        self._paged_responses(25)
+        response = await self._run_report(fetch_all=True, limit=10)
+        self.assertEqual(
+            [row["dimension_values"][0]["value"] for row in response["rows"]],
+            [str(i) for i in range(25)],
+        )
+        self.assertEqual(self.client.run_report.await_count, 3)
+
+    async def test_fetch_all_respects_max_rows(self):
+        """Tests that fetch_all stops after max_rows rows."""
+        self._paged_responses(25)
+        response = await self._run_report(fetch_all=True, limit=10, max_rows=15)
+        self.assertEqual(len(response["rows"]), 15)
+        self.assertEqual(self.client.run_report.await_count, 2)
+
+    async def test_fetch_all_pages_are_no_larger_than_max_rows(self):
+        """Tests that fetch_all without a limit requests max_rows rows."""
+        self._paged_responses(25)
+        response = await self._run_report(fetch_all=True, max_rows=15)
+        self.assertEqual(len(response["rows"]), 15)
+        self.client.run_report.assert_awaited_once()
+        request = self.client.run_report.await_args.args[0]
+        self.assertEqual(request.limit, 15)
+
+    async def test_fetch_all_pages_have_a_minimum_size(self):
+        """Tests that a small limit doesn't split a report into many pages."""
+        self._paged_responses(25)
+        with mock.patch.object(core, "_MIN_FETCH_ALL_PAGE_SIZE", 20):
+            response = await self._run_report(fetch_all=True, limit=2)
+        self.assertEqual(len(response["rows"]), 25)
+        self.assertEqual(self.client.run_report.await_count, 2)
+
+    async def test_pages_are_fetched_as_read(self):
+        """Tests that a streamed report is fetched one page at a time."""
+        self._paged_responses(25)
+        summary = await self._run_report(stream=True, limit=10, max_rows=22)
+        self.assertEqual(summary["row_count"], 22)
+        self.assertEqual(summary["page_count"], 3)
+        self.assertEqual(self.client.run_report.await_count, 1)
+
+        values = []
+        for page in range(summary["page_count"]):
+            result = await core.get_report_page(summary["report_id"], page)
+            values.extend(
+                row["dimension_values"][0]["value"]
+                for row in result["report"]["rows"]
+            )
+        self.assertEqual(values, [str(i) for i in range(22)])
+        self.assertEqual(
+            self.client.run_report.await_count,
+            3,
+            "The first page should be served from the cache",
+        )
+
+    async def test_ids_are_shared_by_worker_processes(self):
+        """Tests that other processes resume reports through the disk cache."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for patcher in (
+            mock.patch.object(cache, "_disk_cache", cache.DiskCache(directory)),
+            mock.patch.object(cache, "_DISK_CACHE_ENABLED", True),
+            mock.patch.object(
+                cache, "credentials_fingerprint", return_value="server"
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self._paged_responses(15)
+        result = await self._run_report(fetch_all=True, limit=10)
+        summary = await self._run_report(stream=True, limit=10)
+        api_calls = self.client.run_report.await_count
+        # Another process has none of the reports in memory.
+        report_cache.clear()
+        aggregation.clear()
+        totals = await aggregation.aggregate_report(result["result_id"])
+        self.assertEqual(1, totals["row_count"])
+        page = await core.get_report_page(summary["report_id"], 1)
+        self.assertEqual(5, len(page["report"]["rows"]))
+        self.assertEqual(api_calls, self.client.run_report.await_count)
+
+    async def test_invalid_page(self):
+        """Tests that unknown reports and pages are rejected."""
+        self._paged_responses(5)
+        summary = await self._run_report(stream=True)
+        with self.assertRaises(ValueError):
+            await core.get_report_page(summary["report_id"], 1)
+        with self.assertRaises(ValueError):
+            await core.get_report_page("unknown", 0)
+
+
+class TestBatchRunReports(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the batch_run_reports tool."""
+
+    async def asyncSetUp(self):
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+        self.addCleanup(quota.tracker.clear)
+        self.client = mock.AsyncMock()
+
+        def batch_run_reports(request):
+            return data_v1beta.BatchRunReportsResponse(
+                reports=[
+                    data_v1beta.RunReportResponse(
+                        metric_headers=[
+                            data_v1beta.MetricHeader(name=r.metrics[0].name)
+                        ]
+                    )
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_run_reports.side_effect = batch_run_reports
+        patcher = mock.patch.object(
+            core, "create_data_api_client", return_value=self.client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Requests are validated in validation_test.py.
+        patcher = mock.patch.object(validation, "_VALIDATE_REPORTS", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _spec(self, metric):
+        return {
+            "date_ranges": [
+                {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+            ],
+            "dimensions": [],
+            "metrics": [metric],
+        }
+
+    async def test_results_align_with_input(self):
+        """Tests that reports are chunked and returned in input order."""
+        metrics = [f"metric{i}" for i in range(12)]
+        responses = await core.batch_run_reports(
+            123, [self._spec(metric) for metric in metrics]
+        )
+        self.assertEqual(
+            [r["metric_headers"][0]["name"] for r in responses], metrics
+        )
+        self.assertEqual(self.client.batch_run_reports.await_count, 3)
+
+    async def test_cached_reports_are_not_rerun(self):
+        """Tests that only uncached reports are sent to the API."""
+        await core.batch_run_reports(123, [self._spec("sessions")])
+        await core.batch_run_reports(
+            123, [self._spec("sessions"), self._spec("users")]
+        )
+        last_request = self.client.batch_run_reports.await_args.args[0]
+        self.assertEqual(
+            [r.metrics[0].name for r in last_request.requests], ["users"]
+        )
+
+    async def test_invalid_spec(self):
+        """Tests that unknown keys in a report spec are rejected."""
+        with self.assertRaises(ValueError):
+            await core.batch_run_reports(
+                123, [dict(self._spec("sessions"), unknown=1)]
+            )
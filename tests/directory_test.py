@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the directory module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools import utils
+from analytics_mcp.tools.admin import directory
+
+
+def _summary(account_id, account_name, properties):
+    """Returns an account summary with properties given by ID and name."""
+    return {
+        "name": f"accountSummaries/{account_id}",
+        "account": f"accounts/{account_id}",
+        "display_name": account_name,
+        "property_summaries": [
+            {
+                "property": f"properties/{property_id}",
+                "display_name": property_name,
+                "property_type": "PROPERTY_TYPE_ORDINARY",
+                "parent": f"accounts/{account_id}",
+            }
+            for property_id, property_name in properties
+        ],
+    }
+
+
+_ACME = _summary(1, "Acme", [(11, "Acme Web"), (12, "Acme iOS App")])
+_GLOBEX = _summary(2, "Globex", [(21, "Globex Website")])
+
+
+def _property_ids(results):
+    return [result["property"] for result in results]
+
+
+class TestDirectory(unittest.TestCase):
+    """Test cases for Directory."""
+
+    def setUp(self):
+        self.directory = directory.Directory()
+        self.directory.update([_ACME, _GLOBEX])
+
+    def test_search_by_id(self):
+        """Tests that properties are found by property or account ID."""
+        self.assertEqual(
+            ["properties/21"], _property_ids(self.directory.search("21", 10))
+        )
+        self.assertEqual(
+            ["properties/11"],
+            _property_ids(self.directory.search("properties/11", 10)),
+        )
+        self.assertEqual(
+            ["properties/11", "properties/12"],
+            _property_ids(self.directory.search("accounts/1", 10)),
+        )
+        self.assertEqual([], self.directory.search("properties/99", 10))
+
+    def test_numbers_also_match_names(self):
+        """Tests that a number matches both IDs and words of names."""
+        summary = _summary(3, "Initech", [(2024, "Site 21"), (31, "2024 Site")])
+        self.directory.update([_ACME, _GLOBEX, summary])
+        self.assertEqual(
+            ["properties/31"],
+            _property_ids(self.directory.search("2024 site", 10)),
+        )
+        self.assertEqual(
+            ["properties/2024", "properties/31"],
+            _property_ids(self.directory.search("2024", 10)),
+        )
+        self.assertEqual(
+            ["properties/21", "properties/2024"],
+            _property_ids(self.directory.search("21", 10)),
+        )
+
+    def test_search_by_word_prefix(self):
+        """Tests that every word of the query must prefix a word."""
+        self.assertEqual(
+            ["properties/21"],
+            _property_ids(self.directory.search("glob web", 10)),
+        )
+        self.assertEqual(
+            ["properties/12"],
+            _property_ids(self.directory.search("ACME app", 10)),
+        )
+        self.assertEqual([], self.directory.search("acme android", 10))
+
+    def test_exact_words_rank_first(self):
+        """Tests that exact matches of words rank above prefix matches."""
+        summary = _summary(3, "Initech", [(31, "Webshop"), (32, "Web")])
+        self.directory.update([_ACME, _GLOBEX, summary])
+        self.assertEqual(
+            ["properties/11", "properties/32", "properties/21"],
+            _property_ids(self.directory.search("web", 3)),
+        )
+
+    def test_search_with_misspelled_word(self):
+        """Tests that misspelled words match similar words."""
+        self.assertEqual(
+            ["properties/21"],
+            _property_ids(self.directory.search("globx", 10)),
+        )
+
+    def test_update_reindexes_changed_accounts(self):
+        """Tests that only changed accounts are reindexed."""
+        renamed = _summary(2, "Globex", [(21, "Globex Shop")])
+        self.assertEqual(1, self.directory.update([_ACME, renamed]))
+        self.assertEqual([], self.directory.search("website", 10))
+        self.assertEqual(
+            ["properties/21"], _property_ids(self.directory.search("shop", 10))
+        )
+        self.assertEqual(1, self.directory.update([renamed]))
+        self.assertEqual([], self.directory.search("acme", 10))
+        self.assertEqual([renamed], self.directory.summaries())
+
+
+class TestDirectoryCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DirectoryCache."""
+
+    def setUp(self):
+        self.now = 1000.0
+        # Only patches the clock of the module, not that of the event loop.
+        patcher = mock.patch.object(directory, "time")
+        patcher.start().monotonic.side_effect = lambda: self.now
+        self.addCleanup(patcher.stop)
+        self.fetch = mock.AsyncMock(return_value=[_ACME])
+        self.cache = directory.DirectoryCache(
+            self.fetch, ttl_seconds=60, max_users=2
+        )
+
+    async def test_fresh_directory_is_cached(self):
+        """Tests that accounts are listed once within the TTL."""
+        first = await self.cache.get()
+        self.now += 59
+        self.assertIs(first, await self.cache.get())
+        self.fetch.assert_awaited_once()
+
+    async def test_stale_directory_is_refreshed_in_background(self):
+        """Tests that a stale directory is served while it's refreshed."""
+        await self.cache.get()
+        self.fetch.return_value = [_ACME, _GLOBEX]
+        self.now += 61
+        stale = await self.cache.get()
+        self.assertEqual([_ACME], stale.summaries())
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.assertEqual([_ACME, _GLOBEX], (await self.cache.get()).summaries())
+        self.assertEqual(
+            {
+                "hits": 1,
+                "stale_hits": 1,
+                "misses": 1,
+                "refreshes": 2,
+                "changed_accounts": 2,
+                "users": 1,
+            },
+            self.cache.stats(),
+        )
+
+    async def test_concurrent_misses_share_a_listing(self):
+        """Tests that concurrent callers wait for the same listing."""
+        first, second = await asyncio.gather(self.cache.get(), self.cache.get())
+        self.assertIs(first, second)
+        self.fetch.assert_awaited_once()
+
+    async def test_directories_are_per_user(self):
+        """Tests that each user gets their own directory."""
+        server_directory = await self.cache.get()
+        token = utils._current_user.set("alice")
+        try:
+            self.assertIsNot(server_directory, await self.cache.get())
+        finally:
+            utils._current_user.reset(token)
+        self.assertEqual(2, self.fetch.await_count)
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the report formats module."""
+
+import unittest
+
+from analytics_mcp.tools.reporting import formats
+from google.analytics import data_v1beta
+
+
+def _row(dimension_values, metric_values):
+    return data_v1beta.Row(
+        dimension_values=[
+            data_v1beta.DimensionValue(value=v) for v in dimension_values
+        ],
+        metric_values=[data_v1beta.MetricValue(value=v) for v in metric_values],
+    )
+
+
+class TestFormats(unittest.TestCase):
+    """Test cases for the formats module."""
+
+    def setUp(self):
+        self.response = data_v1beta.RunReportResponse(
+            dimension_headers=[data_v1beta.DimensionHeader(name="country")],
+            metric_headers=[
+                data_v1beta.MetricHeader(
+                    name="sessions", type_=data_v1beta.MetricType.TYPE_INTEGER
+                ),
+                data_v1beta.MetricHeader(
+                    name="bounceRate", type_=data_v1beta.MetricType.TYPE_FLOAT
+                ),
+            ],
+            rows=[
+                _row(["France"], ["10", "0.5"]),
+                _row(["Germany"], ["20", "0.25"]),
+            ],
+            totals=[_row(["RESERVED_TOTAL"], ["30", "0.33"])],
+            row_count=2,
+        )
+
+    def test_to_columnar(self):
+        """Tests that rows are converted to typed columns."""
+        self.assertEqual(
+            formats.to_columnar(self.response),
+            {
+                "headers": ["country", "sessions", "bounceRate"],
+                "metric_types": {
+                    "sessions": "TYPE_INTEGER",
+                    "bounceRate": "TYPE_FLOAT",
+                },
+                "columns": [["France", "Germany"], [10, 20], [0.5, 0.25]],
+                "row_count": 2,
+                "totals": [["RESERVED_TOTAL"], [30], [0.33]],
+            },
+        )
+
+    def test_to_columnar_empty_report(self):
+        """Tests that a report without rows has empty columns."""
+        response = data_v1beta.RunReportResponse(
+            dimension_headers=self.response.dimension_headers,
+            metric_headers=self.response.metric_headers,
+        )
+        self.assertEqual(formats.to_columnar(response)["columns"], [[], [], []])
+
+    def test_format_report_proto(self):
+        """Tests that the proto format mirrors the response protobuf."""
+        result = formats.format_report(self.response, "proto")
+        self.assertEqual(
+            result["rows"][0]["dimension_values"][0]["value"], "France"
+        )
@@ -0,0 +1,33 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the hints module."""
+
+import unittest
+
+from analytics_mcp.tools.reporting import hints, metadata
+
+
+class TestHints(unittest.TestCase):
+    """Test cases for the hints module."""
+
+    def test_hints_match_metadata(self):
+        """Tests that the generated hints are up to date."""
+        for name, hint_function in metadata._HINT_CONSTANTS.items():
+            with self.subTest(name=name):
+                self.assertEqual(
+                    getattr(hints, name),
+                    hint_function(),
+                    "hints.py is out of date. Run `nox -s hints`.",
+                )
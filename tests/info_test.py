@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the info module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.admin import info
+from google.analytics import admin_v1beta
+
+
+class _FakePager:
+    """A pager over Google Ads links, with pages of the given sizes."""
+
+    def __init__(self, page_sizes, events):
+        self.page_sizes = page_sizes
+        self.events = events
+        self.fetched = 0
+
+    @property
+    def pages(self):
+        return self._pages()
+
+    async def _pages(self):
+        for index, size in enumerate(self.page_sizes):
+            if index:
+                self.events.append(f"fetch {index}")
+                await asyncio.sleep(0)
+            self.fetched += 1
+            yield admin_v1beta.ListGoogleAdsLinksResponse(
+                google_ads_links=[
+                    admin_v1beta.GoogleAdsLink(name=f"{index}/{i}")
+                    for i in range(size)
+                ],
+                next_page_token=(
+                    "next" if index < len(self.page_sizes) - 1 else ""
+                ),
+            )
+
+
+class TestCollectItems(unittest.IsolatedAsyncioTestCase):
+    """Test cases for _collect_items."""
+
+    def setUp(self):
+        self.events = []
+        convert = info.proto_to_dict
+
+        def proto_to_dict(item):
+            self.events.append(f"convert {item.name}")
+            return convert(item)
+
+        patcher = mock.patch.object(info, "proto_to_dict", proto_to_dict)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_collects_all_pages(self):
+        """Tests that the items of every page are returned in order."""
+        pager = _FakePager([2, 1], self.events)
+        items = await info._collect_items(pager, "google_ads_links")
+        self.assertEqual(["0/0", "0/1", "1/0"], [i["name"] for i in items])
+
+    async def test_next_page_is_prefetched(self):
+        """Tests that the next page is requested before the conversion."""
+        pager = _FakePager([1, 1], self.events)
+        await info._collect_items(pager, "google_ads_links")
+        self.assertEqual(["fetch 1", "convert 0/0", "convert 1/0"], self.events)
+
+    async def test_stops_at_max_items(self):
+        """Tests that pages past the maximum number of items aren't fetched."""
+        pager = _FakePager([2, 2, 2], self.events)
+        items = await info._collect_items(pager, "google_ads_links", 3)
+        self.assertEqual(["0/0", "0/1", "1/0"], [i["name"] for i in items])
+        self.assertEqual(2, pager.fetched)
+
+
+class TestListTools(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the listing tools."""
+
+    async def test_list_google_ads_links_uses_maximum_page_size(self):
+        """Tests that links are listed with the largest page size."""
+        client = mock.Mock()
+        client.list_google_ads_links = mock.AsyncMock(
+            return_value=_FakePager([1], [])
+        )
+        with mock.patch.object(
+            info, "create_admin_api_client", return_value=client
+        ):
+            links = await info.list_google_ads_links("123", limit=5)
+        self.assertEqual(1, len(links))
+        request = client.list_google_ads_links.await_args.kwargs["request"]
+        self.assertEqual("properties/123", request.parent)
+        self.assertEqual(info._MAX_PAGE_SIZE, request.page_size)
@@ -0,0 +1,47 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the lazy_imports module."""
+
+import json
+import unittest
+from unittest import mock
+
+from analytics_mcp import lazy_imports
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test cases for the lazy_imports module."""
+
+    def test_imports_on_first_attribute_access(self):
+        """Tests that the module is only imported when it's used."""
+        with mock.patch.object(
+            lazy_imports.importlib, "import_module", return_value=json
+        ) as import_module:
+            module = lazy_imports.LazyModule("json")
+            import_module.assert_not_called()
+            self.assertIs(json.dumps, module.dumps)
+            self.assertIs(json.loads, module.loads)
+        import_module.assert_called_once_with("json")
+
+    def test_preload(self):
+        """Tests that preloading imports modules and ignores failures."""
+        with mock.patch.object(lazy_imports, "_lazy_modules", []):
+            missing = lazy_imports.lazy_import("analytics_mcp.no_such_module")
+            present = lazy_imports.lazy_import("json")
+            with self.assertLogs(lazy_imports.__name__, level="ERROR"):
+                lazy_imports.preload()
+        self.assertIs(json, present.load())
+        with self.assertRaises(ModuleNotFoundError):
+            missing.load()
@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the metadata_cache module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import metadata_cache
+from google.analytics import data_v1beta
+
+
+def _metadata(*custom_dimensions: str) -> data_v1beta.Metadata:
+    """Returns metadata with a standard metric and the custom dimensions."""
+    return data_v1beta.Metadata(
+        dimensions=[
+            data_v1beta.DimensionMetadata(api_name=name, custom_definition=True)
+            for name in custom_dimensions
+        ],
+        metrics=[data_v1beta.MetricMetadata(api_name="sessions")],
+    )
+
+
+async def _run_background_tasks():
+    """Lets tasks started in the background, and their callbacks, run."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestMetadataCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for MetadataCache."""
+
+    def setUp(self):
+        self.now = 1000.0
+        # Only patches the clock of the module, not that of the event loop.
+        patcher = mock.patch.object(metadata_cache, "time")
+        patcher.start().monotonic.side_effect = lambda: self.now
+        self.addCleanup(patcher.stop)
+        self.fetch = mock.AsyncMock(return_value=_metadata("customEvent:a"))
+        self.cache = metadata_cache.MetadataCache(
+            self.fetch, ttl_seconds=60, max_stale_seconds=600, max_properties=2
+        )
+
+    async def test_indexes_by_api_name(self):
+        """Tests that dimensions and metrics are indexed by API name."""
+        metadata = await self.cache.get("properties/1")
+        self.assertEqual(["customEvent:a"], list(metadata.dimensions))
+        self.assertEqual(["sessions"], list(metadata.metrics))
+        self.assertEqual(
+            ["customEvent:a"],
+            [d["api_name"] for d in metadata.custom_dimensions],
+        )
+        self.assertEqual([], metadata.custom_metrics)
+
+    async def test_fresh_metadata_is_cached(self):
+        """Tests that metadata is fetched once within its TTL."""
+        first = await self.cache.get("properties/1")
+        self.now += 59
+        second = await self.cache.get("properties/1")
+        self.assertIs(first, second)
+        self.fetch.assert_awaited_once_with("properties/1", refresh=False)
+        self.assertEqual(1, self.cache.stats()["hits"])
+
+    async def test_refresh_fetches_fresh_metadata(self):
+        """Tests that refresh fetches metadata that's cached and fresh."""
+        await self.cache.get("properties/1")
+        self.fetch.return_value = _metadata("customEvent:b")
+        refreshed = await self.cache.refresh("properties/1")
+        self.assertEqual(["customEvent:b"], list(refreshed.dimensions))
+        self.assertIs(refreshed, await self.cache.get("properties/1"))
+        self.assertEqual(2, self.fetch.await_count)
+        self.fetch.assert_awaited_with("properties/1", refresh=True)
+
+    async def test_stale_metadata_is_refreshed_in_background(self):
+        """Tests that stale metadata is served while it's refreshed."""
+        first = await self.cache.get("properties/1")
+        self.fetch.return_value = _metadata("customEvent:b")
+        self.now += 61
+        stale = await self.cache.get("properties/1")
+        self.assertIs(first, stale)
+        await _run_background_tasks()
+        refreshed = await self.cache.get("properties/1")
+        self.assertEqual(["customEvent:b"], list(refreshed.dimensions))
+        self.assertEqual(2, self.fetch.await_count)
+        self.assertEqual(1, self.cache.stats()["stale_hits"])
+
+    async def test_failed_background_refresh_keeps_stale_metadata(self):
+        """Tests that stale metadata is kept if a refresh fails."""
+        first = await self.cache.get("properties/1")
+        self.fetch.side_effect = RuntimeError("unavailable")
+        self.now += 61
+        with self.assertLogs(metadata_cache.__name__, level="WARNING"):
+            self.assertIs(first, await self.cache.get("properties/1"))
+            await _run_background_tasks()
+        self.assertIs(first, await self.cache.get("properties/1"))
+        self.assertEqual(1, self.cache.stats()["refresh_failures"])
+
+    async def test_expired_metadata_is_fetched(self):
+        """Tests that callers wait for metadata that's too stale."""
+        await self.cache.get("properties/1")
+        self.fetch.return_value = _metadata("customEvent:b")
+        self.now += 661
+        metadata = await self.cache.get("properties/1")
+        self.assertEqual(["customEvent:b"], list(metadata.dimensions))
+
+    async def test_concurrent_misses_share_fetch(self):
+        """Tests that concurrent callers share one fetch."""
+        results = await asyncio.gather(
+            *(self.cache.get("properties/1") for _ in range(3))
+        )
+        self.assertIs(results[0], results[2])
+        self.fetch.assert_awaited_once()
+
+    async def test_evicts_least_recently_used(self):
+        """Tests that the least recently used property is evicted."""
+        await self.cache.get("properties/1")
+        await self.cache.get("properties/2")
+        await self.cache.get("properties/1")
+        await self.cache.get("properties/3")
+        self.assertEqual(2, self.cache.stats()["properties"])
+        await self.cache.get("properties/1")
+        self.assertEqual(3, self.fetch.await_count)
+        await self.cache.get("properties/2")
+        self.assertEqual(4, self.fetch.await_count)
@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the metadata module."""
+
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import metadata
+from analytics_mcp.tools.reporting.cache import report_cache
+from google.analytics import data_v1beta
+
+
+class TestGetCustomDimensionsAndMetrics(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the get_custom_dimensions_and_metrics tool."""
+
+    async def asyncSetUp(self):
+        report_cache.clear()
+        metadata.property_metadata.clear()
+        self.addCleanup(report_cache.clear)
+        self.addCleanup(metadata.property_metadata.clear)
+        self.client = mock.AsyncMock()
+        self.client.get_metadata.return_value = data_v1beta.Metadata(
+            dimensions=[
+                data_v1beta.DimensionMetadata(api_name="country"),
+                data_v1beta.DimensionMetadata(
+                    api_name="customEvent:plan", custom_definition=True
+                ),
+            ],
+            metrics=[data_v1beta.MetricMetadata(api_name="sessions")],
+        )
+        patcher = mock.patch.object(
+            metadata, "create_data_api_client", return_value=self.client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_returns_custom_definitions(self):
+        """Tests that metadata is fetched, cached and filtered."""
+        result = await metadata.get_custom_dimensions_and_metrics(123)
+        self.assertEqual(
+            ["customEvent:plan"],
+            [d["api_name"] for d in result["custom_dimensions"]],
+        )
+        self.assertEqual([], result["custom_metrics"])
+        request = self.client.get_metadata.await_args.args[0]
+        self.assertEqual("properties/123/metadata", request.name)
+
+        # Another process, or an evicted property, reads the report cache.
+        metadata.property_metadata.clear()
+        await metadata.get_custom_dimensions_and_metrics(123)
+        self.client.get_metadata.assert_awaited_once()
+
+    async def test_refresh_replaces_cached_metadata(self):
+        """Tests that a refresh skips and replaces the cached response."""
+        await metadata.get_custom_dimensions_and_metrics(123)
+        self.client.get_metadata.return_value = data_v1beta.Metadata(
+            dimensions=[
+                data_v1beta.DimensionMetadata(
+                    api_name="customEvent:tier", custom_definition=True
+                )
+            ]
+        )
+        refreshed = await metadata.property_metadata.refresh("properties/123")
+        self.assertIn("customEvent:tier", refreshed.dimensions)
+        self.assertEqual(2, self.client.get_metadata.await_count)
+
+        metadata.property_metadata.clear()
+        result = await metadata.get_custom_dimensions_and_metrics(123)
+        self.assertEqual(
+            ["customEvent:tier"],
+            [d["api_name"] for d in result["custom_dimensions"]],
+        )
+        self.assertEqual(2, self.client.get_metadata.await_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the metrics module."""
+
+import unittest
+
+from analytics_mcp.coordinator import mcp
+from analytics_mcp.tools import metrics
+from analytics_mcp.tools import server_stats
+from google.analytics import data_v1beta
+from google.api_core import exceptions
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for Histogram."""
+
+    def setUp(self):
+        self.histogram = metrics.Histogram(
+            "test_seconds", "Test durations.", ("tool",), (0.1, 1.0)
+        )
+
+    def test_summary(self):
+        """Tests that quantiles are the bounds of the buckets they fall in."""
+        for value in (0.05, 0.05, 0.5, 5.0):
+            self.histogram.observe(value, "run_report")
+        summary = self.histogram.summary("run_report")
+        self.assertEqual(4, summary["count"])
+        self.assertAlmostEqual(1.4, summary["mean"])
+        self.assertEqual(0.1, summary["p50"])
+        self.assertEqual(float("inf"), summary["p99"])
+        self.assertIsNone(self.histogram.summary("run_pivot_report"))
+
+    def test_render(self):
+        """Tests that buckets are rendered cumulatively."""
+        self.histogram.observe(0.05, "run_report")
+        self.histogram.observe(0.5, "run_report")
+        self.assertEqual(
+            [
+                "# HELP analytics_mcp_test_seconds Test durations.",
+                "# TYPE analytics_mcp_test_seconds histogram",
+                'analytics_mcp_test_seconds_bucket{tool="run_report",le="0.1"}'
+                " 1",
+                'analytics_mcp_test_seconds_bucket{tool="run_report",le="1"} 2',
+                'analytics_mcp_test_seconds_bucket{tool="run_report",le="+Inf"}'
+                " 2",
+                'analytics_mcp_test_seconds_sum{tool="run_report"} 0.55',
+                'analytics_mcp_test_seconds_count{tool="run_report"} 2',
+            ],
+            list(self.histogram.render()),
+        )
+
+
+class TestRecording(unittest.IsolatedAsyncioTestCase):
+    """Test cases for recording calls."""
+
+    def setUp(self):
+        metrics.clear()
+        self.addCleanup(metrics.clear)
+
+    def test_error_code(self):
+        """Tests that API errors are identified by their status code."""
+        self.assertEqual(
+            "RESOURCE_EXHAUSTED",
+            metrics.error_code(exceptions.ResourceExhausted("quota")),
+        )
+        self.assertEqual("ValueError", metrics.error_code(ValueError()))
+
+    def test_record_api_call(self):
+        """Tests that the size and rows of responses are recorded."""
+        response = data_v1beta.RunReportResponse(row_count=42)
+        metrics.record_api_call("run_report", 0.2, "OK", response)
+        metrics.record_api_call("run_report", 0.3, "UNAVAILABLE")
+        self.assertEqual(
+            {("run_report", "OK"): 1, ("run_report", "UNAVAILABLE"): 1},
+            metrics.api_calls.values(),
+        )
+        self.assertEqual(
+            1, metrics.api_response_bytes.summary("run_report")["count"]
+        )
+        self.assertEqual(42, metrics.report_rows.summary("run_report")["mean"])
+
+    def test_record_batch_api_call(self):
+        """Tests that the rows of each report of a batch are recorded."""
+        response = data_v1beta.BatchRunReportsResponse(
+            reports=[
+                data_v1beta.RunReportResponse(row_count=1),
+                data_v1beta.RunReportResponse(row_count=3),
+            ]
+        )
+        metrics.record_api_call("batch_run_reports", 0.2, "OK", response)
+        summary = metrics.report_rows.summary("batch_run_reports")
+        self.assertEqual(2, summary["count"])
+        self.assertEqual(2, summary["mean"])
+
+    async def test_get_server_stats(self):
+        """Tests that the tool summarizes calls by tool and API method."""
+        metrics.record_tool_call("run_report", 0.25, "ok", 2000)
+        metrics.record_tool_call("run_report", 0.5, "ValueError")
+        metrics.record_api_call("run_report", 0.2, "OK")
+        stats = await server_stats.get_server_stats()
+        tool = stats["tools"]["run_report"]
+        self.assertEqual({"ok": 1, "ValueError": 1}, tool["calls"])
+        self.assertEqual(375.0, tool["latency_ms"]["mean"])
+        self.assertEqual(500.0, tool["latency_ms"]["p95"])
+        self.assertEqual(1, tool["response_bytes"]["count"])
+        self.assertEqual({"OK": 1}, stats["api_calls"]["run_report"]["calls"])
+        self.assertIsNone(stats["api_calls"]["run_report"]["rows"])
+        self.assertIn("hit_ratio", stats["components"]["report_cache"])
+
+    async def test_unknown_tools_share_a_label(self):
+        """Tests that calls are only labeled with the names of tools."""
+        await mcp.call_tool("get_server_stats", {})
+        for name in ("made_up_tool", "another_made_up_tool"):
+            with self.assertRaises(Exception):
+                await mcp.call_tool(name, {})
+        self.assertEqual(
+            {("get_server_stats", "ok"): 1, ("unknown", "ToolError"): 2},
+            metrics.tool_calls.values(),
+        )
+
+    def test_render_components(self):
+        """Tests that the counters of components are rendered as gauges."""
+        text = metrics.render({"report_cache": {"hits": 3, "hit_ratio": 0.75}})
+        self.assertIn("analytics_mcp_report_cache_hits 3\n", text)
+        self.assertIn("analytics_mcp_report_cache_hit_ratio 0.75\n", text)
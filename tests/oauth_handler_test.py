@@ -159,6 +159,30 @@ class TestOAuthHandler(unittest.TestCase):
         mock_creds.refresh.assert_called_once()
         self.assertTrue(creds.valid)
 
+    @patch("analytics_mcp.oauth_handler.Credentials")
+    def test_get_credentials_without_refresh(self, mock_credentials_class):
+        """Tests that an expired token isn't refreshed when refresh=False."""
+        with open(self.token_file, "w") as f:
+            f.write('{"token": "test", "refresh_token": "refresh"}')
+
+        mock_creds = MagicMock()
+        mock_creds.valid = False
+        mock_creds.expired = True
+        mock_creds.refresh_token = "refresh"
+        mock_credentials_class.from_authorized_user_file.return_value = (
+            mock_creds
+        )
+
+        handler = OAuthHandler(
+            client_secrets_file=self.client_secrets_file,
+            token_file=self.token_file,
+        )
+
+        creds = handler.get_credentials(refresh=False)
+
+        mock_creds.refresh.assert_not_called()
+        self.assertEqual(creds, mock_creds)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the pivot reporting module."""
+
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import core, pivot, quota, validation
+from analytics_mcp.tools.reporting.cache import report_cache
+from google.analytics import data_v1beta
+
+
+def _spec(metric):
+    return {
+        "date_ranges": [{"start_date": "2025-01-01", "end_date": "2025-01-31"}],
+        "dimensions": ["country", "browser"],
+        "metrics": [metric],
+        "pivots": [
+            {"field_names": ["country"], "limit": 10},
+            {"field_names": ["browser"], "limit": 5},
+        ],
+    }
+
+
+def _response(metric):
+    return data_v1beta.RunPivotReportResponse(
+        metric_headers=[data_v1beta.MetricHeader(name=metric)],
+        property_quota=data_v1beta.PropertyQuota(
+            tokens_per_hour=data_v1beta.QuotaStatus(consumed=1, remaining=99)
+        ),
+    )
+
+
+class TestPivotReports(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the pivot report tools."""
+
+    async def asyncSetUp(self):
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+        self.addCleanup(quota.tracker.clear)
+        self.client = mock.AsyncMock()
+        self.client.run_pivot_report.side_effect = lambda request: _response(
+            request.metrics[0].name
+        )
+        self.client.batch_run_pivot_reports.side_effect = lambda request: (
+            data_v1beta.BatchRunPivotReportsResponse(
+                pivot_reports=[
+                    _response(r.metrics[0].name) for r in request.requests
+                ]
+            )
+        )
+        patcher = mock.patch.object(
+            core, "create_data_api_client", return_value=self.client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Requests are validated in validation_test.py.
+        patcher = mock.patch.object(validation, "_VALIDATE_REPORTS", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_run_pivot_report(self):
+        """Tests that pivots are sent and repeated reports are cached."""
+        first = await pivot.run_pivot_report(123, **_spec("sessions"))
+        second = await pivot.run_pivot_report(123, **_spec("sessions"))
+        self.assertEqual(first, second)
+        self.client.run_pivot_report.assert_awaited_once()
+        request = self.client.run_pivot_report.await_args.args[0]
+        self.assertEqual(
+            [["country"], ["browser"]],
+            [list(p.field_names) for p in request.pivots],
+        )
+        self.assertNotIn("property_quota", first)
+        self.assertIsNotNone(quota.tracker.status("properties/123"))
+
+    async def test_batch_results_align_with_input(self):
+        """Tests that pivot reports are chunked and returned in order."""
+        metrics = [f"metric{i}" for i in range(7)]
+        responses = await pivot.batch_run_pivot_reports(
+            123, [_spec(metric) for metric in metrics]
+        )
+        self.assertEqual(
+            [r["metric_headers"][0]["name"] for r in responses], metrics
+        )
+        self.assertEqual(2, self.client.batch_run_pivot_reports.await_count)
+
+    async def test_invalid_spec(self):
+        """Tests that unknown keys in a report spec are rejected."""
+        with self.assertRaises(ValueError):
+            await pivot.batch_run_pivot_reports(
+                123, [dict(_spec("sessions"), limit=1)]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the quota module."""
+
+import asyncio
+import datetime
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import quota
+from google.analytics import data_v1beta
+from google.api_core import exceptions
+
+_PROPERTY = "properties/123"
+
+
+def _property_quota(hour_remaining, day_remaining=10_000, consumed=20):
+    return data_v1beta.PropertyQuota(
+        tokens_per_hour=data_v1beta.QuotaStatus(
+            consumed=consumed, remaining=hour_remaining
+        ),
+        tokens_per_day=data_v1beta.QuotaStatus(
+            consumed=consumed, remaining=day_remaining
+        ),
+    )
+
+
+class TestQuotaTracker(unittest.IsolatedAsyncioTestCase):
+    """Test cases for QuotaTracker."""
+
+    def setUp(self):
+        self.now = 1_760_000_000.0
+        # Only patches the clock of the module, not that of the event loop.
+        patcher = mock.patch.object(quota, "time")
+        patcher.start().time.side_effect = lambda: self.now
+        self.addCleanup(patcher.stop)
+        self.tracker = quota.QuotaTracker()
+
+    async def _reserve(self, category="core"):
+        async with self.tracker.reserve(_PROPERTY, category):
+            pass
+
+    async def test_rejects_requests_beyond_remaining_tokens(self):
+        """Tests that requests the quota can't cover are rejected locally."""
+        self.tracker.record(_PROPERTY, _property_quota(hour_remaining=10))
+        with self.assertRaisesRegex(
+            quota.QuotaExhaustedError,
+            "has 10 tokens per hour left, and this request needs about 12",
+        ):
+            await self._reserve()
+        # Realtime reports have a separate quota.
+        await self._reserve("realtime")
+
+    async def test_budget_expires(self):
+        """Tests that an hourly budget is forgotten after an hour."""
+        self.tracker.record(_PROPERTY, _property_quota(hour_remaining=0))
+        self.now += 60 * 60
+        await self._reserve()
+
+    async def test_warns_when_quota_is_low(self):
+        """Tests that a warning is logged when little quota is left."""
+        self.tracker.record(_PROPERTY, _property_quota(hour_remaining=100))
+        with self.assertLogs(quota.__name__, level="WARNING"):
+            await self._reserve()
+
+    async def test_resource_exhausted(self):
+        """Tests that RESOURCE_EXHAUSTED errors are remembered."""
+        with self.assertRaises(quota.QuotaExhaustedError):
+            async with self.tracker.reserve(_PROPERTY):
+                raise exceptions.ResourceExhausted(
+                    "Exhausted property tokens per day"
+                )
+        self.assertEqual(
+            {"tokens_per_day"}, set(self.tracker.status(_PROPERTY))
+        )
+        with self.assertRaisesRegex(quota.QuotaExhaustedError, "per day"):
+            await self._reserve()
+
+    def test_daily_quota_resets_at_midnight_pacific(self):
+        """Tests when daily quotas reset."""
+        noon = datetime.datetime(
+            2025, 7, 1, 12, tzinfo=quota._QUOTA_TIMEZONE
+        ).timestamp()
+        self.assertEqual(
+            datetime.datetime(
+                2025, 7, 2, tzinfo=quota._QUOTA_TIMEZONE
+            ).timestamp(),
+            quota._next_day(noon),
+        )
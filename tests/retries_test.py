@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the retries module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools import retries
+from google.api_core import exceptions
+
+
+class TestCall(unittest.IsolatedAsyncioTestCase):
+    """Test cases for retries.call."""
+
+    def setUp(self):
+        self.addCleanup(retries.clear)
+        patcher = mock.patch.object(retries, "_INITIAL_BACKOFF_SECONDS", 0.001)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.results = []
+        self.timeouts = []
+
+    async def _attempt(self, timeout):
+        self.timeouts.append(timeout)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def test_retries_transient_errors(self):
+        """Tests that transient errors are retried."""
+        self.results = [
+            exceptions.ServiceUnavailable("unavailable"),
+            exceptions.InternalServerError("internal"),
+            "ok",
+        ]
+        with self.assertLogs(retries.__name__, "WARNING"):
+            result = await retries.call("get_property", self._attempt)
+        self.assertEqual("ok", result)
+        self.assertEqual(2, retries.stats()["retries"])
+
+    async def test_does_not_retry_other_errors(self):
+        """Tests that permanent errors are raised right away."""
+        self.results = [exceptions.PermissionDenied("denied"), "ok"]
+        with self.assertRaises(exceptions.PermissionDenied):
+            await retries.call("get_property", self._attempt)
+        self.assertEqual(0, retries.stats()["retries"])
+
+    async def test_gives_up_after_max_attempts(self):
+        """Tests that the error of the last attempt is raised."""
+        self.results = [
+            exceptions.ServiceUnavailable(str(i)) for i in range(10)
+        ]
+        with mock.patch.object(retries, "_MAX_ATTEMPTS", 3):
+            with self.assertRaisesRegex(exceptions.ServiceUnavailable, "2"):
+                with self.assertLogs(retries.__name__, "WARNING"):
+                    await retries.call("get_property", self._attempt)
+
+    async def test_deadline_bounds_attempts(self):
+        """Tests that attempts only get the time left before the deadline."""
+        self.results = ["ok"]
+        with retries.deadline(5):
+            await retries.call("get_property", self._attempt)
+        self.assertLessEqual(self.timeouts[0], 5)
+
+    async def test_deadline_exceeded(self):
+        """Tests that no attempt is made once the deadline has passed."""
+        self.results = ["ok"]
+        with retries.deadline(0):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                await retries.call("get_property", self._attempt)
+        self.assertEqual([], self.timeouts)
+
+    async def test_slow_attempt_times_out(self):
+        """Tests that an attempt that doesn't complete in time is abandoned."""
+
+        async def hang(timeout):
+            await asyncio.Event().wait()
+
+        with retries.deadline(0.01):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                await retries.call("get_property", hang)
+
+    async def test_slow_calls_are_hedged(self):
+        """Tests that a call slower than usual is hedged."""
+        retries._latencies["get_property"].extend(
+            [0.001] * retries._MIN_LATENCY_SAMPLES
+        )
+        calls = 0
+
+        async def first_hangs(timeout):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.Event().wait()
+            return "hedged"
+
+        with mock.patch.object(retries, "_MIN_HEDGE_DELAY_SECONDS", 0.01):
+            self.assertEqual(
+                "hedged", await retries.call("get_property", first_hangs)
+            )
+        self.assertEqual(
+            {"retries": 0, "hedges": 1, "hedge_wins": 1}, retries.stats()
+        )
+
+    async def test_report_calls_are_not_hedged(self):
+        """Tests that calls using report quota are never hedged."""
+        retries._latencies["run_report"].extend(
+            [0.001] * retries._MIN_LATENCY_SAMPLES
+        )
+        self.assertIsNone(retries._hedge_delay("run_report"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the scheduling module."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools import scheduling
+from google.analytics import data_v1beta
+
+
+class TestScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for Scheduler."""
+
+    def setUp(self):
+        self.scheduler = scheduling.Scheduler(
+            max_concurrent=2, max_concurrent_per_key=2
+        )
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def _call(self, key, name, call_priority=None):
+        async with self.scheduler.slot(key, call_priority):
+            self.started.append(name)
+            await self.release.wait()
+
+    async def _start(self, *calls):
+        """Starts the calls in order and lets them reach the scheduler."""
+        tasks = []
+        for call in calls:
+            tasks.append(asyncio.ensure_future(self._call(*call)))
+            await asyncio.sleep(0)
+        return tasks
+
+    async def _finish(self, tasks):
+        self.release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_limits_concurrent_calls(self):
+        """Tests that calls beyond the global limit are queued."""
+        tasks = await self._start(("a", 1), ("b", 2), ("c", 3))
+        self.assertEqual([1, 2], self.started)
+        self.assertEqual(2, self.scheduler.stats()["in_flight"])
+        self.assertEqual(
+            1, self.scheduler.stats()["priorities"]["interactive"]["queued"]
+        )
+        await self._finish(tasks)
+        self.assertEqual([1, 2, 3], self.started)
+        self.assertEqual(0, self.scheduler.stats()["in_flight"])
+
+    async def test_limits_concurrent_calls_per_key(self):
+        """Tests that a busy key doesn't block calls with other keys."""
+        self.scheduler = scheduling.Scheduler(
+            max_concurrent=3, max_concurrent_per_key=1
+        )
+        tasks = await self._start(("a", 1), ("a", 2), ("b", 3))
+        self.assertEqual([1, 3], self.started)
+        await self._finish(tasks)
+        self.assertEqual([1, 3, 2], self.started)
+
+    async def test_higher_priority_starts_first(self):
+        """Tests that queued calls start in priority order."""
+        tasks = await self._start(
+            ("a", 1),
+            ("b", 2),
+            ("c", "bulk", "bulk"),
+            ("d", "interactive"),
+            ("e", "realtime", "realtime"),
+        )
+        await self._finish(tasks)
+        self.assertEqual(
+            [1, 2, "realtime", "interactive", "bulk"], self.started
+        )
+
+    async def test_keys_take_turns(self):
+        """Tests that a burst of calls for one key doesn't starve others."""
+        self.scheduler = scheduling.Scheduler(
+            max_concurrent=1, max_concurrent_per_key=1
+        )
+        tasks = await self._start(
+            ("x", 0), ("a", 1), ("a", 2), ("a", 3), ("b", 4)
+        )
+        await self._finish(tasks)
+        self.assertEqual([0, 1, 4, 2, 3], self.started)
+
+    async def test_priority_context(self):
+        """Tests that the priority can be set for a context."""
+        with scheduling.priority("bulk"):
+            tasks = await self._start(("a", 1))
+        await self._finish(tasks)
+        self.assertEqual(
+            1, self.scheduler.stats()["priorities"]["bulk"]["started"]
+        )
+
+    async def test_cancelled_call_leaves_queue(self):
+        """Tests that a cancelled queued call doesn't take a slot."""
+        tasks = await self._start(("a", 1), ("b", 2), ("c", 3), ("d", 4))
+        tasks[2].cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(
+            1, self.scheduler.stats()["priorities"]["interactive"]["queued"]
+        )
+        self.release.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual([1, 2, 4], self.started)
+        self.assertEqual(0, self.scheduler.stats()["in_flight"])
+
+
+class TestScheduledClient(unittest.IsolatedAsyncioTestCase):
+    """Test cases for ScheduledClient."""
+
+    async def test_calls_are_scheduled_by_property(self):
+        """Tests that calls wait for a slot keyed by their property."""
+        client = mock.AsyncMock(spec=data_v1beta.BetaAnalyticsDataAsyncClient)
+        scheduled = scheduling.ScheduledClient(client)
+        slot = mock.MagicMock(wraps=scheduling.scheduler.slot)
+        with mock.patch.object(scheduling.scheduler, "slot", slot):
+            await scheduled.run_report(
+                data_v1beta.RunReportRequest(property="properties/1")
+            )
+            await scheduled.run_realtime_report(
+                request=data_v1beta.RunRealtimeReportRequest(
+                    property="properties/1"
+                )
+            )
+            await scheduled.get_metadata(
+                data_v1beta.GetMetadataRequest(name="properties/1/metadata")
+            )
+        service = type(client).__name__
+        self.assertEqual(
+            [
+                mock.call((service, "properties/1", "core"), None),
+                mock.call((service, "properties/1", "realtime"), "realtime"),
+                mock.call((service, "properties/1", "core"), None),
+            ],
+            slot.call_args_list,
+        )
+        client.run_report.assert_awaited_once()
+
+    async def test_metadata_is_added_to_calls(self):
+        """Tests that the metadata of the client is added to each call."""
+        client = mock.AsyncMock(spec=data_v1beta.BetaAnalyticsDataAsyncClient)
+        scheduled = scheduling.ScheduledClient(
+            client, lambda: (("authorization", "Bearer token"),)
+        )
+        await scheduled.run_report(
+            data_v1beta.RunReportRequest(property="properties/1"),
+            metadata=(("x-goog-user-project", "project"),),
+        )
+        self.assertEqual(
+            (
+                ("x-goog-user-project", "project"),
+                ("authorization", "Bearer token"),
+            ),
+            client.run_report.await_args.kwargs["metadata"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
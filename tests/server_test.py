@@ -14,7 +14,11 @@
 
 """Test cases for the server module."""
 
+import os
+import subprocess
+import sys
 import unittest
+from unittest import mock
 
 
 class TestUtils(unittest.TestCase):
@@ -29,3 +33,179 @@ class TestUtils(unittest.TestCase):
         from analytics_mcp import server
 
         self.assertIsNotNone(server.mcp, "MCP server instance not initialized")
+
+    def test_parse_import_times(self):
+        """Tests parsing `-X importtime` output into startup phases."""
+        from analytics_mcp import server
+
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       100 |        100 |   mcp.types",
+                "import time:        50 |        150 | mcp",
+                server._PRELOAD_MARKER,
+                "import time:       300 |        300 | grpc",
+            ]
+        )
+        phases = server._parse_import_times(output)
+        self.assertEqual(
+            [
+                [
+                    server._ImportTime("mcp.types", 100, 100, 1),
+                    server._ImportTime("mcp", 50, 150, 0),
+                ],
+                [server._ImportTime("grpc", 300, 300, 0)],
+            ],
+            phases,
+        )
+        report = server._format_import_profile(phases, limit=1)
+        self.assertIn("MCP handshake: 0.1 ms", report)
+        self.assertIn("after startup: 0.3 ms", report)
+        self.assertNotIn("  mcp\n", report)
+
+    def test_client_libraries_imported_lazily(self):
+        """Tests that importing the server doesn't import client libraries."""
+        code = (
+            "import sys, analytics_mcp.server; "
+            "print('google.analytics.data_v1beta' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual("False", result.stdout.strip())
+
+    def test_http_transport_options(self):
+        """Tests that the HTTP options are passed to the workers."""
+        from analytics_mcp import server
+
+        with (
+            mock.patch.dict(os.environ),
+            mock.patch("uvicorn.run") as uvicorn_run,
+        ):
+            os.environ.pop("ANALYTICS_MCP_DISK_CACHE", None)
+            server.run_server(
+                ["--transport=http", "--host=0.0.0.0", "--workers=4"]
+            )
+            self.assertEqual("0.0.0.0", os.environ[server._HTTP_HOST_ENV])
+            self.assertEqual("true", os.environ[server._HTTP_STATELESS_ENV])
+            self.assertEqual("true", os.environ["ANALYTICS_MCP_DISK_CACHE"])
+        uvicorn_run.assert_called_once_with(
+            server._HTTP_APP_FACTORY,
+            factory=True,
+            host="0.0.0.0",
+            port=8000,
+            workers=4,
+            timeout_keep_alive=server._KEEP_ALIVE_SECONDS,
+        )
+
+    def test_allow_server_credentials(self):
+        """Tests that the server's own credentials must be allowed."""
+        from analytics_mcp import server
+
+        env = server._HTTP_ALLOW_SERVER_CREDENTIALS_ENV
+        with mock.patch.dict(os.environ), mock.patch("uvicorn.run"):
+            os.environ.pop(env, None)
+            server.run_server(["--transport=http"])
+            self.assertNotIn(env, os.environ)
+            server.run_server(
+                ["--transport=http", "--allow-server-credentials"]
+            )
+            self.assertEqual("true", os.environ[env])
+
+    def test_transport_security_allows_known_hosts(self):
+        """Tests that requests must be addressed to an allowed host."""
+        from starlette.testclient import TestClient
+
+        from analytics_mcp import server
+
+        settings = server.mcp.settings.model_copy()
+        self.addCleanup(setattr, server.mcp, "settings", settings)
+        self.addCleanup(setattr, server.mcp, "_session_manager", None)
+        self.addCleanup(setattr, server.mcp, "require_access_token", False)
+        env = {
+            server._HTTP_HOST_ENV: "0.0.0.0",
+            server._HTTP_ALLOWED_HOSTS_ENV: "mcp.example.com",
+            server._HTTP_STATELESS_ENV: "true",
+        }
+        statuses = {}
+        with (
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(server.lazy_imports, "preload"),
+        ):
+            with TestClient(server.create_http_app()) as client:
+                for host in ("mcp.example.com:8000", "evil.example.com"):
+                    statuses[host] = client.post(
+                        "/mcp",
+                        json={"jsonrpc": "2.0", "id": 1, "method": "ping"},
+                        headers={
+                            "Host": host,
+                            "Accept": "application/json, text/event-stream",
+                        },
+                    ).status_code
+        self.assertEqual(
+            {"mcp.example.com:8000": 200, "evil.example.com": 421}, statuses
+        )
+
+    def test_invalid_worker_count(self):
+        """Tests that at least one worker is required."""
+        from analytics_mcp import server
+
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            server.run_server(["--transport=http", "--workers=0"])
+
+    def test_http_app(self):
+        """Tests that the HTTP app serves compressed JSON and metrics."""
+        from starlette.testclient import TestClient
+
+        from analytics_mcp import server
+
+        headers = {
+            "Accept": "application/json, text/event-stream",
+            "Accept-Encoding": "gzip",
+            "MCP-Protocol-Version": "2025-06-18",
+        }
+        settings = server.mcp.settings.model_copy()
+        self.addCleanup(setattr, server.mcp, "settings", settings)
+        self.addCleanup(setattr, server.mcp, "_session_manager", None)
+        self.addCleanup(setattr, server.mcp, "require_access_token", False)
+        with (
+            mock.patch.dict(os.environ, {server._HTTP_STATELESS_ENV: "true"}),
+            mock.patch.object(server.lazy_imports, "preload"),
+        ):
+            app = server.create_http_app()
+            with TestClient(app, base_url="http://localhost:8000") as client:
+                response = client.post(
+                    "/mcp",
+                    json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+                    headers=headers,
+                )
+                metrics_response = client.get("/metrics")
+                call_response = client.post(
+                    "/mcp",
+                    json={
+                        "jsonrpc": "2.0",
+                        "id": 2,
+                        "method": "tools/call",
+                        "params": {"name": "get_server_stats", "arguments": {}},
+                    },
+                    headers=headers,
+                )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/json", response.headers["content-type"])
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        tools = [tool["name"] for tool in response.json()["result"]["tools"]]
+        self.assertIn("run_report", tools)
+        self.assertEqual(200, metrics_response.status_code)
+        self.assertIn(
+            "# TYPE analytics_mcp_tool_calls_total counter",
+            metrics_response.text,
+        )
+        self.assertIn(
+            "analytics_mcp_report_cache_hit_ratio", metrics_response.text
+        )
+        result = call_response.json()["result"]
+        self.assertTrue(result["isError"])
+        self.assertIn("Authorization: Bearer", result["content"][0]["text"])
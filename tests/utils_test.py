@@ -14,9 +14,16 @@
 
 """Test cases for the utils module."""
 
+import asyncio
+import datetime
+import threading
+import time
 import unittest
+from unittest import mock
 
 from analytics_mcp.tools import utils
+from google.analytics import admin_v1beta, data_v1beta
+from google.auth.credentials import AnonymousCredentials
 
 
 class TestUtils(unittest.TestCase):
@@ -68,3 +75,317 @@ class TestUtils(unittest.TestCase):
             msg="Resource name with more than 2 components should fail",
         ):
             utils.construct_property_rn("properties/123/abc")
+
+    def test_credentials_fingerprint(self):
+        """Tests that user accounts of the same OAuth client differ."""
+        fingerprints = []
+        for refresh_token in ("alice", "bob", "alice"):
+            credentials = mock.MagicMock(
+                client_id="client", refresh_token=refresh_token
+            )
+            with mock.patch.object(
+                utils, "_create_credentials", return_value=credentials
+            ):
+                fingerprints.append(utils.credentials_fingerprint())
+        self.assertNotEqual(fingerprints[0], fingerprints[1])
+        self.assertEqual(fingerprints[0], fingerprints[2])
+
+
+class TestClientPool(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the shared API client pool."""
+
+    async def asyncSetUp(self):
+        patcher = mock.patch.object(
+            utils,
+            "_create_credentials",
+            return_value=AnonymousCredentials(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addAsyncCleanup(utils.close_api_clients)
+
+    async def test_client_reused_across_calls(self):
+        """Tests that repeated calls return the same client."""
+        self.assertIs(
+            utils.create_data_api_client(),
+            utils.create_data_api_client(),
+            "Data API client should be shared across calls",
+        )
+        self.assertIsNot(
+            utils.create_data_api_client(),
+            utils.create_admin_api_client(),
+            "Each client type should have its own client",
+        )
+
+    async def test_pool_evicts_least_recently_used(self):
+        """Tests that the pool closes clients beyond its capacity."""
+        with mock.patch.object(utils, "_MAX_POOLED_CLIENTS", 1):
+            data_client = utils.create_data_api_client()
+            with mock.patch.object(
+                data_client.transport.grpc_channel, "close"
+            ) as close:
+                utils.create_admin_api_client()
+                await asyncio.sleep(0)
+            close.assert_called_once()
+            self.assertIsNot(
+                data_client,
+                utils.create_data_api_client(),
+                "Evicted client should be replaced by a new client",
+            )
+
+    async def test_close_api_clients_empties_pool(self):
+        """Tests that closing the pool forces new clients to be created."""
+        client = utils.create_data_api_client()
+        await utils.close_api_clients()
+        self.assertIsNot(client, utils.create_data_api_client())
+
+
+class TestUserRegistry(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the credentials of the users of a shared server."""
+
+    async def asyncSetUp(self):
+        self.expiry = datetime.datetime(2030, 1, 1)
+        self.token_users = {"alice-1": "alice", "alice-2": "alice"}
+
+        def look_up_token(token):
+            if token not in self.token_users:
+                raise ValueError("invalid token")
+            self.expiry += datetime.timedelta(hours=1)
+            return self.token_users[token], self.expiry
+
+        for patcher in (
+            mock.patch.object(utils, "_look_up_token", look_up_token),
+            mock.patch.object(utils, "users", utils._UserRegistry(60)),
+            mock.patch.object(
+                utils,
+                "_create_credentials",
+                return_value=AnonymousCredentials(),
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addAsyncCleanup(utils.close_api_clients)
+
+    async def test_tokens_of_a_user_share_clients(self):
+        """Tests that calls use the token of the request and user's clients."""
+        async with utils.user_context("alice-1"):
+            self.assertEqual("alice", utils.current_user())
+            client = utils.create_data_api_client()
+        async with utils.user_context("alice-2"):
+            self.assertIs(client, utils.create_data_api_client())
+        async with utils.user_context("alice-1"):
+            self.assertEqual(
+                (("authorization", "Bearer alice-1"),),
+                utils._access_token_metadata(),
+            )
+        self.assertEqual(
+            {"users": 1, "lookups": 2, "evictions": 0}, utils.users.stats()
+        )
+        self.assertIsNone(utils.current_user())
+
+    async def test_expired_tokens_are_looked_up_again(self):
+        """Tests that a cached token is only trusted until it expires."""
+        self.expiry = datetime.datetime(2000, 1, 1)
+        async with utils.user_context("alice-1"):
+            pass
+        del self.token_users["alice-1"]
+        with self.assertRaises(ValueError):
+            async with utils.user_context("alice-1"):
+                pass
+        self.assertEqual(2, utils.users.stats()["lookups"])
+
+    async def test_users_get_their_own_clients(self):
+        """Tests that users don't share clients with the server."""
+        server_client = utils.create_data_api_client()
+        async with utils.user_context("alice-1"):
+            self.assertIsNot(server_client, utils.create_data_api_client())
+        async with utils.user_context(None):
+            self.assertIsNone(utils.current_user())
+            self.assertIs(server_client, utils.create_data_api_client())
+
+    async def test_user_clients_are_not_evicted_by_pool_size(self):
+        """Tests that only idle eviction closes the clients of users."""
+        clients = {}
+        self.token_users.update({"bob-1": "bob", "carol-1": "carol"})
+        with mock.patch.object(utils, "_MAX_POOLED_CLIENTS", 1):
+            for token in ("alice-1", "bob-1", "carol-1"):
+                async with utils.user_context(token):
+                    clients[token] = utils.create_data_api_client()
+                    utils.create_admin_api_client()
+            utils.create_data_api_client()
+            for token, client in clients.items():
+                async with utils.user_context(token):
+                    self.assertIs(client, utils.create_data_api_client())
+
+    async def test_invalid_token(self):
+        """Tests that an invalid token is rejected."""
+        with self.assertRaises(ValueError):
+            async with utils.user_context("mallory"):
+                pass
+
+    async def test_idle_users_are_evicted(self):
+        """Tests that idle users are forgotten and their clients closed."""
+        with mock.patch.object(utils, "users", utils._UserRegistry(0)):
+            async with utils.user_context("alice-1"):
+                client = utils.create_data_api_client()
+            with mock.patch.object(
+                client.transport.grpc_channel, "close"
+            ) as close:
+                utils.users.evict_idle()
+                await asyncio.sleep(0)
+            stats = utils.users.stats()
+        close.assert_called_once()
+        self.assertEqual({"users": 0, "lookups": 1, "evictions": 1}, stats)
+
+
+class TestCachedCredentials(unittest.TestCase):
+    """Test cases for the credentials cache."""
+
+    def _expiring_credentials(self, seconds):
+        """Returns mock credentials whose token expires in `seconds`."""
+        return mock.MagicMock(
+            token="token",
+            expiry=datetime.datetime.now(datetime.timezone.utc).replace(
+                tzinfo=None
+            )
+            + datetime.timedelta(seconds=seconds),
+        )
+
+    def test_resolves_once(self):
+        """Tests that credentials are resolved once across many calls."""
+        credentials = mock.MagicMock(token=None, expiry=None)
+        resolve = mock.MagicMock(return_value=credentials)
+        cache = utils._CachedCredentials(resolve)
+        first = cache.get()
+        for _ in range(99):
+            self.assertIs(cache.get(), first)
+        resolve.assert_called_once()
+        self.assertEqual(
+            cache.stats(),
+            {"hits": 99, "misses": 1, "refreshes": 0, "refresh_failures": 0},
+        )
+
+    def test_exposes_wrapped_attributes(self):
+        """Tests that attributes of the resolved credentials are available."""
+        credentials = mock.MagicMock(
+            token=None, expiry=None, service_account_email="sa@example.com"
+        )
+        cache = utils._CachedCredentials(lambda: credentials)
+        self.assertEqual(cache.get().service_account_email, "sa@example.com")
+
+    def test_refreshes_token_before_expiry(self):
+        """Tests that a token close to expiry is refreshed in the background."""
+        credentials = self._expiring_credentials(60)
+        refreshed = threading.Event()
+        credentials.refresh.side_effect = lambda request: refreshed.set()
+        cache = utils._CachedCredentials(
+            lambda: credentials, refresh_skew_seconds=300
+        )
+        cache.get()
+        self.assertTrue(refreshed.wait(5), "Token should be refreshed")
+
+    def test_leaves_fresh_token_alone(self):
+        """Tests that a token far from expiry isn't refreshed."""
+        credentials = self._expiring_credentials(3600)
+        cache = utils._CachedCredentials(
+            lambda: credentials, refresh_skew_seconds=300
+        )
+        cache.get()
+        credentials.refresh.assert_not_called()
+
+    def test_concurrent_refreshes_are_single_flighted(self):
+        """Tests that concurrent callers share a single refresh."""
+        credentials = self._expiring_credentials(3600)
+        release = threading.Event()
+        credentials.refresh.side_effect = lambda request: release.wait(5)
+        cache = utils._CachedCredentials(lambda: credentials)
+        wrapper = cache.get()
+        threads = [
+            threading.Thread(target=wrapper.refresh, args=(None,))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        # Gives every thread time to join the in-flight refresh.
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        credentials.refresh.assert_called_once()
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+
+class TestProtoToDict(unittest.TestCase):
+    """Test cases for proto_to_dict."""
+
+    def _assert_same_as_to_dict(self, message):
+        self.assertEqual(
+            utils.proto_to_dict(message),
+            type(message).to_dict(
+                message,
+                use_integers_for_enums=False,
+                preserving_proto_field_name=True,
+            ),
+        )
+
+    def test_report_response(self):
+        """Tests that report responses are converted like to_dict does."""
+        self._assert_same_as_to_dict(
+            data_v1beta.RunReportResponse(
+                dimension_headers=[data_v1beta.DimensionHeader(name="date")],
+                metric_headers=[
+                    data_v1beta.MetricHeader(
+                        name="sessions",
+                        type_=data_v1beta.MetricType.TYPE_INTEGER,
+                    )
+                ],
+                rows=[
+                    data_v1beta.Row(
+                        dimension_values=[
+                            data_v1beta.DimensionValue(value="20250101"),
+                            data_v1beta.DimensionValue(value=""),
+                            data_v1beta.DimensionValue(),
+                        ],
+                        metric_values=[data_v1beta.MetricValue(value="10")],
+                    )
+                ],
+                row_count=1,
+                metadata=data_v1beta.ResponseMetaData(
+                    sampling_metadatas=[
+                        data_v1beta.SamplingMetadata(samples_read_count=5)
+                    ]
+                ),
+                property_quota=data_v1beta.PropertyQuota(
+                    tokens_per_day=data_v1beta.QuotaStatus(consumed=1)
+                ),
+            )
+        )
+
+    def test_metadata(self):
+        """Tests that metadata is converted like to_dict does."""
+        self._assert_same_as_to_dict(
+            data_v1beta.Metadata(
+                dimensions=[
+                    data_v1beta.DimensionMetadata(
+                        api_name="customEvent:test", custom_definition=True
+                    )
+                ],
+                metrics=[
+                    data_v1beta.MetricMetadata(
+                        api_name="sessions",
+                        type_=data_v1beta.MetricType.TYPE_INTEGER,
+                        blocked_reasons=[
+                            data_v1beta.MetricMetadata.BlockedReason.NO_COST_METRICS
+                        ],
+                    )
+                ],
+            )
+        )
+
+    def test_unsupported_fields_fall_back(self):
+        """Tests that messages with well-known types are still converted."""
+        self._assert_same_as_to_dict(
+            admin_v1beta.Property(
+                name="properties/123", create_time={"seconds": 1}
+            )
+        )
@@ -0,0 +1,322 @@
+# Copyright 2025 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the validation module."""
+
+import unittest
+from unittest import mock
+
+from analytics_mcp.tools.reporting import validation
+from analytics_mcp.tools.reporting.metadata_cache import PropertyMetadata
+from google.analytics import data_v1beta
+from google.api_core import exceptions
+
+_METADATA = PropertyMetadata(
+    data_v1beta.Metadata(
+        dimensions=[
+            data_v1beta.DimensionMetadata(api_name=name)
+            for name in ("country", "city", "eventName", "customEvent:plan")
+        ],
+        metrics=[
+            data_v1beta.MetricMetadata(api_name=name)
+            for name in ("sessions", "activeUsers", "eventCount")
+        ],
+    )
+)
+
+
+def _request(**kwargs) -> data_v1beta.RunReportRequest:
+    """Returns a request for the test property with the given fields."""
+    return data_v1beta.RunReportRequest(
+        property="properties/123",
+        date_ranges=[data_v1beta.DateRange(start_date="7daysAgo")],
+        **kwargs,
+    )
+
+
+def _dimension_filter(field_name: str) -> data_v1beta.FilterExpression:
+    return data_v1beta.FilterExpression(
+        not_expression=data_v1beta.FilterExpression(
+            filter=data_v1beta.Filter(
+                field_name=field_name,
+                empty_filter=data_v1beta.Filter.EmptyFilter(),
+            )
+        )
+    )
+
+
+class TestCheckFields(unittest.TestCase):
+    """Test cases for check_fields."""
+
+    def test_valid_request(self):
+        """Tests that a valid request has no errors."""
+        request = _request(
+            dimensions=[{"name": "country"}, {"name": "customEvent:plan"}],
+            metrics=[{"name": "sessions"}, {"name": "keyEvents:purchase"}],
+            dimension_filter=_dimension_filter("city"),
+            order_bys=[{"metric": {"metric_name": "sessions"}}],
+        )
+        self.assertEqual([], validation.check_fields(request, _METADATA))
+
+    def test_unknown_fields(self):
+        """Tests that unknown fields are reported with suggestions."""
+        request = _request(
+            dimensions=[{"name": "countri"}, {"name": "customEvent:plna"}],
+            metrics=[{"name": "country"}],
+            dimension_filter=_dimension_filter("sessions"),
+        )
+        self.assertEqual(
+            [
+                "Unknown dimension 'countri'. Did you mean 'country'?",
+                "Unknown dimension 'customEvent:plna'. Did you mean"
+                " 'customEvent:plan'?",
+                "'country' is a dimension, not a metric.",
+                "dimension_filter: 'sessions' is a metric, not a dimension.",
+            ],
+            validation.check_fields(request, _METADATA),
+        )
+
+    def test_order_bys_must_be_in_request(self):
+        """Tests that order bys must use fields of the request."""
+        request = _request(
+            dimensions=[{"name": "country"}],
+            metrics=[{"name": "sessions"}],
+            order_bys=[
+                {"dimension": {"dimension_name": "city"}},
+                {"metric": {"metric_name": "activeUsers"}},
+            ],
+        )
+        self.assertEqual(
+            [
+                "order_bys: Dimension 'city' must also be in `dimensions`.",
+                "order_bys: Metric 'activeUsers' must also be in `metrics`.",
+            ],
+            validation.check_fields(request, _METADATA),
+        )
+
+    def test_pivots_must_use_fields_of_request(self):
+        """Tests that pivots and their order bys must use request fields."""
+        request = data_v1beta.RunPivotReportRequest(
+            property="properties/123",
+            dimensions=[{"name": "country"}],
+            metrics=[{"name": "sessions"}],
+            pivots=[
+                {"field_names": ["country"], "limit": 10},
+                {
+                    "field_names": ["city"],
+                    "limit": 5,
+                    "order_bys": [{"metric": {"metric_name": "eventCount"}}],
+                },
+            ],
+        )
+        self.assertEqual(
+            [
+                "pivots: Dimension 'city' must also be in `dimensions`.",
+                "order_bys: Metric 'eventCount' must also be in `metrics`.",
+            ],
+            validation.check_fields(request, _METADATA),
+        )
+
+    def test_expressions_are_not_checked(self):
+        """Tests that fields defined by expressions aren't looked up."""
+        request = _request(
+            metrics=[{"name": "ratio", "expression": "sessions/activeUsers"}],
+            metric_filter=data_v1beta.FilterExpression(
+                filter=data_v1beta.Filter(
+                    field_name="ratio",
+                    empty_filter=data_v1beta.Filter.EmptyFilter(),
+                )
+            ),
+        )
+        self.assertEqual([], validation.check_fields(request, _METADATA))
+
+
+class TestValidateReportRequest(unittest.IsolatedAsyncioTestCase):
+    """Test cases for validate_report_request."""
+
+    async def asyncSetUp(self):
+        validation._compatibility_results.clear()
+        self.addCleanup(validation._compatibility_results.clear)
+        self.client = mock.AsyncMock()
+        self.client.check_compatibility.return_value = (
+            data_v1beta.CheckCompatibilityResponse()
+        )
+        for patcher in (
+            mock.patch.object(validation, "_VALIDATE_REPORTS", True),
+            mock.patch.object(validation, "_CHECK_COMPATIBILITY", True),
+            mock.patch.object(
+                validation.property_metadata,
+                "get",
+                mock.AsyncMock(return_value=_METADATA),
+            ),
+            mock.patch.object(
+                validation, "create_data_api_client", return_value=self.client
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_rejects_unknown_fields(self):
+        """Tests that unknown fields are rejected without API calls."""
+        with self.assertRaisesRegex(ValueError, "Unknown metric 'sesions'"):
+            await validation.validate_report_request(
+                _request(metrics=[{"name": "sesions"}])
+            )
+        self.client.check_compatibility.assert_not_awaited()
+
+    async def test_compatibility_is_cached(self):
+        """Tests that compatibility is checked once per set of fields."""
+        for metrics in (
+            ["sessions", "activeUsers"],
+            ["activeUsers", "sessions"],
+        ):
+            await validation.validate_report_request(
+                _request(
+                    dimensions=[{"name": "country"}],
+                    metrics=[{"name": name} for name in metrics],
+                )
+            )
+        self.client.check_compatibility.assert_awaited_once()
+
+    async def test_ignores_incompatible_fields_not_in_request(self):
+        """Tests that only incompatible fields of the request count."""
+        self.client.check_compatibility.return_value = (
+            data_v1beta.CheckCompatibilityResponse(
+                dimension_compatibilities=[
+                    data_v1beta.DimensionCompatibility(
+                        dimension_metadata={"api_name": "itemName"},
+                        compatibility=data_v1beta.Compatibility.INCOMPATIBLE,
+                    )
+                ]
+            )
+        )
+        await validation.validate_report_request(
+            _request(
+                dimensions=[{"name": "eventName"}],
+                metrics=[{"name": "sessions"}],
+            )
+        )
+
+    async def test_rejects_incompatible_fields(self):
+        """Tests that incompatible fields of the request are rejected."""
+        self.client.check_compatibility.return_value = (
+            data_v1beta.CheckCompatibilityResponse(
+                dimension_compatibilities=[
+                    data_v1beta.DimensionCompatibility(
+                        dimension_metadata={"api_name": name},
+                        compatibility=data_v1beta.Compatibility.INCOMPATIBLE,
+                    )
+                    for name in ("itemName", "eventName")
+                ]
+            )
+        )
+        with self.assertRaisesRegex(
+            ValueError, "can't be used together: 'eventName'.$"
+        ):
+            await validation.validate_report_request(
+                _request(
+                    dimensions=[{"name": "eventName"}],
+                    metrics=[{"name": "sessions"}],
+                )
+            )
+
+    async def test_rejects_request_the_check_rejects(self):
+        """Tests that requests that fail the check are rejected."""
+        self.client.check_compatibility.side_effect = (
+            exceptions.InvalidArgument("Incompatible fields")
+        )
+        request = _request(
+            dimensions=[{"name": "eventName"}], metrics=[{"name": "sessions"}]
+        )
+        for _ in range(2):
+            with self.assertRaisesRegex(ValueError, "Incompatible fields"):
+                await validation.validate_report_request(request)
+        # Rejections may not last, so the request is checked again.
+        self.assertEqual(2, self.client.check_compatibility.await_count)
+
+    async def test_compatibility_is_cached_per_user(self):
+        """Tests that users of a shared server don't share checks."""
+        request = _request(metrics=[{"name": "sessions"}])
+        for user in ("alice", "bob", "alice"):
+            with mock.patch.object(
+                validation, "current_user", return_value=user
+            ):
+                await validation.validate_report_request(request)
+        self.assertEqual(2, self.client.check_compatibility.await_count)
+
+    async def test_only_set_filters_are_checked(self):
+        """Tests that unset filters aren't sent with the check."""
+        await validation.validate_report_request(
+            _request(
+                metrics=[{"name": "sessions"}],
+                dimension_filter={
+                    "filter": {
+                        "field_name": "country",
+                        "string_filter": {"value": "FR"},
+                    }
+                },
+            )
+        )
+        check = data_v1beta.CheckCompatibilityRequest.pb(
+            self.client.check_compatibility.await_args.args[0]
+        )
+        self.assertTrue(check.HasField("dimension_filter"))
+        self.assertFalse(check.HasField("metric_filter"))
+
+    async def test_compatibility_check_is_opt_in(self):
+        """Tests that compatibility isn't checked unless enabled."""
+        with mock.patch.object(validation, "_CHECK_COMPATIBILITY", False):
+            await validation.validate_report_request(
+                _request(metrics=[{"name": "sessions"}])
+            )
+        self.client.check_compatibility.assert_not_awaited()
+
+    async def test_refreshes_metadata_for_new_custom_fields(self):
+        """Tests that unknown custom fields are looked up again."""
+        metadata = PropertyMetadata(
+            data_v1beta.Metadata(
+                dimensions=[
+                    data_v1beta.DimensionMetadata(api_name="customEvent:tier")
+                ]
+            )
+        )
+        with mock.patch.object(
+            validation.property_metadata,
+            "refresh",
+            mock.AsyncMock(return_value=metadata),
+        ) as refresh:
+            await validation.validate_report_request(
+                _request(dimensions=[{"name": "customEvent:tier"}])
+            )
+            refresh.assert_awaited_once_with("properties/123")
+            with self.assertRaisesRegex(ValueError, "Unknown dimension"):
+                await validation.validate_report_request(
+                    _request(dimensions=[{"name": "customEvent:tire"}])
+                )
+
+    async def test_skips_validation_without_metadata(self):
+        """Tests that requests are allowed if metadata is unavailable."""
+        validation.property_metadata.get.side_effect = (
+            exceptions.ServiceUnavailable("unavailable")
+        )
+        with self.assertLogs(validation.__name__, level="WARNING"):
+            await validation.validate_report_request(
+                _request(metrics=[{"name": "sesions"}])
+            )
+
+    async def test_programming_errors_are_raised(self):
+        """Tests that errors other than those of the API aren't ignored."""
+        validation.property_metadata.get.side_effect = AttributeError()
+        with self.assertRaises(AttributeError):
+            await validation.validate_report_request(_request())